@@ -0,0 +1,178 @@
+"""
+Terminal backend without curses. Output is encoded as ANSI escape
+sequences into one preallocated buffer and written by a single os.write
+on every update, keys are read from the terminal in cbreak mode.
+"""
+from collections import Counter
+from contextlib import contextmanager
+import curses
+import os
+import termios
+import tty
+
+from curses_tools import (
+    LEFT_KEY_CODE,
+    RIGHT_KEY_CODE,
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+)
+from headless import _BaseCanvas
+
+
+# attributes used by the game and their SGR parameters
+SGR_PARAMETERS = (
+    (curses.A_BOLD, b'1'),
+    (curses.A_DIM, b'2'),
+    (curses.A_UNDERLINE, b'4'),
+    (curses.A_REVERSE, b'7'),
+)
+# enough for a cursor move, SGR with all parameters and a wide symbol
+MAX_BYTES_PER_CELL = 32
+ESCAPE_KEY_CODES = {
+    b'A': UP_KEY_CODE,
+    b'B': DOWN_KEY_CODE,
+    b'C': RIGHT_KEY_CODE,
+    b'D': LEFT_KEY_CODE,
+}
+SETUP = b'\x1b[?1049h\x1b[?25l\x1b[0m\x1b[2J'
+TEARDOWN = b'\x1b[0m\x1b[?25h\x1b[?1049l'
+
+
+def get_sgr(attr):
+    """Return SGR sequence resetting attributes and setting given ones."""
+
+    parameters = [b'0'] + [
+        parameter for flag, parameter in SGR_PARAMETERS if attr & flag
+    ]
+    return b'\x1b[' + b';'.join(parameters) + b'm'
+
+
+class AnsiTerminal(_BaseCanvas):
+    """
+    Replacement of curses window drawing on the terminal directly. Text
+    put by addstr() is encoded at once: cursor moves are skipped when
+    the text continues the previous one and are relative on the same row,
+    SGR attributes are sent only when they change. refresh() or doupdate()
+    writes the buffer with one syscall, noutrefresh() does nothing, as in
+    curses.
+    """
+
+    def __init__(self, rows, columns, output_fd=1, input_fd=0):
+        self.rows = rows
+        self.columns = columns
+        self.output_fd = output_fd
+        self.input_fd = input_fd
+        self.calls = Counter()
+        self.buffer = bytearray(rows * columns * MAX_BYTES_PER_CELL)
+        self.bytes_written = 0
+        self.writes = 0
+        self._size = 0
+        self._cursor = None
+        self._attr = None
+        self._keys = b''
+        self._sgr = {}
+
+    def _append(self, data):
+        end = self._size + len(data)
+        if end > len(self.buffer):
+            self.doupdate()
+            end = len(data)
+        self.buffer[end - len(data):end] = data
+        self._size = end
+
+    def _put(self, row, column, text, attr=0):
+        if row == self.rows - 1 and column + len(text) == self.columns:
+            # writing to the lower right corner scrolls the terminal
+            text = text[:-1]
+            if not text:
+                return
+        cursor = self._cursor
+        if cursor != (row, column):
+            if cursor and cursor[0] == row and cursor[1] < column:
+                # forward on the same row is shorter than the full address
+                self._append(b'\x1b[%dC' % (column - cursor[1]))
+            else:
+                self._append(b'\x1b[%d;%dH' % (row + 1, column + 1))
+        if attr != self._attr:
+            sgr = self._sgr.get(attr)
+            if sgr is None:
+                sgr = self._sgr[attr] = get_sgr(attr)
+            self._append(sgr)
+            self._attr = attr
+        self._append(text.encode())
+        self._cursor = row, column + len(text)
+
+    def beep(self):
+        self._append(b'\a')
+
+    def _write(self, data):
+        """Write part of the data, return the number of bytes written."""
+
+        return os.write(self.output_fd, data)
+
+    def _read_keys(self):
+        # returns at once, terminal is set up to read without waiting
+        return os.read(self.input_fd, 1024)
+
+    def doupdate(self):
+        """Write everything encoded since the last update."""
+
+        view = memoryview(self.buffer)
+        written = 0
+        while written < self._size:
+            written += self._write(view[written:self._size])
+            self.writes += 1
+        view.release()
+        self.bytes_written += self._size
+        self._size = 0
+
+    def refresh(self):
+        self.calls['refresh'] += 1
+        self.doupdate()
+
+    def getch(self):
+        """Return the next key code as curses does, -1 if there is none."""
+
+        self.calls['getch'] += 1
+        if not self._keys:
+            self._keys = self._read_keys()
+        if not self._keys:
+            return -1
+
+        keys = self._keys
+        # arrows are sent as ESC [ A or, in keypad mode, ESC O A
+        if keys[:1] == b'\x1b' and keys[1:2] in (b'[', b'O') and len(keys) > 2:
+            key_code = ESCAPE_KEY_CODES.get(keys[2:3])
+            if key_code:
+                self._keys = keys[3:]
+                return key_code
+        self._keys = keys[1:]
+        return keys[0]
+
+
+@contextmanager
+def open_terminal(output_fd=1, input_fd=0):
+    """
+    Prepare terminal for AnsiTerminal like curses.wrapper() does: keys
+    without echo and line buffering, alternate screen, hidden cursor.
+    Settings are restored on exit.
+    """
+
+    settings = termios.tcgetattr(input_fd)
+    tty.setcbreak(input_fd)
+    # read() returns what is there without waiting, as curses nodelay() does,
+    # O_NONBLOCK isn`t used: it would make writes to the tty fail too
+    mode = termios.tcgetattr(input_fd)
+    mode[6][termios.VMIN] = mode[6][termios.VTIME] = 0
+    termios.tcsetattr(input_fd, termios.TCSANOW, mode)
+    columns, rows = os.get_terminal_size(output_fd)
+    terminal = AnsiTerminal(rows, columns, output_fd, input_fd)
+    terminal._append(SETUP)
+    terminal.doupdate()
+    try:
+        yield terminal
+    finally:
+        terminal._size = 0
+        terminal._append(TEARDOWN)
+        terminal.doupdate()
+        termios.tcsetattr(input_fd, termios.TCSADRAIN, settings)
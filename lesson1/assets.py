@@ -0,0 +1,191 @@
+"""
+Frames from FRAMES_DIR compiled into one binary pack file. Pack keeps text,
+size and draw runs of every frame, it is read through mmap and frames are
+decoded only when asked for. Pack is rebuilt when frame files change.
+
+Rebuild by hand from repository root: python lesson1/assets.py
+"""
+from array import array
+from functools import lru_cache
+from hashlib import sha256
+import mmap
+import os
+import struct
+
+from curses_tools import Sprite
+
+from config import FRAMES_DIR, ASSETS_PACK
+
+
+PACK_MAGIC = b'FRPK'
+PACK_VERSION = 1
+# magic, version, sources fingerprint, number of frames
+HEADER = struct.Struct('<4sH32sI')
+# name offset, name length, text offset, text length,
+# runs offset, runs count, rows, columns
+INDEX_ENTRY = struct.Struct('<IHIIIIHH')
+# every run is stored as three unsigned shorts: row, column, length
+RUN_ITEMSIZE = array('H').itemsize * 3
+
+
+def get_source_files(frames_dir):
+    """Return sorted frame names with paths, name is path without .txt."""
+
+    sources = []
+    for folder, _, file_names in os.walk(frames_dir):
+        for file_name in file_names:
+            if not file_name.endswith('.txt'):
+                continue
+            path = os.path.join(folder, file_name)
+            name = os.path.relpath(path, frames_dir)[:-len('.txt')]
+            sources.append((name.replace(os.sep, '/'), path))
+    return sorted(sources)
+
+
+def get_fingerprint(sources):
+    """Hash of names, sizes and modification times of frame files."""
+
+    digest = sha256(str(PACK_VERSION).encode())
+    for name, path in sources:
+        stat = os.stat(path)
+        digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.digest()
+
+
+def build_pack(frames_dir=FRAMES_DIR, pack_path=ASSETS_PACK):
+    sources = get_source_files(frames_dir)
+
+    names, texts, sprites = [], [], []
+    for name, path in sources:
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        names.append(name.encode())
+        texts.append(text.encode())
+        sprites.append(Sprite(text))
+
+    data = bytearray()
+    entries = []
+    data_offset = HEADER.size + INDEX_ENTRY.size * len(sources)
+    for name, text, sprite in zip(names, texts, sprites):
+        name_offset = data_offset + len(data)
+        data += name
+        text_offset = data_offset + len(data)
+        data += text
+        runs = array('H')
+        for row, column, run in sprite.runs:
+            runs.extend((row, column, len(run)))
+        runs_offset = data_offset + len(data)
+        data += runs.tobytes()
+        entries.append(INDEX_ENTRY.pack(
+            name_offset, len(name), text_offset, len(text),
+            runs_offset, len(sprite.runs), sprite.rows, sprite.columns
+        ))
+
+    header = HEADER.pack(
+        PACK_MAGIC, PACK_VERSION, get_fingerprint(sources), len(sources)
+    )
+    temporary_path = f'{pack_path}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        file.write(b''.join(entries))
+        file.write(data)
+    os.replace(temporary_path, pack_path)
+
+
+def read_header(pack_path):
+    """Return (magic, version, fingerprint, count) or None if unreadable."""
+
+    try:
+        with open(pack_path, 'rb') as file:
+            return HEADER.unpack(file.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+
+
+def is_pack_fresh(frames_dir=FRAMES_DIR, pack_path=ASSETS_PACK):
+    header = read_header(pack_path)
+    if header is None:
+        return False
+    magic, version, fingerprint, _ = header
+    return (
+        magic == PACK_MAGIC
+        and version == PACK_VERSION
+        and fingerprint == get_fingerprint(get_source_files(frames_dir))
+    )
+
+
+class AssetPack:
+    """Frames pack mapped to memory, sprites are decoded on first access."""
+
+    def __init__(self, pack_path=ASSETS_PACK):
+        with open(pack_path, 'rb') as file:
+            self._memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = HEADER.unpack_from(self._memory)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f'{pack_path} is not a frames pack v{PACK_VERSION}')
+
+        self._entries = {}
+        for index in range(count):
+            entry = INDEX_ENTRY.unpack_from(
+                self._memory, HEADER.size + index * INDEX_ENTRY.size
+            )
+            name_offset, name_length = entry[:2]
+            name = self._memory[name_offset:name_offset + name_length].decode()
+            self._entries[name] = entry[2:]
+        self._sprites = {}
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get_names(self, folder):
+        prefix = f'{folder}/'
+        return [name for name in self._entries if name.startswith(prefix)]
+
+    def get_size(self, name):
+        """Return rows and columns of the frame without decoding it."""
+
+        return self._entries[name][-2:]
+
+    def get_sprite(self, name):
+        sprite = self._sprites.get(name)
+        if sprite is None:
+            sprite = self._sprites[name] = self._decode(name)
+        return sprite
+
+    def get_frames(self, folder):
+        return [self.get_sprite(name) for name in self.get_names(folder)]
+
+    def _decode(self, name):
+        (text_offset, text_length, runs_offset, runs_count,
+         rows, columns) = self._entries[name]
+        memory = self._memory
+        text = memory[text_offset:text_offset + text_length].decode('utf-8')
+
+        runs = array('H')
+        runs.frombytes(memory[runs_offset:runs_offset + runs_count * RUN_ITEMSIZE])
+        lines = text.splitlines()
+        return Sprite.from_runs(text, rows, columns, tuple(
+            (row, column, lines[row][column:column + length])
+            for row, column, length in zip(runs[::3], runs[1::3], runs[2::3])
+        ))
+
+    def close(self):
+        self._memory.close()
+
+
+@lru_cache(maxsize=None)
+def load_pack(frames_dir=FRAMES_DIR, pack_path=ASSETS_PACK):
+    """Open frames pack, build it first if frame files have changed."""
+
+    if not is_pack_fresh(frames_dir, pack_path):
+        build_pack(frames_dir, pack_path)
+    return AssetPack(pack_path)
+
+
+if __name__ == '__main__':
+    build_pack()
+    pack = AssetPack()
+    for folder in ('garbage', 'spaceship', 'legends'):
+        for name in pack.get_names(folder):
+            print(name, *pack.get_size(name))
@@ -0,0 +1,73 @@
+"""
+Benchmark collisions of bullets with garbage per tick: one grid query
+per bullet vs one ObstacleStore.collide_points() pass for all bullets.
+
+Run from repository root: python lesson1/bench_bullets.py
+"""
+from array import array
+import random
+from time import perf_counter
+
+from obstacles import ObstacleStore
+
+
+BULLETS_NUMS = (50, 500, 5000)
+GARBAGE_NUM = 200
+ROWS, COLUMNS = 50, 200
+TICKS = 20
+
+
+def make_store():
+    store = ObstacleStore()
+    for _ in range(GARBAGE_NUM):
+        store.add(
+            random.uniform(0, ROWS),
+            random.randint(0, COLUMNS),
+            random.randint(3, 9),
+            random.randint(5, 25),
+        )
+    return store
+
+
+def collide_one_by_one(store, rows, columns):
+    return {
+        (index, obstacle)
+        for index, (row, column) in enumerate(zip(rows, columns))
+        for obstacle in store.query_rect(row, column)
+    }
+
+
+def collide_batch(store, rows, columns):
+    return set(store.collide_points(rows, columns))
+
+
+def measure(collide, store, rows, columns):
+    start = perf_counter()
+    for _ in range(TICKS):
+        hits = collide(store, rows, columns)
+    return (perf_counter() - start) / TICKS, hits
+
+
+def main():
+    random.seed(0)
+    store = make_store()
+    print(f'{GARBAGE_NUM} garbage on {ROWS}x{COLUMNS}, time per tick')
+    print(f'{"bullets":>8} {"per bullet, ms":>15} {"batch, ms":>10} {"hits":>6}')
+    for bullets in BULLETS_NUMS:
+        rows = array('d', [random.uniform(0, ROWS) for _ in range(bullets)])
+        columns = array('d', [
+            random.randint(0, COLUMNS) for _ in range(bullets)
+        ])
+        single_time, single_hits = measure(
+            collide_one_by_one, store, rows, columns
+        )
+        batch_time, batch_hits = measure(collide_batch, store, rows, columns)
+        assert single_hits == batch_hits
+        print(
+            f'{bullets:>8} {single_time * 1000:>15.3f} '
+            f'{batch_time * 1000:>10.3f} {len(batch_hits):>6}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark collision checks per tick: list scan vs ObstacleGrid.
+
+Run from repository root: python lesson1/bench_collisions.py
+"""
+import random
+from time import perf_counter
+
+from obstacles import ObstacleStore
+
+
+OBSTACLES_NUMS = (100, 1000, 10000)
+BULLETS_NUM = 20
+ROWS = 50
+# keep garbage density of a crowded 50x200 screen with 100 obstacles
+CELLS_PER_OBSTACLE = 100
+SHIP_SIZE = (9, 5)
+TICKS = 10
+
+
+def make_obstacles(number, columns):
+    store = ObstacleStore()
+    for _ in range(number):
+        store.add(
+            random.uniform(0, ROWS),
+            random.randint(0, columns),
+            random.randint(3, 9),
+            random.randint(5, 25),
+        )
+    return store
+
+
+def make_bullets(columns):
+    return [
+        (random.uniform(0, ROWS), random.randint(0, columns))
+        for _ in range(BULLETS_NUM)
+    ]
+
+
+def tick_list_scan(obstacles, bullets, ship):
+    hits = 0
+    for obstacle in obstacles:
+        obstacle.row += 0.5
+    for row, column in bullets:
+        for obstacle in obstacles:
+            if obstacle.has_collision(row, column):
+                hits += 1
+                break
+    for obstacle in obstacles:
+        if obstacle.has_collision(*ship, *SHIP_SIZE):
+            hits += 1
+            break
+    return hits
+
+
+def tick_grid(store, bullets, ship):
+    hits = 0
+    for obstacle in store.views:
+        store.move(obstacle, obstacle.row + 0.5)
+    for row, column in bullets:
+        if store.query_rect(row, column):
+            hits += 1
+    if store.query_rect(*ship, *SHIP_SIZE):
+        hits += 1
+    return hits
+
+
+def measure(tick, *args):
+    start = perf_counter()
+    for _ in range(TICKS):
+        tick(*args)
+    return (perf_counter() - start) / TICKS
+
+
+def main():
+    random.seed(0)
+    print(f'{"obstacles":>10} {"list, ms":>10} {"grid, ms":>10} {"speedup":>8}')
+    for number in OBSTACLES_NUMS:
+        columns = number * CELLS_PER_OBSTACLE // ROWS
+        bullets = make_bullets(columns)
+        ship = (ROWS // 2, columns // 2)
+
+        obstacles = make_obstacles(number, columns).views
+        list_time = measure(tick_list_scan, obstacles, bullets, ship)
+
+        store = make_obstacles(number, columns)
+        grid_time = measure(tick_grid, store, bullets, ship)
+
+        print(
+            f'{number:>10} {list_time * 1000:>10.3f} '
+            f'{grid_time * 1000:>10.3f} {list_time / grid_time:>7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Entity throughput of the two engines: coroutine per entity (Simulation)
+and component tables updated by systems (EcsSimulation). Garbage and
+bullets are kept flying at the given number, the world is widened with
+the number so density stays as on the screen. Only simulation is run,
+without render; entities updated per second and ms per tick are shown.
+
+Run from repository root: python lesson1/bench_ecs.py
+"""
+import argparse
+from random import choice, randint, seed, uniform
+from time import perf_counter
+
+from simulation import autopilot, create_simulation
+
+from config import BORDERS, MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+
+
+ENTITIES = (150, 1500, 6000, 24000)
+ROWS = 50
+# columns of the world per garbage kept flying, about 150 on 200 columns
+COLUMNS_PER_GARBAGE = 1.3
+TICKS = 200
+WARMUP_TICKS = 50
+ENGINES = ('coroutines', 'ecs')
+
+
+def run(engine, entities, ticks, warmup_ticks):
+    """Return seconds of ticks and entities updated on them."""
+
+    seed(0)
+    garbage_num = entities * 2 // 3
+    bullets_num = entities - garbage_num
+    columns = max(200, round(garbage_num * COLUMNS_PER_GARBAGE))
+    game = create_simulation(
+        ROWS, columns, engine=engine, year=2020, god_mode=True,
+        garbage_workers=garbage_num, bullet_workers=bullets_num
+    )
+    elapsed = updated = 0
+    try:
+        for tick in range(warmup_ticks + ticks):
+            for _ in range(garbage_num - len(game.garbage)):
+                game.spawn_garbage(
+                    column=randint(BORDERS, columns - 1 - BORDERS),
+                    garbage_frame=choice(game.garbage_frames),
+                    speed=uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED)
+                )
+            for _ in range(bullets_num - len(game.bullets)):
+                game.spawn_bullet(
+                    ROWS - 2, randint(BORDERS + 1, columns - 2 - BORDERS)
+                )
+            controls = autopilot()
+            start = perf_counter()
+            game.step(controls)
+            if tick >= warmup_ticks:
+                elapsed += perf_counter() - start
+                updated += len(game.garbage) + len(game.bullets)
+    finally:
+        game.close()
+    return elapsed, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entities', type=int, nargs='+', default=ENTITIES)
+    parser.add_argument('--ticks', type=int, default=TICKS)
+    parser.add_argument('--warmup', type=int, default=WARMUP_TICKS)
+    args = parser.parse_args()
+
+    print(f'{args.ticks} ticks after {args.warmup} of warmup, garbage and '
+          f'bullets 2:1')
+    print(f'{"entities":>9} {"engine":>11} {"ms/tick":>9} '
+          f'{"entities/s":>12} {"speedup":>8}')
+    for entities in args.entities:
+        rates = {}
+        for engine in ENGINES:
+            elapsed, updated = run(engine, entities, args.ticks, args.warmup)
+            rates[engine] = updated / elapsed
+            print(f'{entities:>9} {engine:>11} '
+                  f'{elapsed * 1000 / args.ticks:>9.3f} '
+                  f'{rates[engine]:>12.0f} '
+                  f'{rates[engine] / rates[ENGINES[0]]:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
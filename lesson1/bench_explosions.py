@@ -0,0 +1,131 @@
+"""
+Compare explosions as a coroutine per explosion blinking ASCII frames
+with explosions as particles moved all at once. Explosions are started
+every tick to keep given number of them alive, simulation and render
+on headless canvas are timed against the tick budget.
+
+Run from repository root: python lesson1/bench_explosions.py
+"""
+from random import randint, seed
+from time import perf_counter
+
+from curses_tools import compile_frame, get_frame_size
+from explosion import explode
+from headless import HeadlessCanvas
+from render import Renderer
+import simulation
+from utils import asleep
+
+from config import TIC_TIMEOUT
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 200
+EXPLOSIONS_NUMS = (100, 300, 1000)
+# both kinds of explosion live 8 tics
+EXPLOSION_TICS = 8
+
+EXPLOSION_FRAMES = [compile_frame(frame) for frame in [
+    """\
+           (_)
+       (  (   (  (
+      () (  (  )
+        ( )  ()
+    """,
+    """\
+           (_)
+       (  (   (
+         (  (  )
+          )  (
+    """,
+    """\
+            (
+          (   (
+         (     (
+          )  (
+    """,
+    """\
+            (
+              (
+            (
+    """,
+]]
+
+
+async def legacy_explode(game, center_row, center_column):
+    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
+    explosion = game.show(center_row - rows / 2, center_column - columns / 2)
+
+    game.beep()
+    for frame in EXPLOSION_FRAMES:
+        explosion.frame = frame
+        await asleep()
+        explosion.frame = None
+        await asleep()
+
+    game.hide(explosion)
+
+
+def start_legacy(game, row, column):
+    game.scheduler.spawn(legacy_explode(game, row, column))
+
+
+def start_particles(game, row, column):
+    explode(game, row, column)
+
+
+def run(start_explosion, explosions_num):
+    seed(explosions_num)
+    canvas = HeadlessCanvas(ROWS, COLUMNS)
+    renderer = Renderer(canvas)
+    # legacy explosions are coroutines on the game scheduler
+    game = simulation.create_simulation(
+        ROWS, COLUMNS, engine='coroutines', god_mode=True
+    )
+    per_tick = explosions_num // EXPLOSION_TICS
+
+    simulation_time = 0
+    times = []
+    try:
+        for _ in range(TICKS):
+            start = perf_counter()
+            for _ in range(per_tick):
+                start_explosion(
+                    game, randint(1, ROWS - 2), randint(1, COLUMNS - 2)
+                )
+            game.step()
+            snapshot = game.get_snapshot()
+            simulated = perf_counter()
+            renderer.draw(snapshot)
+            simulation_time += simulated - start
+            times.append(perf_counter() - start)
+    finally:
+        game.close()
+    return simulation_time / TICKS, times
+
+
+def main():
+    budget = TIC_TIMEOUT * 1000
+    print(f'{TICKS} ticks on {ROWS}x{COLUMNS}, simulation and render, '
+          f'ms per tick, budget {budget:.0f} ms')
+    print(f'{"explosions":>10} {"engine":>10} {"sim":>7} {"mean":>7} '
+          f'{"p99":>7} {"max":>7} {"overruns":>9}')
+    for explosions_num in EXPLOSIONS_NUMS:
+        for name, start_explosion in (
+            ('coroutine', start_legacy),
+            ('particles', start_particles),
+        ):
+            simulation_time, times = run(start_explosion, explosions_num)
+            times.sort()
+            mean = sum(times) / len(times) * 1000
+            p99 = times[len(times) * 99 // 100] * 1000
+            overruns = sum(time * 1000 > budget for time in times)
+            print(
+                f'{explosions_num:>10} {name:>10} '
+                f'{simulation_time * 1000:>7.2f} {mean:>7.2f} {p99:>7.2f} '
+                f'{times[-1] * 1000:>7.2f} {overruns:>9}'
+            )
+
+
+if __name__ == '__main__':
+    main()
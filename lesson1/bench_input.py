@@ -0,0 +1,135 @@
+"""
+Measure key press to screen latency: from the moment a key is written
+to the input pipe to the end of the first render after the tick which
+consumed it. Keys are read by polling getch() once per tick or by
+Keyboard registered in the event loop, with light and overloaded render.
+getch() calls per tick show how often the input is looked at.
+
+Run from repository root: python lesson1/bench_input.py
+"""
+import asyncio
+import os
+from random import choice, seed, uniform
+import struct
+import threading
+from statistics import median
+from time import perf_counter, sleep
+
+from curses_tools import (
+    SPACE_KEY_CODE,
+    LEFT_KEY_CODE,
+    RIGHT_KEY_CODE,
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+    read_controls
+)
+from headless import HeadlessCanvas
+from keyboard import Keyboard
+from pacing import FramePacer, run_paced
+from render import Renderer
+from simulation import create_simulation
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 500
+TIC_TIMEOUT = 0.02
+RENDER_TIMES = (0.002, 0.03)
+KEY_CODES = (
+    SPACE_KEY_CODE, LEFT_KEY_CODE, RIGHT_KEY_CODE, UP_KEY_CODE, DOWN_KEY_CODE
+)
+# key code and the time it was written
+KEY_EVENT = struct.Struct('<id')
+
+
+class PipeCanvas(HeadlessCanvas):
+    """HeadlessCanvas reading keys written to a pipe by inject_keys()."""
+
+    def __init__(self, rows, columns, fd):
+        super().__init__(rows, columns)
+        self.fd = fd
+        self.read_times = []
+
+    def getch(self):
+        self.calls['getch'] += 1
+        try:
+            data = os.read(self.fd, KEY_EVENT.size)
+        except BlockingIOError:
+            return -1
+        key_code, written_at = KEY_EVENT.unpack(data)
+        self.read_times.append(written_at)
+        return key_code
+
+
+def inject_keys(fd, stop):
+    while not stop.is_set():
+        sleep(uniform(0.05, 0.15))
+        os.write(fd, KEY_EVENT.pack(choice(KEY_CODES), perf_counter()))
+
+
+def run(render_time, event_driven):
+    seed(0)
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    window = PipeCanvas(ROWS, COLUMNS, read_fd)
+    simulation = create_simulation(ROWS, COLUMNS, year=2020, god_mode=True)
+    renderer = Renderer(window)
+    pacer = FramePacer(TIC_TIMEOUT, min_render_rate=1)
+    keyboard = Keyboard(window)
+    latencies = []
+
+    def simulate():
+        if event_driven:
+            simulation.step(keyboard.read(pacer.late))
+        else:
+            simulation.step(read_controls(window))
+
+    def render():
+        renderer.draw(simulation.get_snapshot())
+        sleep(render_time)
+        now = perf_counter()
+        latencies.extend(now - written_at for written_at in window.read_times)
+        window.read_times.clear()
+
+    async def play():
+        if event_driven:
+            keyboard.attach(asyncio.get_running_loop(), read_fd)
+        try:
+            await run_paced(simulate, render, pacer, TICKS)
+        finally:
+            keyboard.detach()
+
+    stop = threading.Event()
+    injector = threading.Thread(target=inject_keys, args=(write_fd, stop))
+    injector.start()
+    try:
+        asyncio.run(play())
+    finally:
+        stop.set()
+        injector.join()
+        simulation.close()
+        os.close(read_fd)
+        os.close(write_fd)
+    return sorted(latencies), window.calls['getch'] / TICKS
+
+
+def main():
+    print(f'{TICKS} ticks of {TIC_TIMEOUT * 1000:.0f} ms, '
+          f'key press to screen latency, ms')
+    print(f'{"render, ms":>10} {"input":>10} {"keys":>5} '
+          f'{"p50":>7} {"p95":>7} {"max":>7} {"getch":>7}')
+    for render_time in RENDER_TIMES:
+        for event_driven in (False, True):
+            latencies, getch_calls = run(render_time, event_driven)
+            print(
+                f'{render_time * 1000:>10.0f} '
+                f'{"add_reader" if event_driven else "polling":>10} '
+                f'{len(latencies):>5} '
+                f'{median(latencies) * 1000:>7.1f} '
+                f'{latencies[len(latencies) * 95 // 100] * 1000:>7.1f} '
+                f'{latencies[-1] * 1000:>7.1f} '
+                f'{getch_calls:>7.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
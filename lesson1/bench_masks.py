@@ -0,0 +1,98 @@
+"""
+Benchmark collisions of bullets and the spaceship with real garbage
+sprites: bounding boxes only vs boxes as broad phase confirmed by
+sprite masks. Garbage density stays the same as the obstacles number
+grows, the field gets wider.
+
+Run from repository root: python lesson1/bench_masks.py
+"""
+from array import array
+import random
+from time import perf_counter
+
+from assets import load_pack
+from obstacles import ObstacleStore
+
+
+OBSTACLES_NUMS = (200, 2000, 20000)
+ROWS = 50
+# keep garbage density of a crowded 50x200 screen with 100 obstacles
+CELLS_PER_OBSTACLE = 100
+BULLETS_PER_OBSTACLE = 2
+SHIPS_NUM = 20
+TICKS = 10
+
+
+def make_store(frames, number, columns, use_masks):
+    random.seed(number)
+    store = ObstacleStore()
+    for _ in range(number):
+        frame = random.choice(frames)
+        store.add(
+            random.uniform(0, ROWS),
+            random.randint(0, columns),
+            frame.rows,
+            frame.columns,
+            mask=frame.mask if use_masks else None,
+        )
+    return store
+
+
+def measure(stores, bullets, ships, ship_frame):
+    """
+    Return the best time of a tick and hits of every store, the machine
+    is often noisy. Stores take turns tick by tick, so that the noise
+    hits all of them alike.
+    """
+
+    times = [[] for _ in stores]
+    found = [0] * len(stores)
+    for _ in range(TICKS):
+        for number, (store, store_times) in enumerate(zip(stores, times)):
+            start = perf_counter()
+            hits = len(store.collide_points(*bullets))
+            for row, column in ships:
+                hits += len(store.query_rect(
+                    row, column, ship_frame.rows, ship_frame.columns,
+                    ship_frame.mask
+                ))
+            store_times.append(perf_counter() - start)
+            found[number] = hits
+    return [(min(store_times), hits) for store_times, hits in zip(times, found)]
+
+
+def main():
+    pack = load_pack()
+    garbage_frames = pack.get_frames('garbage')
+    ship_frame = pack.get_sprite('spaceship/rocket_frame_1')
+
+    print('best time per tick, ms, and hits found')
+    print(f'{"obstacles":>9} {"bullets":>8} {"boxes":>8} {"masks":>8} '
+          f'{"box hits":>9} {"mask hits":>10}')
+    for number in OBSTACLES_NUMS:
+        columns = number * CELLS_PER_OBSTACLE // ROWS
+        random.seed(0)
+        bullets_num = number * BULLETS_PER_OBSTACLE
+        bullets = (
+            array('d', [random.uniform(0, ROWS) for _ in range(bullets_num)]),
+            array('d', [random.randint(0, columns) for _ in range(bullets_num)]),
+        )
+        ships = [
+            (random.uniform(0, ROWS), random.randint(0, columns))
+            for _ in range(SHIPS_NUM)
+        ]
+        (boxes_time, boxes_hits), (masks_time, masks_hits) = measure(
+            [
+                make_store(garbage_frames, number, columns, False),
+                make_store(garbage_frames, number, columns, True),
+            ],
+            bullets, ships, ship_frame
+        )
+        print(
+            f'{number:>9} {bullets_num:>8} {boxes_time * 1000:>8.2f} '
+            f'{masks_time * 1000:>8.2f} {boxes_hits:>9} {masks_hits:>10}'
+        )
+
+
+if __name__ == '__main__':
+    main()
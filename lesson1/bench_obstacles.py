@@ -0,0 +1,172 @@
+"""
+Compare memory per obstacle and collision checks per second of
+ObstacleStore with the previous Obstacle class.
+
+Run from repository root: python lesson1/bench_obstacles.py
+"""
+from functools import partial
+import random
+import sys
+from time import perf_counter
+import tracemalloc
+import uuid
+
+from obstacles import ObstacleStore, has_collision
+
+
+OBSTACLES_NUM = 10000
+ROWS, COLUMNS = 50, 200
+REPEAT = 20
+
+
+class LegacyObstacle:
+    """Previous Obstacle implementation, with uuid string uid."""
+
+    def __init__(self, row, column, rows_size=1, columns_size=1, uid=None):
+        self.row = row
+        self.column = column
+        self.rows_size = rows_size
+        self.columns_size = columns_size
+        self.uid = uid
+
+    def has_collision(self, obj_corner_row, obj_corner_column, obj_size_rows=1, obj_size_columns=1):
+        return legacy_has_collision(
+            (self.row, self.column),
+            (self.rows_size, self.columns_size),
+            (obj_corner_row, obj_corner_column),
+            (obj_size_rows, obj_size_columns),
+        )
+
+
+def _is_point_inside(corner_row, corner_column, size_rows, size_columns, point_row, point_row_column):
+    rows_flag = corner_row <= point_row < corner_row + size_rows
+    columns_flag = corner_column <= point_row_column < corner_column + size_columns
+
+    return rows_flag and columns_flag
+
+
+def legacy_has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
+    opposite_obstacle_corner = (
+        obstacle_corner[0] + obstacle_size[0] - 1,
+        obstacle_corner[1] + obstacle_size[1] - 1,
+    )
+
+    opposite_obj_corner = (
+        obj_corner[0] + obj_size[0] - 1,
+        obj_corner[1] + obj_size[1] - 1,
+    )
+
+    return any([
+        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
+        _is_point_inside(*obstacle_corner, *obstacle_size, *opposite_obj_corner),
+
+        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
+        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
+    ])
+
+
+def get_boxes():
+    random.seed(0)
+    return [
+        (
+            random.uniform(0, ROWS),
+            random.randint(0, COLUMNS),
+            random.randint(3, 9),
+            random.randint(5, 25),
+        )
+        for _ in range(OBSTACLES_NUM)
+    ]
+
+
+def measure_memory(create):
+    tracemalloc.start()
+    container = create()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, size / OBSTACLES_NUM
+
+
+def create_legacy(boxes):
+    return [
+        LegacyObstacle(*box, uid=str(uuid.uuid4())) for box in boxes
+    ]
+
+
+def create_store(boxes):
+    store = ObstacleStore()
+    for box in boxes:
+        store.add(*box)
+    return store
+
+
+def get_store_arrays_size(store):
+    """Bytes taken by arrays and views, without the grid index."""
+
+    arrays = (
+        store.rows, store.columns, store.rows_sizes, store.columns_sizes,
+        store.uids, store.views,
+    )
+    return (
+        sum(sys.getsizeof(array) for array in arrays)
+        + sum(sys.getsizeof(view) for view in store.views)
+    ) / OBSTACLES_NUM
+
+
+def scan_rect(store, row, column, rows_size=1, columns_size=1):
+    """
+    Return indices of all obstacles of store colliding with the rectangle,
+    checks arrays one by one without using the grid.
+    """
+
+    return [
+        index
+        for index, (obstacle_row, obstacle_column, obstacle_rows_size,
+                    obstacle_columns_size) in enumerate(zip(
+            store.rows, store.columns, store.rows_sizes, store.columns_sizes
+        ))
+        if has_collision(
+            (obstacle_row, obstacle_column),
+            (obstacle_rows_size, obstacle_columns_size),
+            (row, column), (rows_size, columns_size)
+        )
+    ]
+
+
+def measure_checks(check):
+    start = perf_counter()
+    for _ in range(REPEAT):
+        check(ROWS / 2, COLUMNS / 2, 9, 5)
+    return OBSTACLES_NUM * REPEAT / (perf_counter() - start)
+
+
+def main():
+    boxes = get_boxes()
+    legacy, legacy_memory = measure_memory(lambda: create_legacy(boxes))
+    store, store_memory = measure_memory(lambda: create_store(boxes))
+
+    def check_legacy(*rectangle):
+        return [obstacle for obstacle in legacy if obstacle.has_collision(*rectangle)]
+
+    def check_views(*rectangle):
+        return [obstacle for obstacle in store.views if obstacle.has_collision(*rectangle)]
+
+    assert len(check_legacy(ROWS / 2, COLUMNS / 2, 9, 5)) == len(
+        scan_rect(store, ROWS / 2, COLUMNS / 2, 9, 5)
+    )
+
+    arrays_memory = get_store_arrays_size(store)
+
+    print(f'{OBSTACLES_NUM} obstacles, bytes per obstacle:')
+    print(f'  legacy Obstacle with uuid: {legacy_memory:.0f}')
+    print(f'  ObstacleStore arrays and views: {arrays_memory:.0f}, '
+          f'grid index: {store_memory - arrays_memory:.0f}')
+    print('collision checks per second:')
+    print(f'  legacy Obstacle.has_collision: '
+          f'{measure_checks(check_legacy):.0f}')
+    print(f'  Obstacle view has_collision: {measure_checks(check_views):.0f}')
+    print(f'  ObstacleStore arrays scan: '
+          f'{measure_checks(partial(scan_rect, store)):.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Overload rendering and compare game speed with and without skipping
+render passes. Render of every tick is made slower than a tick by
+sleeping, a game at constant speed finishes TICKS in TICKS * TIC_TIMEOUT
+seconds whatever the render costs.
+
+Run from repository root: python lesson1/bench_pacing.py [--csv lateness.csv]
+"""
+import argparse
+import asyncio
+from time import perf_counter, sleep
+
+from headless import HeadlessCanvas
+from pacing import FramePacer, run_paced
+from render import Renderer
+from simulation import create_simulation
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 200
+TIC_TIMEOUT = 0.01
+RENDER_TIMES = (0.005, 0.015, 0.03)
+
+
+def run(render_time, render_rate, min_render_rate):
+    simulation = create_simulation(ROWS, COLUMNS, year=2020, god_mode=True)
+    renderer = Renderer(HeadlessCanvas(ROWS, COLUMNS))
+    pacer = FramePacer(TIC_TIMEOUT, render_rate, min_render_rate)
+
+    def render():
+        renderer.draw(simulation.get_snapshot())
+        sleep(render_time)
+
+    start = perf_counter()
+    asyncio.run(run_paced(simulation.step, render, pacer, TICKS))
+    elapsed = perf_counter() - start
+    simulation.close()
+    return elapsed, pacer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', help='write lateness of the last run here')
+    args = parser.parse_args()
+
+    ticks_per_second = 1 / TIC_TIMEOUT
+    modes = (
+        ('every tick', ticks_per_second, ticks_per_second),
+        ('skipping', ticks_per_second, ticks_per_second / 10),
+    )
+    print(f'{TICKS} ticks of {TIC_TIMEOUT * 1000:.0f} ms, '
+          f'constant speed takes {TICKS * TIC_TIMEOUT:.2f} s')
+    print(f'{"render, ms":>10} {"mode":>11} {"time, s":>8} {"rendered":>9} '
+          f'{"late p50, ms":>13} {"late max, ms":>13}')
+    for render_time in RENDER_TIMES:
+        for mode, render_rate, min_render_rate in modes:
+            elapsed, pacer = run(render_time, render_rate, min_render_rate)
+            report = pacer.get_report()
+            print(
+                f'{render_time * 1000:>10.0f} {mode:>11} {elapsed:>8.2f} '
+                f'{report["rendered"]:>9} '
+                f'{report["lateness_ms"]["p50"]:>13.1f} '
+                f'{report["lateness_ms"]["max"]:>13.1f}'
+            )
+    if args.csv:
+        pacer.dump_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
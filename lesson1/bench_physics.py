@@ -0,0 +1,184 @@
+"""
+Batched ship physics: update_speeds() is checked against update_speed()
+and timed with it at 1, 1 000 and 100 000 ships.
+
+Checks: random speeds, directions, limits and fading of single ticks,
+and whole flights of bots driven by the same directions, speeds of both
+are compared on every tick. With math.cos speeds must be the same, with
+the curve table they differ by the error of the table, except where one
+of them is snapped to zero and the other isn`t.
+
+Checks are also run as unit tests, see test_phisics.py; the run stops
+with exit status 1 if they fail.
+
+Timing: update_speed() called per ship, update_speeds() with math.cos
+and with the curve table, and step of BotSwarm — directions, speeds and
+moves of all bots.
+
+Run from repository root: python lesson1/bench_physics.py
+"""
+import argparse
+from array import array
+from functools import partial
+import math
+import random
+import sys
+from time import perf_counter
+
+from bots import BotSwarm
+from phisics import (
+    ACCELERATION,
+    CURVE_STEPS,
+    update_speed,
+    update_speeds,
+)
+
+
+SHIPS = (1, 1000, 100000)
+CHECKED_SHIPS = 100000
+FLIGHT_SHIPS, FLIGHT_TICKS = 1000, 300
+LIMITS = (1, 2, 5)
+FADINGS = (0, 0.5, 0.8, 1)
+# time of every timed call is summed up to at least this
+MIN_SECONDS = 0.5
+
+
+def update_speeds_one_by_one(rows_speeds, columns_speeds, rows_directions,
+                             columns_directions, row_speed_limit=2,
+                             column_speed_limit=2, fading=0.8):
+    for index, directions in enumerate(zip(rows_directions, columns_directions)):
+        rows_speeds[index], columns_speeds[index] = update_speed(
+            rows_speeds[index], columns_speeds[index], *directions,
+            row_speed_limit, column_speed_limit, fading
+        )
+
+
+def compare(expected, got, tolerance):
+    """Return the largest difference and number of snapping mismatches."""
+
+    largest = snapped = 0
+    for one, other in zip(expected, got):
+        difference = abs(one - other)
+        if difference > tolerance and (one == 0 or other == 0):
+            snapped += 1
+        else:
+            largest = max(largest, difference)
+    return largest, snapped
+
+
+def check_ticks(rng, tolerance, curve_steps):
+    print(f'single ticks of {CHECKED_SHIPS} ships, limits {LIMITS}, '
+          f'fading {FADINGS}:')
+    passed = True
+    for limit in LIMITS:
+        for fading in FADINGS:
+            rows_speeds = array('d', (rng.uniform(-limit, limit) for _ in range(CHECKED_SHIPS)))
+            columns_speeds = array('d', (rng.uniform(-limit, limit) for _ in range(CHECKED_SHIPS)))
+            # every tenth ship stands still
+            rows_speeds[::10] = array('d', [0]) * len(rows_speeds[::10])
+            rows_directions = array('b', (rng.randint(-1, 1) for _ in range(CHECKED_SHIPS)))
+            columns_directions = array('b', (rng.randint(-1, 1) for _ in range(CHECKED_SHIPS)))
+
+            expected = [rows_speeds[:], columns_speeds[:]]
+            update_speeds_one_by_one(
+                *expected, rows_directions, columns_directions,
+                limit, limit, fading
+            )
+            update_speeds(
+                rows_speeds, columns_speeds, rows_directions,
+                columns_directions, limit, limit, fading, curve_steps
+            )
+            largest, snapped = map(max, zip(
+                compare(expected[0], rows_speeds, tolerance),
+                compare(expected[1], columns_speeds, tolerance),
+            ))
+            passed &= largest <= tolerance and not (snapped and curve_steps is None)
+            print(f'  limit {limit}, fading {fading}: largest difference '
+                  f'{largest:.2e}, snapped differently {snapped}')
+    return passed
+
+
+def check_flights(rng, tolerance, curve_steps):
+    """Fly bots, speeds of both are updated by the same directions."""
+
+    swarm = BotSwarm(FLIGHT_SHIPS, 50, 200, rng=rng, curve_steps=curve_steps)
+    expected = [swarm.rows_speeds[:], swarm.columns_speeds[:]]
+    largest = snapped = 0
+    for _ in range(FLIGHT_TICKS):
+        directions = swarm.get_directions()
+        update_speeds_one_by_one(*expected, *directions, swarm.speed_limit, swarm.speed_limit)
+        swarm.step()
+        for speeds, swarm_speeds in zip(expected, (swarm.rows_speeds, swarm.columns_speeds)):
+            tick_largest, tick_snapped = compare(speeds, swarm_speeds, tolerance)
+            largest = max(largest, tick_largest)
+            snapped += tick_snapped
+        # the next tick starts from the same speeds, differences don`t pile up
+        expected = [swarm.rows_speeds[:], swarm.columns_speeds[:]]
+    print(f'flights of {FLIGHT_SHIPS} bots for {FLIGHT_TICKS} ticks: largest '
+          f'difference {largest:.2e}, snapped differently {snapped}')
+    return largest <= tolerance and not (snapped and curve_steps is None)
+
+
+def get_time(function, *args):
+    """Return seconds per call of function, args are copied for every call."""
+
+    calls = elapsed = 0
+    while elapsed < MIN_SECONDS:
+        copies = [arg[:] for arg in args]
+        start = perf_counter()
+        function(*copies)
+        elapsed += perf_counter() - start
+        calls += 1
+    return elapsed / calls
+
+
+def bench(ships_numbers):
+    rng = random.Random(0)
+    print(f'{"ships":>7} {"one by one":>11} {"batched":>11} {"table":>11} '
+          f'{"bots step":>11}   ms per tick')
+    for ships in ships_numbers:
+        args = (
+            array('d', (rng.uniform(-2, 2) for _ in range(ships))),
+            array('d', (rng.uniform(-2, 2) for _ in range(ships))),
+            array('b', (rng.randint(-1, 1) for _ in range(ships))),
+            array('b', (rng.randint(-1, 1) for _ in range(ships))),
+        )
+        swarm = BotSwarm(ships, 50, 200, rng=rng)
+        times = [
+            get_time(update_speeds_one_by_one, *args),
+            get_time(update_speeds, *args),
+            get_time(partial(update_speeds, curve_steps=CURVE_STEPS), *args),
+            get_time(swarm.step),
+        ]
+        print(f'{ships:>7} ' + ' '.join(f'{time * 1000:>11.4f}' for time in times)
+              + f'   batched {times[0] / times[1]:.1f}x faster')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ships', type=int, nargs='+', default=SHIPS)
+    parser.add_argument('--no-check', action='store_true')
+    args = parser.parse_args()
+
+    if not args.no_check:
+        # nearest point of the table is at most half a step away
+        for name, curve_steps, tolerance in (
+            ('math.cos', None, 0),
+            (f'table of {CURVE_STEPS} steps', CURVE_STEPS,
+             ACCELERATION * math.sin(1) / CURVE_STEPS / 2 * 1.001),
+        ):
+            print(f'{name}:')
+            rng = random.Random(0)
+            passed = (
+                check_ticks(rng, tolerance, curve_steps)
+                & check_flights(rng, tolerance, curve_steps)
+            )
+            print(f'equivalence within {tolerance:.2e}: '
+                  f'{"passed" if passed else "FAILED"}')
+            if not passed:
+                sys.exit(1)
+    bench(args.ships)
+
+
+if __name__ == '__main__':
+    main()
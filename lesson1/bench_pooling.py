@@ -0,0 +1,198 @@
+"""
+Compare pooled workers with a coroutine, Entity and Obstacle per spawn
+at high spawn rate: objects created per second, garbage collector runs
+and pauses, ticks per second. Only simulation is run, without render.
+
+Run from repository root: python lesson1/bench_pooling.py
+"""
+from collections import Counter
+import gc
+from random import choice, randint, seed, uniform
+from time import perf_counter
+
+from curses_tools import compile_frame, get_frame_size
+from explosion import explode
+import obstacles
+import simulation
+from scheduler import Scheduler
+from utils import asleep
+
+from config import BORDERS, MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 5000
+GARBAGE_NUM = 150
+BULLETS_NUM = 80
+
+
+class LegacySimulation(simulation.Simulation):
+    """Simulation spawning new coroutine and entities for every spawn."""
+
+    def spawn_garbage(self, column, garbage_frame, speed=0.5):
+        return self.scheduler.spawn(
+            self.legacy_fly_garbage(column, garbage_frame, speed)
+        )
+
+    def spawn_bullet(self, row, column, rows_speed=-2, columns_speed=0):
+        return self.scheduler.spawn(
+            self.legacy_fire(row, column, rows_speed, columns_speed)
+        )
+
+    async def legacy_fire(self, row, column, rows_speed=-2, columns_speed=0):
+        bullet = simulation.Bullet(row, column, compile_frame('*'))
+        self.entities[bullet] = None
+        self.bullets[bullet] = None
+
+        await asleep()
+        bullet.frame = compile_frame('O')
+        await asleep()
+
+        row += rows_speed
+        column += columns_speed
+        bullet.frame = compile_frame('-' if columns_speed else '|')
+        max_row = self.rows - 1 - BORDERS
+        max_column = self.columns - 1 - BORDERS
+
+        self.beep()
+
+        while BORDERS < row < max_row and BORDERS < column < max_column:
+            bullet.row, bullet.column = row, column
+            await asleep()
+            if bullet.hit:
+                break
+            bullet.armed = True
+            row += rows_speed
+            column += columns_speed
+
+        del self.bullets[bullet]
+        self.hide(bullet)
+
+    async def legacy_fly_garbage(self, column, garbage_frame, speed=0.5):
+        row = BORDERS
+        rows_size, columns_size = get_frame_size(garbage_frame)
+
+        obstacle = self.obstacles.add(row, column, rows_size, columns_size)
+        garbage = simulation.Entity(row, column, garbage_frame)
+        self.garbage[garbage] = None
+
+        while row < self.rows-1:
+            garbage.row = row
+            await asleep()
+            row += speed
+            if obstacle in self.obstacles_in_last_collisions:
+                self.obstacles_in_last_collisions.remove(obstacle)
+                del self.garbage[garbage]
+                self.obstacles.remove(obstacle)
+                explode(
+                    self,
+                    row + rows_size // 2,
+                    column + columns_size // 2
+                )
+                return
+            self.obstacles.move(obstacle, row)
+
+        del self.garbage[garbage]
+        self.obstacles.remove(obstacle)
+
+
+class CountingScheduler(Scheduler):
+
+    def __init__(self, created):
+        super().__init__()
+        self.created = created
+
+    def spawn(self, coroutine):
+        self.created['coroutine'] += 1
+        return super().spawn(coroutine)
+
+
+def count_instances(cls, created):
+    """Count created instances of cls and its subclasses by class name."""
+
+    init = cls.__init__
+
+    def counting_init(self, *args, **kwargs):
+        created[type(self).__name__] += 1
+        init(self, *args, **kwargs)
+
+    cls.__init__ = counting_init
+    return init
+
+
+def run(simulation_class):
+    seed(0)
+    created = Counter()
+    scheduler = CountingScheduler(created)
+    game = simulation_class(
+        ROWS, COLUMNS,
+        simulation.load_pack().get_frames('garbage'),
+        simulation.load_pack().get_frames('spaceship'),
+        year=2020, god_mode=True, scheduler=scheduler
+    )
+    # objects created while starting the game are not counted
+    created.clear()
+
+    entity_init = count_instances(simulation.Entity, created)
+    obstacle_init = count_instances(obstacles.Obstacle, created)
+    collections = Counter()
+    pauses = []
+
+    def on_collect(phase, info):
+        if phase == 'start':
+            pauses.append(perf_counter())
+        else:
+            pauses[-1] = perf_counter() - pauses[-1]
+            collections[info['generation']] += 1
+
+    gc.collect()
+    gc.callbacks.append(on_collect)
+    try:
+        start = perf_counter()
+        for tick in range(TICKS):
+            for _ in range(GARBAGE_NUM - len(game.garbage)):
+                game.spawn_garbage(
+                    column=randint(BORDERS, COLUMNS - 1 - BORDERS),
+                    garbage_frame=choice(game.garbage_frames),
+                    speed=uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED)
+                )
+            for _ in range(BULLETS_NUM - len(game.bullets)):
+                game.spawn_bullet(
+                    ROWS - 2, randint(BORDERS + 1, COLUMNS - 2 - BORDERS)
+                )
+            game.step(simulation.autopilot())
+        elapsed = perf_counter() - start
+    finally:
+        gc.callbacks.remove(on_collect)
+        simulation.Entity.__init__ = entity_init
+        obstacles.Obstacle.__init__ = obstacle_init
+        scheduler.close()
+    return elapsed, created, collections, pauses
+
+
+def main():
+    print(f'{TICKS} ticks, {GARBAGE_NUM} garbage and {BULLETS_NUM} '
+          f'bullets kept flying, per second of simulation:')
+    for name, simulation_class in (
+        ('spawn per object', LegacySimulation),
+        ('worker pools', simulation.Simulation),
+    ):
+        elapsed, created, collections, pauses = run(simulation_class)
+        print(f'{name}: {TICKS / elapsed:.0f} ticks per second')
+        print('  created: ' + ', '.join(
+            f'{kind} {count / elapsed:.0f}'
+            for kind, count in sorted(created.items())
+        ) if created else '  created: nothing')
+        print(
+            '  gc runs by generation: '
+            + ', '.join(
+                f'{generation}: {collections[generation] / elapsed:.1f}'
+                for generation in range(3)
+            )
+            + f'; pause total {sum(pauses) * 1000:.1f} ms, '
+            f'max {max(pauses, default=0) * 1000:.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Find the number of entities the game keeps up with when simulation,
+render and terminal output share one process, and when the simulation
+runs in a worker process publishing frames to shared memory. Headless
+canvas stands in for the terminal in both cases.
+
+Run from repository root: python lesson1/bench_process.py
+"""
+from functools import partial
+from random import choice, randint, uniform
+from time import perf_counter, sleep
+
+from headless import HeadlessCanvas
+from pacing import FramePacer
+from remote import ScreenBlitter, SimulationProcess
+from render import Renderer, get_info_window
+from screen import Compositor, FrameBuffer
+from simulation import create_simulation
+from stars import StarField
+
+from config import (
+    TIC_TIMEOUT,
+    STARS,
+    STARS_NUM,
+    MIN_GARBAGE_SPEED,
+    MAX_GARBAGE_SPEED,
+)
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 100
+GARBAGE_NUMS = (500, 1000, 2000, 4000, 8000)
+# one bullet for every few garbage
+GARBAGE_PER_BULLET = 4
+
+
+def keep_flying(garbage_num, game):
+    """Spawn garbage and bullets up to the given number, load for a tick."""
+
+    for _ in range(garbage_num - len(game.garbage)):
+        game.spawn_garbage(
+            column=randint(0, COLUMNS - 1),
+            garbage_frame=choice(game.garbage_frames),
+            speed=uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED)
+        )
+    for _ in range(garbage_num // GARBAGE_PER_BULLET - len(game.bullets)):
+        game.spawn_bullet(ROWS - 2, randint(1, COLUMNS - 2))
+
+
+def get_options(garbage_num):
+    return dict(
+        year=2020,
+        god_mode=True,
+        garbage_workers=garbage_num,
+        bullet_workers=garbage_num // GARBAGE_PER_BULLET,
+    )
+
+
+def run_one_process(garbage_num):
+    """Return ticks per second, every tick is simulated, drawn and shown."""
+
+    window = HeadlessCanvas(ROWS, COLUMNS)
+    canvas = FrameBuffer(window)
+    compositor = Compositor(window, canvas, update=lambda: None)
+    game = create_simulation(ROWS, COLUMNS, **get_options(garbage_num))
+    renderer = Renderer(
+        canvas,
+        StarField.random(STARS_NUM, 0, ROWS - 1, 0, COLUMNS - 1, STARS),
+        get_info_window(canvas)
+    )
+    try:
+        start = perf_counter()
+        for _ in range(TICKS):
+            keep_flying(garbage_num, game)
+            game.step()
+            renderer.draw(game.get_snapshot())
+            compositor.flush()
+        elapsed = perf_counter() - start
+    finally:
+        game.close()
+    return TICKS / elapsed, TICKS
+
+
+def run_two_processes(garbage_num):
+    """
+    Return ticks per second of the worker, seen by the main process, and
+    the number of frames shown: frames published while the previous one
+    was drawn are skipped.
+    """
+
+    window = HeadlessCanvas(ROWS, COLUMNS)
+    blitter = ScreenBlitter(window, update=lambda: None)
+    simulation = SimulationProcess(
+        ROWS, COLUMNS, TICKS,
+        # the worker doesn`t wait for deadlines and renders every tick
+        FramePacer(1e-9),
+        partial(keep_flying, garbage_num),
+        **get_options(garbage_num)
+    )
+    first = last = None
+    frames = 0
+    try:
+        while True:
+            frame = simulation.screen.read()
+            if frame is None:
+                if not simulation.is_alive():
+                    break
+                sleep(0.0005)
+                continue
+            tick, _, symbols, attrs = frame
+            blitter.blit(symbols, attrs)
+            frames += 1
+            last = tick, perf_counter()
+            first = first or last
+    finally:
+        simulation.close()
+    return (last[0] - first[0]) / (last[1] - first[1]), frames
+
+
+def main():
+    target = 1 / TIC_TIMEOUT
+    print(f'{ROWS}x{COLUMNS}, {TICKS} ticks, game needs {target:.0f} ticks '
+          f'per second; bullets are 1/{GARBAGE_PER_BULLET} of garbage')
+    print(f'{"entities":>9} {"1 process":>10} {"2 processes":>12} '
+          f'{"frames shown":>13}')
+    sustained = {run: 0 for run in (run_one_process, run_two_processes)}
+    for garbage_num in GARBAGE_NUMS:
+        entities = garbage_num + garbage_num // GARBAGE_PER_BULLET
+        one_rate, _ = run_one_process(garbage_num)
+        two_rate, frames = run_two_processes(garbage_num)
+        for run, rate in (
+            (run_one_process, one_rate), (run_two_processes, two_rate)
+        ):
+            if rate >= target:
+                sustained[run] = entities
+        print(f'{entities:>9} {one_rate:>10.1f} {two_rate:>12.1f} '
+              f'{frames:>13}')
+    print(f'sustained: {sustained[run_one_process]} entities in 1 process, '
+          f'{sustained[run_two_processes]} in 2 processes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Cost of recording the game: time of a tick — simulation, render and
+flush to a headless terminal — with and without the recorder, time of
+the recorder calls on the tick, and the size of the recording per minute
+of play. Screens of the recording, played from the start and found by
+seek, are compared with the screens the game has shown.
+
+Run from repository root: python lesson1/bench_recording.py
+"""
+import os
+from random import randrange, seed
+from statistics import mean, quantiles
+import tempfile
+from time import perf_counter, process_time
+
+from headless import HeadlessCanvas
+from recording import Player, Recorder, Recording
+from render import Renderer, get_info_window
+from screen import Compositor, FrameBuffer
+from simulation import autopilot, create_simulation
+from stars import StarField
+
+from config import TIC_TIMEOUT, STARS, STARS_NUM
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 3000
+CHECKED_TICKS = 20
+
+
+class TimedRecorder(Recorder):
+    """Recorder which sums time of its calls made on the game tick."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time = 0
+
+    def record_controls(self, tick, controls):
+        start = perf_counter()
+        super().record_controls(tick, controls)
+        self.time += perf_counter() - start
+
+    def record_frame(self, runs, symbols, attrs):
+        start = perf_counter()
+        super().record_frame(runs, symbols, attrs)
+        self.time += perf_counter() - start
+
+
+def run(path=None, checked_ticks=()):
+    """
+    Play TICKS ticks, record them to path if it is given. Return tick
+    times, recorder and screens of the checked ticks.
+    """
+
+    seed(0)
+    window = HeadlessCanvas(ROWS, COLUMNS)
+    canvas = FrameBuffer(window)
+    recorder = TimedRecorder(path, ROWS, COLUMNS) if path else None
+    compositor = Compositor(window, canvas, lambda: None, recorder)
+    game = create_simulation(ROWS, COLUMNS, year=2020, god_mode=True)
+    renderer = Renderer(
+        canvas,
+        StarField.random(STARS_NUM, 0, ROWS - 1, 0, COLUMNS - 1, STARS),
+        get_info_window(canvas)
+    )
+    times = []
+    screens = {}
+    try:
+        for tick in range(TICKS):
+            controls = autopilot()
+            start = perf_counter()
+            if recorder:
+                recorder.record_controls(game.tick, controls)
+            game.step(controls)
+            renderer.draw(game.get_snapshot())
+            compositor.flush()
+            times.append(perf_counter() - start)
+            if tick in checked_ticks:
+                screens[tick] = get_screen(window)
+    finally:
+        game.close()
+        if recorder:
+            recorder.close()
+    return times, recorder, screens
+
+
+def get_screen(canvas):
+    # lower right corner isn`t sent to the terminal
+    symbols = [row.copy() for row in canvas.symbols]
+    attrs = [row.copy() for row in canvas.attrs]
+    symbols[-1][-1], attrs[-1][-1] = ' ', 0
+    return symbols, attrs
+
+
+def check(path, screens):
+    """Return numbers of screens matched by seek and by playing through."""
+
+    recording = Recording(path)
+    canvas = HeadlessCanvas(recording.rows, recording.columns)
+    player = Player(recording, canvas)
+    sought = sum(
+        player.seek(tick) is not None and get_screen(canvas) == screen
+        for tick, screen in screens.items()
+    )
+    canvas = HeadlessCanvas(recording.rows, recording.columns)
+    played = 0
+    for tick in Player(recording, canvas).play():
+        if tick in screens:
+            played += get_screen(canvas) == screens[tick]
+    return sought, played
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'game.rec')
+    checked_ticks = sorted(randrange(TICKS) for _ in range(CHECKED_TICKS))
+
+    cpu = process_time()
+    plain_times, _, _ = run()
+    plain_cpu, cpu = process_time() - cpu, process_time()
+    times, recorder, screens = run(path, set(checked_ticks))
+    recorded_cpu = process_time() - cpu
+
+    size = os.path.getsize(path)
+    minutes = TICKS * TIC_TIMEOUT / 60
+    print(f'{ROWS}x{COLUMNS}, {TICKS} ticks ({minutes:g} min), ms per tick')
+    print(f'{"":>10} {"mean":>7} {"p95":>7} {"cpu":>7}')
+    for name, tick_times, cpu in (
+        ('plain', plain_times, plain_cpu), ('recorded', times, recorded_cpu)
+    ):
+        print(f'{name:>10} {mean(tick_times) * 1000:>7.3f} '
+              f'{quantiles(tick_times, n=20)[-1] * 1000:>7.3f} '
+              f'{cpu * 1000 / TICKS:>7.3f}')
+    print(f'recorder calls on the tick: {recorder.time * 1000 / TICKS:.3f} ms, '
+          f'dropped records: {recorder.dropped}')
+    print(f'recording: {size} bytes, {size / 1024 / minutes:.1f} KiB per minute')
+
+    start = perf_counter()
+    recording = Recording(path)
+    Player(recording, HeadlessCanvas(ROWS, COLUMNS)).seek(TICKS - 1)
+    seek_time = perf_counter() - start
+    sought, played = check(path, screens)
+    print(f'seek to the last tick: {seek_time * 1000:.1f} ms, '
+          f'{len(recording.keyframe_ticks)} keyframes')
+    print(f'screens matched: {sought}/{len(screens)} by seek, '
+          f'{played}/{len(screens)} played through')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
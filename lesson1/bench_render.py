@@ -0,0 +1,69 @@
+"""
+Measure bytes written to terminal per tick with and without frame buffer.
+The game runs under curses in a pseudo-terminal, all its output is counted.
+
+Run from repository root: python lesson1/bench_render.py
+"""
+import curses
+import fcntl
+import os
+import pty
+import random
+import struct
+import termios
+
+import main
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 300
+TIC_TIMEOUT = 0.01
+
+
+def run_game(double_buffer):
+    random.seed(0)
+    main.DOUBLE_BUFFER = double_buffer
+    main.TIC_TIMEOUT = TIC_TIMEOUT
+    # every tick is rendered, bytes per tick are compared
+    main.RENDER_RATE = main.MIN_RENDER_RATE = None
+    curses.wrapper(main.draw, TICKS, year=2020, god_mode=True)
+
+
+def count_output_bytes(double_buffer):
+    pid, fd = pty.fork()
+    if not pid:
+        os.environ['TERM'] = 'xterm-256color'
+        fcntl.ioctl(
+            pty.STDOUT_FILENO,
+            termios.TIOCSWINSZ,
+            struct.pack('HHHH', ROWS, COLUMNS, 0, 0)
+        )
+        try:
+            run_game(double_buffer)
+        finally:
+            os._exit(0)
+
+    written = 0
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        written += len(chunk)
+    os.waitpid(pid, 0)
+    os.close(fd)
+    return written
+
+
+def main_cli():
+    print(f'{ROWS}x{COLUMNS} terminal, {TICKS} ticks')
+    print(f'{"renderer":>16} {"bytes":>10} {"bytes per tick":>15}')
+    for name, double_buffer in (('direct', False), ('double buffer', True)):
+        written = count_output_bytes(double_buffer)
+        print(f'{name:>16} {written:>10} {written / TICKS:>15.1f}')
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,76 @@
+"""
+Benchmark scheduling overhead per tick: Scheduler with timing wheel vs
+asyncio timers. Every entity sleeps for a random number of tics and does
+nothing else, like blinking stars.
+
+Run from repository root: python lesson1/bench_scheduler.py
+"""
+import asyncio
+from random import randint, seed
+from time import process_time
+
+from scheduler import Scheduler
+from utils import asleep
+
+
+ENTITIES_NUMS = (100, 1000, 10000)
+TICKS = 200
+TIC_TIMEOUT = 0.02
+MAX_SLEEP_TICS = 20
+
+
+async def sleep_in_tics():
+    while True:
+        await asleep(randint(1, MAX_SLEEP_TICS))
+
+
+async def sleep_in_seconds():
+    while True:
+        await asyncio.sleep(randint(1, MAX_SLEEP_TICS) * TIC_TIMEOUT)
+
+
+def measure_scheduler(entities):
+    scheduler = Scheduler()
+    for _ in range(entities):
+        scheduler.spawn(sleep_in_tics())
+    start = process_time()
+    for _ in range(TICKS):
+        scheduler.step()
+    elapsed = process_time() - start
+    scheduler.close()
+    return elapsed / TICKS
+
+
+async def run_asyncio(entities):
+    tasks = [
+        asyncio.create_task(sleep_in_seconds()) for _ in range(entities)
+    ]
+    await asyncio.sleep(0)
+    start = process_time()
+    await asyncio.sleep(TICKS * TIC_TIMEOUT)
+    elapsed = process_time() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed
+
+
+def measure_asyncio(entities):
+    return asyncio.run(run_asyncio(entities)) / TICKS
+
+
+def main():
+    seed(0)
+    print(f'CPU time per tick, {TICKS} ticks')
+    print(f'{"entities":>10} {"asyncio, ms":>12} {"scheduler, ms":>14}')
+    for entities in ENTITIES_NUMS:
+        asyncio_time = measure_asyncio(entities)
+        scheduler_time = measure_scheduler(entities)
+        print(
+            f'{entities:>10} {asyncio_time * 1000:>12.3f} '
+            f'{scheduler_time * 1000:>14.3f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
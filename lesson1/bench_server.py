@@ -0,0 +1,167 @@
+"""
+Load test of the game server: many fake players connect at once, press
+keys and count frames. For every session the frame rate and the latency
+are found — time from a key sent to the end of the first frame received
+after it, the key is seen on that frame or on the next one. The server
+is started in a subprocess, unless the port of a running one is given.
+
+Run from repository root: python lesson1/bench_server.py
+"""
+import argparse
+import asyncio
+from array import array
+from contextlib import contextmanager
+from random import choice
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter
+
+from server import FRAME_END
+
+from config import SERVER_HOST, TIC_TIMEOUT
+
+
+SESSIONS = (1, 50, 100, 200, 400)
+SECONDS = 5
+# keys are pressed by every session a few times per second
+KEY_INTERVAL = 0.25
+KEYS = (b'\x1b[A', b'\x1b[B', b'\x1b[C', b'\x1b[D', b' ')
+
+
+class FakeSession(asyncio.Protocol):
+    """Player which records times of frames and latency of keys."""
+
+    def __init__(self, clock=perf_counter):
+        self.clock = clock
+        self.transport = None
+        self.frame_times = array('d')
+        self.latencies = array('d')
+        self.bytes_received = 0
+        self.key_time = None
+        self._tail = b''
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        now = self.clock()
+        self.bytes_received += len(data)
+        # frame end may be split between chunks
+        data = self._tail + data
+        self._tail = data[-(len(FRAME_END) - 1):]
+        for _ in range(data.count(FRAME_END)):
+            self.frame_times.append(now)
+            if self.key_time is not None:
+                self.latencies.append(now - self.key_time)
+                self.key_time = None
+
+    def press(self, key):
+        if self.transport.is_closing():
+            return
+        self.transport.write(key)
+        if self.key_time is None:
+            self.key_time = self.clock()
+
+    def get_stats(self, start, end):
+        """Return frames per second and latency p50, p95 in ms."""
+
+        frames = sum(1 for time in self.frame_times if start <= time < end)
+        latencies = sorted(self.latencies) or [float('nan')]
+        return (
+            frames / (end - start),
+            latencies[len(latencies) // 2] * 1000,
+            latencies[len(latencies) * 95 // 100] * 1000,
+        )
+
+
+async def load(host, port, sessions_num, seconds):
+    """Connect sessions, press keys for the given seconds, return stats."""
+
+    loop = asyncio.get_running_loop()
+    sessions = []
+    try:
+        for _ in range(sessions_num):
+            _, session = await loop.create_connection(FakeSession, host, port)
+            sessions.append(session)
+        # frames of the first ticks are large, they aren`t counted
+        await asyncio.sleep(TIC_TIMEOUT * 5)
+        for session in sessions:
+            session.latencies = array('d')
+            session.key_time = None
+        start = perf_counter()
+        while perf_counter() - start < seconds:
+            for session in sessions:
+                session.press(choice(KEYS))
+            await asyncio.sleep(KEY_INTERVAL)
+        end = perf_counter()
+    finally:
+        for session in sessions:
+            session.transport.close()
+    return [session.get_stats(start, end) for session in sessions]
+
+
+@contextmanager
+def start_server(host, year):
+    """Run the server in a subprocess, yield its port."""
+
+    process = subprocess.Popen(
+        [sys.executable, 'lesson1/server.py', '--host', host, '--port', '0',
+         '--year', str(year), '--god-mode'],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()
+        yield int(line.rsplit(':', 1)[1])
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def print_stats(sessions_num, stats, per_session):
+    rates = [rate for rate, _, _ in stats]
+    p50s = [p50 for _, p50, _ in stats]
+    p95s = [p95 for _, _, p95 in stats]
+    if per_session:
+        for number, (rate, p50, p95) in enumerate(stats):
+            print(f'{"":>9} {number:>8} {rate:>7.1f} {p50:>8.1f} {p95:>8.1f}')
+    print(f'{sessions_num:>9} {"median":>8} {median(rates):>7.1f} '
+          f'{median(p50s):>8.1f} {median(p95s):>8.1f}')
+    print(f'{"":>9} {"worst":>8} {min(rates):>7.1f} '
+          f'{max(p50s):>8.1f} {max(p95s):>8.1f}')
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int,
+                        help='port of a running server, by default it is started')
+    parser.add_argument(
+        '--year', type=int, default=2020,
+        help='year of started server games, garbage is the densest in 2020'
+    )
+    parser.add_argument('--sessions', type=int, nargs='+', default=SESSIONS)
+    parser.add_argument('--seconds', type=float, default=SECONDS)
+    parser.add_argument('--per-session', action='store_true')
+    args = parser.parse_args()
+
+    def run(port):
+        print(f'{args.seconds:g} s per run, key every {KEY_INTERVAL} s, '
+              f'latency in ms')
+        print(f'{"sessions":>9} {"":>8} {"fps":>7} {"p50":>8} {"p95":>8}')
+        for sessions_num in args.sessions:
+            stats = asyncio.run(
+                load(args.host, port, sessions_num, args.seconds)
+            )
+            print_stats(sessions_num, stats, args.per_session)
+
+    if args.port:
+        run(args.port)
+    else:
+        with start_server(args.host, args.year) as port:
+            run(port)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,97 @@
+"""
+Benchmark draw_frame(): per-character addch vs compiled Sprite runs.
+
+Run from repository root: python lesson1/bench_sprites.py
+"""
+from os import listdir
+from time import perf_counter
+
+from curses_tools import compile_frame, draw_frame, get_frames
+
+from config import FRAMES_DIR
+
+
+ROWS, COLUMNS = 50, 200
+REPEAT = 2000
+
+
+class CountingCanvas:
+    """Canvas stub counting curses calls, drawing goes nowhere."""
+
+    def __init__(self, rows, columns):
+        self.size = rows, columns
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def addch(self, row, column, symbol, *args):
+        self.calls += 1
+
+    def addstr(self, row, column, text, *args):
+        self.calls += 1
+
+
+def draw_frame_by_symbol(canvas, start_row, start_column, text, negative=False):
+    """Previous draw_frame() implementation, one addch() per symbol."""
+
+    rows_number, columns_number = canvas.getmaxyx()
+
+    for row, line in enumerate(text.splitlines(), round(start_row)):
+        if row < 0:
+            continue
+
+        if row >= rows_number:
+            break
+
+        for column, symbol in enumerate(line, round(start_column)):
+            if column < 0:
+                continue
+
+            if column >= columns_number:
+                break
+
+            if symbol == ' ':
+                continue
+
+            if row == rows_number - 1 and column == columns_number - 1:
+                continue
+
+            symbol = symbol if not negative else ' '
+            canvas.addch(row, column, symbol)
+
+
+def measure(draw, frame):
+    canvas = CountingCanvas(ROWS, COLUMNS)
+    start = perf_counter()
+    for _ in range(REPEAT):
+        draw(canvas, 10, 10, frame)
+        draw(canvas, 10, 10, frame, negative=True)
+    elapsed = perf_counter() - start
+    frames_drawn = REPEAT * 2
+    return canvas.calls / frames_drawn, elapsed / frames_drawn * 1e6
+
+
+def main():
+    frames = {}
+    for folder in ('garbage', 'spaceship'):
+        path = f'{FRAMES_DIR}/{folder}'
+        for name in sorted(listdir(path)):
+            frames[name], = get_frames([f'{path}/{name}'])
+    frames['hud'] = compile_frame('YEAR: 2020')
+
+    print(
+        f'{"frame":>20} {"addch calls":>12} {"addch, us":>10} '
+        f'{"run calls":>10} {"runs, us":>10}'
+    )
+    for name, sprite in frames.items():
+        char_calls, char_time = measure(draw_frame_by_symbol, sprite.text)
+        run_calls, run_time = measure(draw_frame, sprite)
+        print(
+            f'{name:>20} {char_calls:>12.0f} {char_time:>10.2f} '
+            f'{run_calls:>10.0f} {run_time:>10.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
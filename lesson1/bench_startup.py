@@ -0,0 +1,115 @@
+"""
+Measure cold start: time from process launch to the first rendered tick
+on HeadlessCanvas, with frames read from text files and from the pack.
+
+Run from repository root: python lesson1/bench_startup.py
+"""
+import os
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+from config import FRAMES_DIR, ASSETS_PACK
+
+
+ROWS, COLUMNS = 50, 200
+REPEAT = 15
+MODES = ('text files', 'pack', 'pack rebuilt')
+
+
+def start_game(mode):
+    """Create simulation and render the first tick, as main.draw() does."""
+
+    from headless import HeadlessCanvas
+    from render import Renderer, get_info_window
+    from stars import StarField
+    from config import BORDERS, STARS
+
+    if mode == 'text files':
+        from curses_tools import get_frames
+        from simulation import Simulation
+
+        def get_folder_frames(folder):
+            path = f'{FRAMES_DIR}/{folder}'
+            return get_frames([f'{path}/{name}' for name in os.listdir(path)])
+
+        simulation = Simulation(
+            ROWS, COLUMNS,
+            get_folder_frames('garbage'),
+            get_folder_frames('spaceship'),
+        )
+    else:
+        from simulation import create_simulation
+        simulation = create_simulation(ROWS, COLUMNS)
+
+    canvas = HeadlessCanvas(ROWS, COLUMNS)
+    renderer = Renderer(
+        canvas,
+        StarField.random(
+            100, BORDERS, ROWS - 1 - BORDERS,
+            BORDERS, COLUMNS - 1 - BORDERS, STARS
+        ),
+        get_info_window(canvas),
+    )
+    simulation.step()
+    renderer.draw(simulation.get_snapshot())
+
+
+def measure(mode):
+    if mode == 'pack':
+        # make sure the pack is fresh before the warm start
+        subprocess.run([sys.executable, 'lesson1/assets.py'], check=True,
+                       stdout=subprocess.DEVNULL)
+
+    times = []
+    for _ in range(REPEAT):
+        if mode == 'pack rebuilt' and os.path.exists(ASSETS_PACK):
+            os.remove(ASSETS_PACK)
+        start = perf_counter()
+        subprocess.run([sys.executable, __file__, '--child', mode], check=True)
+        times.append(perf_counter() - start)
+    return median(times)
+
+
+def measure_loading():
+    """Time to get all game frames inside one process, without imports."""
+
+    from assets import AssetPack
+    from curses_tools import compile_frame, get_frames
+
+    def load_text_files():
+        compile_frame.cache_clear()
+        for folder in ('garbage', 'spaceship', 'legends'):
+            path = f'{FRAMES_DIR}/{folder}'
+            get_frames([f'{path}/{name}' for name in os.listdir(path)])
+
+    def load_pack():
+        pack = AssetPack(ASSETS_PACK)
+        for folder in ('garbage', 'spaceship', 'legends'):
+            pack.get_frames(folder)
+        pack.close()
+
+    for name, load in (('text files', load_text_files), ('pack', load_pack)):
+        start = perf_counter()
+        for _ in range(REPEAT * 10):
+            load()
+        elapsed = (perf_counter() - start) / (REPEAT * 10)
+        print(f'  {name:<13} {elapsed * 1000:7.3f} ms')
+
+
+def main():
+    baseline = measure('text files')
+    print(f'launch to first rendered tick, median of {REPEAT} runs')
+    for mode in MODES:
+        elapsed = baseline if mode == 'text files' else measure(mode)
+        print(f'  {mode:<13} {elapsed * 1000:7.1f} ms')
+    print('loading all frames in process')
+    measure_loading()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        start_game(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,106 @@
+"""
+Compare terminal backends: curses and ANSI sequences written with one
+syscall per frame. The game runs in a pseudo-terminal with garbage,
+bullets and stars; bytes and write syscalls of the game process, taken
+from /proc, and its CPU time are counted per tick.
+
+Run from repository root: python lesson1/bench_terminal.py
+"""
+import curses
+import fcntl
+import json
+import os
+import pty
+import random
+import struct
+import termios
+from time import process_time
+
+import main
+
+
+ROWS, COLUMNS = 50, 200
+TICKS = 300
+TIC_TIMEOUT = 0.01
+
+
+def get_io():
+    with open('/proc/self/io') as file:
+        return dict(line.split(': ') for line in file.read().splitlines())
+
+
+def run_game(terminal, double_buffer):
+    random.seed(0)
+    main.TERMINAL = terminal
+    main.DOUBLE_BUFFER = double_buffer
+    main.TIC_TIMEOUT = TIC_TIMEOUT
+    # every tick is rendered, output per tick is compared
+    main.RENDER_RATE = main.MIN_RENDER_RATE = None
+    options = dict(ticks=TICKS, year=2020, god_mode=True)
+    if terminal == 'ansi':
+        from ansi import open_terminal
+
+        with open_terminal() as window:
+            main.draw(window, **options)
+    else:
+        curses.wrapper(main.draw, **options)
+
+
+def measure(terminal, double_buffer):
+    """Run the game in a pseudo-terminal, return its output stats."""
+
+    report_fd, report_write_fd = os.pipe()
+    pid, fd = pty.fork()
+    if not pid:
+        os.environ['TERM'] = 'xterm-256color'
+        fcntl.ioctl(
+            pty.STDOUT_FILENO,
+            termios.TIOCSWINSZ,
+            struct.pack('HHHH', ROWS, COLUMNS, 0, 0)
+        )
+        try:
+            start_io, start_cpu = get_io(), process_time()
+            run_game(terminal, double_buffer)
+            end_io, end_cpu = get_io(), process_time()
+            os.write(report_write_fd, json.dumps({
+                'syscalls': int(end_io['syscw']) - int(start_io['syscw']),
+                'cpu': end_cpu - start_cpu,
+            }).encode())
+        finally:
+            os._exit(0)
+
+    os.close(report_write_fd)
+    written = 0
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        written += len(chunk)
+    os.waitpid(pid, 0)
+    os.close(fd)
+    with os.fdopen(report_fd) as report:
+        stats = json.loads(report.read() or '{}')
+    stats['bytes'] = written
+    return stats
+
+
+def main_cli():
+    print(f'{ROWS}x{COLUMNS} terminal, {TICKS} ticks, per tick:')
+    print(f'{"backend":>8} {"buffer":>7} {"bytes":>9} {"writes":>7} '
+          f'{"cpu ms":>7}')
+    for terminal in ('curses', 'ansi'):
+        for double_buffer in (False, True):
+            stats = measure(terminal, double_buffer)
+            print(
+                f'{terminal:>8} {"double" if double_buffer else "direct":>7} '
+                f'{stats["bytes"] / TICKS:>9.1f} '
+                f'{stats["syscalls"] / TICKS:>7.2f} '
+                f'{stats["cpu"] * 1000 / TICKS:>7.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,183 @@
+"""
+Tick throughput benchmark, runs simulation and renders it on
+HeadlessCanvas as fast as possible, without waiting for tick deadlines.
+
+Run from repository root: python lesson1/bench_ticks.py --help
+"""
+import argparse
+import json
+from itertools import cycle
+from random import choice, randint, seed, uniform
+from time import perf_counter
+
+from curses_tools import (
+    SPACE_KEY_CODE,
+    LEFT_KEY_CODE,
+    RIGHT_KEY_CODE,
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+    read_controls
+)
+from headless import HeadlessCanvas
+from profiler import Profiler, ProfilingScheduler
+from render import Renderer, get_info_window
+from scheduler import Scheduler
+from screen import Compositor, FrameBuffer
+from simulation import create_simulation
+from stars import StarField
+from utils import asleep
+
+from config import BORDERS, STARS, MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+
+
+KEYS = {
+    'space': SPACE_KEY_CODE,
+    'left': LEFT_KEY_CODE,
+    'right': RIGHT_KEY_CODE,
+    'up': UP_KEY_CODE,
+    'down': DOWN_KEY_CODE,
+}
+
+
+async def keep_alive(number, entities, spawn_entity):
+    """Spawn entities, so that `number` of them are always flying."""
+
+    while True:
+        for _ in range(number - len(entities)):
+            spawn_entity()
+        await asleep()
+
+
+def run(rows=50, columns=200, stars=100, garbage=20, bullets=10,
+        ticks=500, keys=('up', 'left', 'space', 'down', 'right'),
+        double_buffer=False, profile=True):
+    """Run the game on headless canvas, return benchmark report."""
+
+    seed(0)
+    profiler = Profiler()
+    scheduler = ProfilingScheduler(profiler) if profile else Scheduler()
+    simulation = create_simulation(
+        rows, columns, year=2020, god_mode=True, scheduler=scheduler
+    )
+
+    window = canvas = HeadlessCanvas(rows, columns)
+    if double_buffer:
+        canvas = FrameBuffer(window)
+        compositor = Compositor(window, canvas, update=lambda: None)
+    renderer = Renderer(
+        canvas,
+        StarField.random(
+            stars,
+            BORDERS, rows - 1 - BORDERS,
+            BORDERS, columns - 1 - BORDERS,
+            STARS
+        ),
+        get_info_window(canvas)
+    )
+
+    def spawn_garbage():
+        simulation.spawn_garbage(
+            column=randint(BORDERS, columns - 1 - BORDERS),
+            garbage_frame=choice(simulation.garbage_frames),
+            speed=uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED)
+        )
+
+    def spawn_bullet():
+        simulation.spawn_bullet(
+            rows - 2, randint(BORDERS + 1, columns - 2 - BORDERS)
+        )
+
+    scheduler.spawn(keep_alive(garbage, simulation.garbage, spawn_garbage))
+    scheduler.spawn(keep_alive(bullets, simulation.bullets, spawn_bullet))
+
+    keys = cycle([KEYS[key] for key in keys])
+
+    start = perf_counter()
+    for _ in range(ticks):
+        window.keys.append(next(keys))
+        tick_start = perf_counter() if profile else 0
+        simulation.step(read_controls(window))
+        simulated = perf_counter() if profile else 0
+        renderer.draw(simulation.get_snapshot())
+        if double_buffer:
+            compositor.flush()
+        else:
+            canvas.refresh()
+        if profile:
+            rendered = perf_counter()
+            profiler.add_phase('sim', simulated - tick_start)
+            profiler.add_phase('render', rendered - simulated)
+            profiler.add_tick(rendered - tick_start)
+    elapsed = perf_counter() - start
+    scheduler.close()
+
+    return {
+        **profiler.get_report(),
+        'ticks': ticks,
+        'ticks_per_second': ticks / elapsed,
+        'curses_calls': dict(window.calls),
+    }
+
+
+def print_report(report):
+    print(f'ticks: {report["ticks"]}, '
+          f'ticks per second: {report["ticks_per_second"]:.1f}')
+    if report['coroutines']:
+        print('tick, ms: ' + ', '.join(
+            f'{name} {elapsed:.3f}'
+            for name, elapsed in report['tick_percentiles_ms'].items()
+        ))
+    print(f'{"coroutine":>20} {"steps":>8} {"time, ms":>10}')
+    for kind, kind_stats in [
+        *report['coroutines'].items(), *report['phases'].items()
+    ]:
+        print(f'{kind:>20} {kind_stats["steps"]:>8} '
+              f'{kind_stats["time"] * 1000:>10.2f}')
+    print(f'{"curses call":>20} {"count":>8} {"per tick":>10}')
+    for name, count in sorted(report['curses_calls'].items()):
+        print(f'{name:>20} {count:>8} {count / report["ticks"]:>10.1f}')
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--columns', type=int, default=200)
+    parser.add_argument('--stars', type=int, default=100)
+    parser.add_argument('--garbage', type=int, default=20)
+    parser.add_argument('--bullets', type=int, default=10)
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument(
+        '--double-buffer', action='store_true',
+        help='draw through FrameBuffer and Compositor'
+    )
+    parser.add_argument(
+        '--keys', default='up,left,space,down,right',
+        help=f'comma separated keys pressed one per tick: {", ".join(KEYS)}'
+    )
+    parser.add_argument(
+        '--no-profile', action='store_true',
+        help='run on plain Scheduler, without timing coroutines'
+    )
+    parser.add_argument(
+        '--json', action='store_true', help='print report as JSON'
+    )
+    args = parser.parse_args()
+    report = run(
+        rows=args.rows,
+        columns=args.columns,
+        stars=args.stars,
+        garbage=args.garbage,
+        bullets=args.bullets,
+        ticks=args.ticks,
+        keys=args.keys.split(','),
+        double_buffer=args.double_buffer,
+        profile=not args.no_profile,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main_cli()
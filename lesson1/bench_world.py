@@ -0,0 +1,94 @@
+"""
+Render time of a screen over worlds of growing size with the same garbage
+density: snapshot of the camera view culled through the obstacles index
+vs snapshot of the whole world drawn with clipping. Simulation time is
+shown too, off-screen garbage still flies and collides.
+
+Run from repository root: python lesson1/bench_world.py
+"""
+from random import choice, randint, seed, uniform
+from time import perf_counter
+
+from camera import create_world
+from headless import HeadlessCanvas
+from render import Renderer
+from simulation import autopilot
+
+from config import MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+
+
+ROWS, COLUMNS = 50, 200
+WORLDS = ((1, 1), (2, 2), (4, 4), (8, 8))
+GARBAGE_PER_SCREEN = 60
+TICKS = 100
+
+
+def keep_garbage(game, number):
+    """Spawn garbage anywhere in the world up to the given number."""
+
+    for _ in range(number - len(game.garbage)):
+        game.spawn_garbage(
+            column=randint(0, game.columns - 1),
+            garbage_frame=choice(game.garbage_frames),
+            speed=uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED),
+            row=uniform(0, game.rows - 10),
+        )
+
+
+def get_unculled_snapshot(game, view):
+    """Snapshot of all entities moved to the view, as without culling."""
+
+    top, left, _, _ = view
+    snapshot = game.get_snapshot()
+    return snapshot._replace(sprites=[
+        (row - top, column - left, frame)
+        for row, column, frame in snapshot.sprites
+    ])
+
+
+def run(screens, culled):
+    seed(0)
+    game, camera = create_world(
+        ROWS, COLUMNS, screens, year=2020, god_mode=True
+    )
+    renderer = Renderer(HeadlessCanvas(ROWS, COLUMNS))
+    garbage_num = GARBAGE_PER_SCREEN * screens[0] * screens[1]
+    simulated = rendered = drawn = 0
+    try:
+        for _ in range(TICKS):
+            keep_garbage(game, garbage_num)
+            start = perf_counter()
+            game.step(autopilot())
+            middle = perf_counter()
+            camera.follow(game.ship)
+            if culled:
+                snapshot = game.get_snapshot(camera.get_view())
+            else:
+                snapshot = get_unculled_snapshot(game, camera.get_view())
+            renderer.draw(snapshot)
+            end = perf_counter()
+            simulated += middle - start
+            rendered += end - middle
+            drawn += len(snapshot.sprites)
+    finally:
+        game.close()
+    return simulated / TICKS, rendered / TICKS, drawn / TICKS, garbage_num
+
+
+def main():
+    print(f'{ROWS}x{COLUMNS} screen, {GARBAGE_PER_SCREEN} garbage per screen, '
+          f'ms per tick')
+    print(f'{"screens":>8} {"garbage":>8} {"sim":>7} {"render":>8} '
+          f'{"unculled":>9} {"sprites":>8} {"unculled":>9}')
+    for screens in WORLDS:
+        simulated, rendered, drawn, garbage_num = run(screens, True)
+        _, unculled, unculled_drawn, _ = run(screens, False)
+        print(
+            f'{screens[0]}x{screens[1]:<6} {garbage_num:>8} '
+            f'{simulated * 1000:>7.2f} {rendered * 1000:>8.2f} '
+            f'{unculled * 1000:>9.2f} {drawn:>8.0f} {unculled_drawn:>9.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
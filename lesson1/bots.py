@@ -0,0 +1,100 @@
+"""
+Swarm of bot ships for load and gameplay tests: every bot flies to its
+own random target and picks a new one when it gets there. Positions,
+speeds and targets are arrays, directions of all bots are found and
+speeds are updated by update_speeds() in one call per tick.
+"""
+from array import array
+from itertools import compress, count
+from operator import not_, or_
+import random
+
+from phisics import update_speeds
+
+
+class BotSwarm:
+    """Bots flying ships in the box of rows and columns."""
+
+    def __init__(self, number, rows, columns, speed_limit=2, rng=None,
+                 curve_steps=None):
+        self.rows = rows
+        self.columns = columns
+        self.speed_limit = speed_limit
+        # see update_speeds()
+        self.curve_steps = curve_steps
+        self.rng = rng or random
+        rng = self.rng
+        self.ship_rows = get_uniforms(rng, number, rows - 1)
+        self.ship_columns = get_uniforms(rng, number, columns - 1)
+        self.rows_speeds = array('d', [0]) * number
+        self.columns_speeds = array('d', [0]) * number
+        self.target_rows = get_uniforms(rng, number, rows - 1)
+        self.target_columns = get_uniforms(rng, number, columns - 1)
+
+    def __len__(self):
+        return len(self.ship_rows)
+
+    def get_directions(self, dead_zone=1):
+        """
+        Return rows and columns directions of bots towards their targets,
+        a bot doesn`t push along the axis it is within dead_zone of.
+        """
+
+        return (
+            get_directions(self.ship_rows, self.target_rows, dead_zone),
+            get_directions(self.ship_columns, self.target_columns, dead_zone),
+        )
+
+    def retarget(self, indices):
+        """Give new random targets to bots of the indices."""
+
+        rng = self.rng
+        for index in indices:
+            self.target_rows[index] = rng.uniform(0, self.rows - 1)
+            self.target_columns[index] = rng.uniform(0, self.columns - 1)
+
+    def step(self):
+        """Steer, accelerate and move all bots by one tick."""
+
+        rows_directions, columns_directions = self.get_directions()
+        update_speeds(
+            self.rows_speeds, self.columns_speeds,
+            rows_directions, columns_directions,
+            self.speed_limit, self.speed_limit,
+            curve_steps=self.curve_steps
+        )
+        self.ship_rows = move(self.ship_rows, self.rows_speeds, self.rows - 1)
+        self.ship_columns = move(
+            self.ship_columns, self.columns_speeds, self.columns - 1
+        )
+        # bots which don`t push at all are at their targets
+        arrived = compress(
+            count(), map(not_, map(or_, rows_directions, columns_directions))
+        )
+        self.retarget(arrived)
+
+
+def get_uniforms(rng, number, high):
+    """Return array of number random positions from 0 to high."""
+
+    return array('d', (rng.uniform(0, high) for _ in range(number)))
+
+
+def get_directions(positions, targets, dead_zone=1):
+    """Return array of -1, 0 or 1 pushing positions towards targets."""
+
+    return array('b', [
+        (distance > dead_zone) - (distance < -dead_zone)
+        for distance in map(float.__sub__, targets, positions)
+    ])
+
+
+def move(positions, speeds, max_position):
+    """Return positions moved by speeds, kept from 0 to max_position."""
+
+    return array('d', [
+        0 if position < 0
+        else max_position if position > max_position
+        else position
+        for position in map(float.__add__, positions, speeds)
+    ])
@@ -0,0 +1,64 @@
+from simulation import create_simulation
+
+from config import GARBAGE_WORKERS
+
+
+class Camera:
+    """
+    Part of the world seen on the screen. It follows the target, but
+    moves only when the target leaves the middle of the screen, so the
+    picture isn`t redrawn on every step of the ship. Camera never shows
+    anything outside the world.
+    """
+
+    def __init__(self, rows, columns, world_rows, world_columns):
+        self.rows = rows
+        self.columns = columns
+        self.world_rows = world_rows
+        self.world_columns = world_columns
+        self.top = 0
+        self.left = 0
+        # target is kept at least that far from the screen edges
+        self.margin_rows = rows // 4
+        self.margin_columns = columns // 4
+
+    def get_view(self):
+        """Return view for Simulation.get_snapshot()."""
+
+        return self.top, self.left, self.rows, self.columns
+
+    def follow(self, entity):
+        """Move the camera to keep the entity center in the middle."""
+
+        row, column = entity.row, entity.column
+        if entity.frame is not None:
+            row += entity.frame.rows / 2
+            column += entity.frame.columns / 2
+
+        top = min(
+            max(self.top, round(row) + self.margin_rows - self.rows),
+            round(row) - self.margin_rows
+        )
+        left = min(
+            max(self.left, round(column) + self.margin_columns - self.columns),
+            round(column) - self.margin_columns
+        )
+        self.top = max(0, min(top, self.world_rows - self.rows))
+        self.left = max(0, min(left, self.world_columns - self.columns))
+
+
+def create_world(rows, columns, screens=(1, 1), **simulation_options):
+    """
+    Return simulation of the world made of screens — rows and columns of
+    them — and camera for the screen of the given size. Garbage workers
+    are given to every screen.
+    """
+    screens_rows, screens_columns = screens
+    world_rows, world_columns = rows * screens_rows, columns * screens_columns
+    simulation_options.setdefault(
+        'garbage_workers', GARBAGE_WORKERS * screens_rows * screens_columns
+    )
+    simulation = create_simulation(
+        world_rows, world_columns, screen_columns=columns, **simulation_options
+    )
+    return simulation, Camera(rows, columns, world_rows, world_columns)
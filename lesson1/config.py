@@ -7,6 +7,35 @@ SPEED = 5
 # 0 for disable borders
 BORDERS = 0
 TIC_TIMEOUT = 0.1
+# frames per second drawn at most, and at least when the game is behind
+RENDER_RATE = 10
+MIN_RENDER_RATE = 2
+# CSV file for lateness of every tick on exit, None to skip it
+PACING_DUMP = None
+# draw into frame buffer and send only changed cells to terminal: True,
+# False, or None for TERMINAL 'ansi' and RECORD only — curses already
+# diffs its own screen, the buffer saves it ~1% of bytes for 2x CPU
+DOUBLE_BUFFER = None
+# 'curses', or 'ansi' to write escape sequences with one syscall per frame
+TERMINAL = 'curses'
+# run the game in a worker process, terminal is drawn from shared memory
+SIMULATION_PROCESS = False
+# 'coroutines' for a coroutine per entity, or 'ecs' for component tables
+# updated by systems once per tick
+ENGINE = 'coroutines'
+# file to record controls and screen changes to, None to skip it;
+# not with DOUBLE_BUFFER False, the game in a worker process isn`t recorded
+RECORD = None
+# ticks between keyframes of the recording, reading can start from them
+RECORD_KEYFRAME_TICKS = 100
+# records waiting for the writer thread, further ones are dropped
+RECORD_QUEUE_SIZE = 256
+# time coroutines and tick phases, show them in the panel near year info
+PROFILE = False
+# JSON file for profile on exit, None to skip it
+PROFILE_DUMP = 'lesson1/profile.json'
+# world size in screens, rows and columns of them, the screen follows the ship
+WORLD_SCREENS = (1, 1)
 STARS = '+*.:'
 STARS_NUM = 100
 
@@ -22,6 +51,24 @@ PHRASES = {
     2020: "Take the plasma gun! Shoot the garbage!",
 }
 
+# long-lived workers for garbage and gun shots
+GARBAGE_WORKERS = 200
+BULLET_WORKERS = 100
+# spawns waiting for a free worker, further spawns are dropped
+SPAWN_QUEUE_SIZE = 0
+# explosion particles alive at once, more are not spawned
+PARTICLES_CAPACITY = 16384
+MAX_BEEPS_PER_TICK = 1
+
 MIN_GARBAGE_SPEED = 0.2
 MAX_GARBAGE_SPEED = 0.7
 FRAMES_DIR = 'lesson1/frames'
+# compiled frames, rebuilt from FRAMES_DIR when frame files change
+ASSETS_PACK = 'lesson1/frames.pack'
+
+# game server: address, screen of every session and bytes queued for a
+# client, frames of the client are dropped while it is over that
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_SCREEN = (24, 80)
+SERVER_MAX_PENDING = 65536
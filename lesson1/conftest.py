@@ -0,0 +1,10 @@
+"""
+Modules of lesson1 import each other by flat names, as when they are run
+from lesson1/. pytest run from repository root imports tests as modules
+of lesson1 package, so the directory is put on the path for them.
+"""
+import os
+import sys
+
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
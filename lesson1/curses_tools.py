@@ -1,4 +1,6 @@
-from phisics import update_speed
+from functools import lru_cache
+import curses
+import re
 
 SPACE_KEY_CODE = 32
 LEFT_KEY_CODE = 260
@@ -7,39 +9,124 @@ UP_KEY_CODE = 259
 DOWN_KEY_CODE = 258
 
 
+SPAN_PATTERN = re.compile(r'[^ ]+')
+
+
+class Sprite:
+    """
+    Multiline text fragment compiled for drawing: non-blank symbols
+    are stored as horizontal runs (row, column, text). Mask has an int
+    per row with bits set from the first to the last non-blank symbol,
+    bit 0 is the leftmost column. Mask is None when the sprite fills its
+    box, collisions of the box are exact then.
+    """
+
+    __slots__ = ('text', 'rows', 'columns', 'runs', 'mask')
+
+    def __init__(self, text):
+        lines = text.splitlines()
+        self.text = text
+        self.rows = len(lines)
+        self.columns = max([len(line) for line in lines], default=0)
+        self.runs = tuple(
+            (row, match.start(), match.group())
+            for row, line in enumerate(lines)
+            for match in SPAN_PATTERN.finditer(line)
+        )
+        self.mask = get_mask(self.rows, self.columns, self.runs)
+
+    @classmethod
+    def from_runs(cls, text, rows, columns, runs):
+        """Create Sprite from already compiled runs, skip parsing text."""
+
+        sprite = cls.__new__(cls)
+        sprite.text = text
+        sprite.rows = rows
+        sprite.columns = columns
+        sprite.runs = runs
+        sprite.mask = get_mask(rows, columns, runs)
+        return sprite
+
+    def __repr__(self):
+        return f'Sprite({self.text!r})'
+
+
+def get_mask(rows, columns, runs):
+    """Return occupancy bits of every row, None for a full box, see Sprite."""
+
+    starts, ends = [None] * rows, [0] * rows
+    for row, column, run in runs:
+        if starts[row] is None:
+            starts[row] = column
+        ends[row] = column + len(run)
+    mask = tuple(
+        0 if start is None else (1 << end) - (1 << start)
+        for start, end in zip(starts, ends)
+    )
+    if all(bits == (1 << columns) - 1 for bits in mask):
+        return None
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def compile_frame(text):
+    """Return memoized Sprite for the text."""
+
+    return Sprite(text)
+
+
 def get_frames(file_names):
     frames = []
     for file_name in file_names:
         with open(file_name, 'r', encoding='utf-8') as file:
-            frames.append(file.read())
+            frames.append(compile_frame(file.read()))
     return frames
 
 
 def get_frame_size(text):
     """
-    Calculate size of multiline text fragment,
+    Calculate size of multiline text fragment or Sprite,
     return pair — number of rows and colums.
     """
 
-    lines = text.splitlines()
-    rows = len(lines)
-    columns = max([len(line) for line in lines])
-    return rows, columns
+    sprite = text if isinstance(text, Sprite) else compile_frame(text)
+    return sprite.rows, sprite.columns
 
 
-def read_controls(canvas, row_speed, column_speed, speed):
-    """Read keys pressed and returns tuple witl controls state."""
+def beep():
+    """Ring the bell, silently skip if there is no curses terminal."""
+
+    try:
+        curses.beep()
+    except curses.error:
+        pass
 
-    rows_direction = columns_direction = 0
-    space_pressed = False
 
+def read_controls(canvas):
+    """
+    Read keys pressed and returns tuple with controls state:
+    rows direction, columns direction and whether space was pressed.
+    """
+
+    key_codes = []
     while True:
         pressed_key_code = canvas.getch()
 
         if pressed_key_code == -1:
             # https://docs.python.org/3/library/curses.html#curses.window.getch
             break
+        key_codes.append(pressed_key_code)
+
+    return get_controls(key_codes)
 
+
+def get_controls(key_codes):
+    """Return controls state for keys pressed, as read_controls() does."""
+
+    rows_direction = columns_direction = 0
+    space_pressed = False
+
+    for pressed_key_code in key_codes:
         if pressed_key_code == UP_KEY_CODE:
             rows_direction = -1
 
@@ -55,47 +142,45 @@ def read_controls(canvas, row_speed, column_speed, speed):
         if pressed_key_code == SPACE_KEY_CODE:
             space_pressed = True
 
-    return (
-        *update_speed(
-            row_speed, column_speed,
-            rows_direction, columns_direction,
-            row_speed_limit=speed,
-            column_speed_limit=speed
-        ),
-        space_pressed)
+    return rows_direction, columns_direction, space_pressed
 
 
 def draw_frame(canvas, start_row, start_column, text, negative=False):
     """
-    Draw multiline text fragment on canvas, erase text instead
+    Draw multiline text fragment or Sprite on canvas, erase text instead
     of drawing if negative=True is specified.
     """
 
+    sprite = text if isinstance(text, Sprite) else compile_frame(text)
     rows_number, columns_number = canvas.getmaxyx()
-
-    for row, line in enumerate(text.splitlines(), round(start_row)):
+    start_row, start_column = round(start_row), round(start_column)
+    if (start_row >= rows_number or start_row + sprite.rows <= 0
+            or start_column >= columns_number
+            or start_column + sprite.columns <= 0):
+        return
+
+    for row_offset, column_offset, run in sprite.runs:
+        row = start_row + row_offset
         if row < 0:
             continue
 
         if row >= rows_number:
             break
 
-        for column, symbol in enumerate(line, round(start_column)):
-            if column < 0:
-                continue
+        column = start_column + column_offset
+        end_column = column + len(run)
+        if column < 0:
+            run = run[-column:]
+            column = 0
 
-            if column >= columns_number:
-                break
+        # Curses will raise exception on drawing in a lower right corner
+        # of the window. Don`t ask why…
+        # https://docs.python.org/3/library/curses.html#curses.window.addch
+        max_column = columns_number - 1 if row == rows_number - 1 else columns_number
+        if end_column > max_column:
+            run = run[:max_column - end_column]
 
-            if symbol == ' ':
-                continue
-
-            # Check that current position it is not in a lower right corner
-            # of the window
-            # Curses will raise exception in that case. Don`t ask why…
-            # https://docs.python.org/3/library/curses.html#curses.window.addch
-            if row == rows_number - 1 and column == columns_number - 1:
-                continue
+        if not run:
+            continue
 
-            symbol = symbol if not negative else ' '
-            canvas.addch(row, column, symbol)
+        canvas.addstr(row, column, run if not negative else ' ' * len(run))
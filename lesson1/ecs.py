@@ -0,0 +1,509 @@
+"""
+Entity-component-system engine, alternative to Simulation with its
+coroutine per entity. Garbage and bullets are rows of component tables:
+position, velocity, sprite, collider and lifetime are columns, arrays
+for numbers. Systems run once per tick over whole columns: movement,
+collision, lifetime expiry, and snapshot for rendering. Stars are
+blinked by StarField and explosions are ParticleSystem, both are
+systems over arrays already.
+
+Systems run in the order coroutines of Simulation are stepped in —
+year, garbage spawner, spaceship, garbage, bullets — so both engines
+play the same game tick for tick, see replay.py.
+"""
+from array import array
+from collections import deque
+from itertools import compress
+from math import floor
+from operator import add, attrgetter
+import random
+
+from curses_tools import compile_frame, get_frame_size
+from explosion import EXPLOSION_TICS, explode
+from obstacles import Obstacle, ObstacleStore
+from particles import ParticleSystem
+from phisics import update_speed
+from simulation import TICS_PER_YEAR, Entity, Snapshot
+from utils import validate_value, get_garbage_delay_tics
+
+from config import (
+    GOD_MODE,
+    DEBUG,
+    DEBUG_YEAR,
+    SPEED,
+    BORDERS,
+    MIN_GARBAGE_SPEED,
+    MAX_GARBAGE_SPEED,
+    GARBAGE_WORKERS,
+    BULLET_WORKERS,
+    PARTICLES_CAPACITY,
+    MAX_BEEPS_PER_TICK,
+)
+
+
+class Table:
+    """
+    Components of entities: a column per component, a row per entity.
+    Columns with typecode are arrays, others are lists. Rows keep their
+    order, dead ones are dropped from all columns at once. Entities over
+    capacity are not added and counted.
+    """
+
+    def __init__(self, capacity, **typecodes):
+        self.capacity = capacity
+        self.typecodes = typecodes
+        self.dropped = 0
+        for name, typecode in typecodes.items():
+            setattr(self, name, array(typecode) if typecode else [])
+
+    def __len__(self):
+        return len(getattr(self, next(iter(self.typecodes))))
+
+    def append(self, **values):
+        for name, value in values.items():
+            getattr(self, name).append(value)
+
+    def keep(self, alive):
+        """Drop rows which alive flag is false."""
+
+        for name, typecode in self.typecodes.items():
+            column = compress(getattr(self, name), alive)
+            setattr(self, name, array(typecode, column) if typecode else list(column))
+
+
+class EcsSimulation:
+    """
+    Game state with the interface of Simulation: step(), get_snapshot(),
+    spawn_garbage() and spawn_bullet(). Entities spawned on a tick are
+    added on the same tick, garbage takes rows of the garbage dropped
+    on it first, as a pool worker takes the next job once it is free.
+    """
+
+    def __init__(self, rows, columns, garbage_frames, spaceship_frames,
+                 year=None, god_mode=GOD_MODE, debug=DEBUG,
+                 garbage_workers=GARBAGE_WORKERS,
+                 bullet_workers=BULLET_WORKERS, screen_columns=None,
+                 garbage_rate=None, fire_rate=None, rng=None):
+        self.rows = rows
+        self.columns = columns
+        self.garbage_frames = garbage_frames
+        self.spaceship_frames = spaceship_frames
+        self.god_mode = god_mode
+        self.debug = debug
+        self.year = year or (DEBUG_YEAR if debug else 1957)
+        self.rng = rng or random
+        self.garbage_per_spawn = max(1, round(columns / (screen_columns or columns)))
+        self.garbage_rate = garbage_rate
+        self.fire_rate = fire_rate
+        self.tick = 0
+
+        self.garbage = Table(
+            garbage_workers,
+            row='d', column='d', speed='d', obstacle=None, reindex_row='d'
+        )
+        self.bullets = Table(
+            bullet_workers,
+            row='d', column='d', rows_speed='d', columns_speed='d',
+            frame=None, age='L', armed='B', hit='B'
+        )
+        self.new_garbage = deque()
+        self.new_bullets = []
+        self.obstacles = ObstacleStore()
+        # sprites of garbage by collider: snapshot of a view finds garbage
+        # in it through obstacles
+        self.obstacle_frames = {}
+        self.obstacles_in_last_collisions = set()
+        self.particles = ParticleSystem(PARTICLES_CAPACITY, self.rng)
+        self.controls = (0, 0, False)
+        self.beeps = 0
+        self.game_over = False
+
+        self.spawner_tick = self.spawner_wait = 0
+        self.spawner_armed = False
+        self.spawns_due = 0
+
+        frame_rows, frame_columns = get_frame_size(spaceship_frames[0])
+        self.ship = Entity(
+            rows // 2 - frame_rows // 2, columns // 2 - frame_columns // 2
+        )
+        self.ship_shown = True
+        self.ship_speeds = (0, 0)
+        self.ship_steps = 0
+        self.ship_death_tick = None
+        self.shots_due = 0
+
+    def step(self, controls=(0, 0, False)):
+        """
+        Advance the game by one tick. Controls are rows direction, columns
+        direction and fire flag, as returned by read_controls().
+        """
+
+        self.controls = controls
+        self.beeps = 0
+        self.particles.step()
+        # spawner waiting longer than a year has been due before the year
+        # counter, coroutines of Simulation run in this order
+        if self.spawner_wait > TICS_PER_YEAR:
+            self.fill_orbit_with_garbage()
+            self.count_years()
+        else:
+            self.count_years()
+            self.fill_orbit_with_garbage()
+        self.run_spaceship()
+        self.fly_garbage()
+        self.fly_bullets()
+        self.tick += 1
+        self.collide_bullets()
+
+    @property
+    def busy(self):
+        """Number of garbage and bullets, rows of the tables."""
+
+        return len(self.garbage) + len(self.bullets)
+
+    @property
+    def dropped(self):
+        """Number of garbage and gun shots dropped by full tables."""
+
+        return self.garbage.dropped + self.bullets.dropped
+
+    def close(self):
+        """Nothing to close, for the interface of Simulation."""
+
+    def beep(self):
+        """Ask for a beep, at most MAX_BEEPS_PER_TICK are made per tick."""
+
+        if self.beeps < MAX_BEEPS_PER_TICK:
+            self.beeps += 1
+
+    def spawn_garbage(self, column, garbage_frame, speed=0.5, row=BORDERS):
+        """Add garbage on this tick, return False if it is dropped."""
+
+        table = self.garbage
+        if len(table) + len(self.new_garbage) >= table.capacity:
+            table.dropped += 1
+            return False
+        self.new_garbage.append((row, column, garbage_frame, speed))
+        return True
+
+    def spawn_bullet(self, row, column, rows_speed=-2, columns_speed=0):
+        """Add gun shot on this tick, return False if it is dropped."""
+
+        table = self.bullets
+        if len(table) + len(self.new_bullets) >= table.capacity:
+            table.dropped += 1
+            return False
+        self.new_bullets.append((row, column, rows_speed, columns_speed))
+        return True
+
+    def count_years(self):
+        if self.tick and not self.tick % TICS_PER_YEAR:
+            self.year += 1
+
+    def fill_orbit_with_garbage(self):
+        """Spawn garbage by the year schedule or by garbage_rate."""
+
+        if self.garbage_rate is not None:
+            if self.tick:
+                self.spawns_due += self.garbage_rate
+                spawns, self.spawns_due = int(self.spawns_due), self.spawns_due % 1
+                self.spawn_orbit_garbage(spawns)
+            return
+
+        if self.tick != self.spawner_tick:
+            return
+        if self.spawner_armed:
+            self.spawn_orbit_garbage(self.garbage_per_spawn)
+        garbage_delay = get_garbage_delay_tics(self.year)
+        self.spawner_armed = bool(garbage_delay)
+        self.spawner_wait = garbage_delay or 1
+        self.spawner_tick = self.tick + self.spawner_wait
+
+    def spawn_orbit_garbage(self, number):
+        rng = self.rng
+        for _ in range(number):
+            self.spawn_garbage(
+                column=rng.randint(BORDERS, self.columns-1-BORDERS),
+                garbage_frame=rng.choice(self.garbage_frames),
+                speed=rng.uniform(MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED)
+            )
+
+    def run_spaceship(self):
+        """Collide the ship with garbage, move it by controls and fire."""
+
+        if self.ship_death_tick is not None:
+            if self.tick == self.ship_death_tick + EXPLOSION_TICS:
+                self.game_over = True
+            return
+
+        ship, frames = self.ship, self.spaceship_frames
+        frame_rows, frame_columns = get_frame_size(frames[0])
+        if self.ship_steps and not self.god_mode:
+            # ship collides where it has been drawn on the previous tick
+            collisions = self.obstacles.query_rect(
+                ship.row, ship.column, frame_rows, frame_columns,
+                ship.frame.mask
+            )
+            if collisions:
+                self.obstacles_in_last_collisions.update(collisions)
+                self.ship_shown = False
+                explode(
+                    self,
+                    ship.row + frame_rows // 2,
+                    ship.column + frame_columns // 2
+                )
+                self.ship_death_tick = self.tick
+                return
+
+        rows_direction, columns_direction, action_fire = self.controls
+        rows_speed, columns_speed = self.ship_speeds = update_speed(
+            *self.ship_speeds,
+            rows_direction, columns_direction,
+            row_speed_limit=SPEED,
+            column_speed_limit=SPEED
+        )
+        ship.row = validate_value(
+            ship.row+rows_speed,
+            BORDERS,
+            self.rows-frame_rows-BORDERS
+        )
+        ship.column = validate_value(
+            ship.column+columns_speed,
+            BORDERS,
+            self.columns-frame_columns-BORDERS
+        )
+        # every frame is shown twice, as cycle_with_repeat(repeat=2) does
+        ship.frame = frames[self.ship_steps // 2 % len(frames)]
+        self.ship_steps += 1
+
+        if self.fire_rate is not None:
+            self.shots_due += self.fire_rate
+            shots, self.shots_due = int(self.shots_due), self.shots_due % 1
+        else:
+            shots = int(action_fire and (self.year > 2019 or self.god_mode))
+        for shot in range(shots):
+            self.spawn_bullet(
+                ship.row,
+                ship.column + frame_columns * (2 * shot + 1) // (2 * shots)
+            )
+
+    def fly_garbage(self):
+        """
+        Move garbage by its speed, explode garbage hit on the previous
+        tick, drop garbage fallen to the bottom. New garbage takes rows
+        of the dropped one, as a pool worker takes the next job as soon
+        as it is free, the rest is added after all.
+        """
+
+        table, obstacles, jobs = self.garbage, self.obstacles, self.new_garbage
+        if len(table):
+            table.row = rows = array('d', map(add, table.row, table.speed))
+            reindex_rows = table.reindex_row
+            obstacle_rows = obstacles.rows
+            collided = self.obstacles_in_last_collisions
+            max_row = self.rows - 1
+            alive = None
+            for index, (obstacle, hit) in enumerate(zip(
+                table.obstacle, map(collided.__contains__, table.obstacle)
+            )):
+                row = rows[index]
+                if hit:
+                    collided.remove(obstacle)
+                    explode(
+                        self,
+                        row + obstacles.rows_sizes[obstacle.index] // 2,
+                        table.column[index]
+                        + obstacles.columns_sizes[obstacle.index] // 2
+                    )
+                elif row < max_row:
+                    # grid cells of garbage change only near cell borders
+                    if row < reindex_rows[index]:
+                        obstacle_rows[obstacle.index] = row
+                    else:
+                        obstacles.move(obstacle, row)
+                        reindex_rows[index] = self.get_reindex_row(obstacle)
+                    continue
+                del self.obstacle_frames[obstacle]
+                obstacles.remove(obstacle)
+
+                garbage = self.start_garbage(jobs)
+                if garbage:
+                    (rows[index], table.column[index], table.speed[index],
+                     table.obstacle[index], reindex_rows[index]) = garbage
+                    continue
+                if alive is None:
+                    alive = [True] * len(rows)
+                alive[index] = False
+            if alive:
+                table.keep(alive)
+
+        while jobs:
+            garbage = self.start_garbage(jobs)
+            if garbage:
+                row, column, speed, obstacle, reindex_row = garbage
+                table.append(
+                    row=row, column=column, speed=speed,
+                    obstacle=obstacle, reindex_row=reindex_row
+                )
+
+    def start_garbage(self, jobs):
+        """
+        Add the first of spawned garbage to obstacles, return its row,
+        column, speed, obstacle and reindex row. Garbage spawned below the screen is
+        dropped at once, None is returned when no garbage is left.
+        """
+
+        while jobs:
+            row, column, frame, speed = jobs.popleft()
+            column = max(column, BORDERS)
+            column = min(column, self.columns - 1 - BORDERS)
+            rows_size, columns_size = get_frame_size(frame)
+            obstacle = self.obstacles.add(
+                row, column, rows_size, columns_size, mask=frame.mask
+            )
+            if row < self.rows - 1:
+                self.obstacle_frames[obstacle] = frame
+                return row, column, speed, obstacle, self.get_reindex_row(obstacle)
+            self.obstacles.remove(obstacle)
+        return None
+
+    def get_reindex_row(self, obstacle):
+        """
+        Return row of falling obstacle from which its grid cells may
+        change, before it the obstacle is moved without reindexing.
+        """
+
+        cell_size = self.obstacles.grid.cell_size
+        row, rows_size = obstacle.row, obstacle.rows_size
+        # half a row earlier, float sums may round over the cell border
+        return min(
+            (floor(row / cell_size) + 1) * cell_size,
+            (floor((row + rows_size) / cell_size) + 1) * cell_size - rows_size
+        ) - 0.5
+
+    def fly_bullets(self):
+        """
+        Age bullets: a shot is shown as '*' and 'O' for a tick each, then
+        flies and is armed from the next tick. Drop hit bullets and the
+        ones which left the screen, then add the new ones.
+        """
+
+        table = self.bullets
+        if len(table):
+            if any(table.hit):
+                table.keep([not hit for hit in table.hit])
+            table.age = ages = array('L', [age + 1 for age in table.age])
+            table.armed = array('B', [age > 2 for age in ages])
+
+            # ages don`t grow along the table, bullets of the last tick
+            # are at its end and don`t move yet
+            moving = len(ages)
+            while moving and ages[moving - 1] < 2:
+                table.frame[moving - 1] = compile_frame('O')
+                moving -= 1
+            rows = array('d', map(add, table.row[:moving], table.rows_speed[:moving]))
+            columns = array(
+                'd', map(add, table.column[:moving], table.columns_speed[:moving])
+            )
+            for index in range(moving - 1, -1, -1):
+                if ages[index] != 2:
+                    break
+                table.frame[index] = compile_frame(
+                    '-' if table.columns_speed[index] else '|'
+                )
+                self.beep()
+
+            max_row = self.rows - 1 - BORDERS
+            max_column = self.columns - 1 - BORDERS
+            alive = [
+                BORDERS < row < max_row and BORDERS < column < max_column
+                for row, column in zip(rows, columns)
+            ]
+            table.row[:moving] = rows
+            table.column[:moving] = columns
+            if not all(alive):
+                table.keep(alive + [True] * (len(ages) - moving))
+
+        for row, column, rows_speed, columns_speed in self.new_bullets:
+            table.append(
+                row=row, column=column,
+                rows_speed=rows_speed, columns_speed=columns_speed,
+                frame=compile_frame('*'), age=0, armed=0, hit=0
+            )
+        self.new_bullets.clear()
+
+    def collide_bullets(self):
+        """
+        Collide armed bullets with garbage at once, hit bullets disappear,
+        hit garbage is marked in obstacles_in_last_collisions.
+        """
+
+        table = self.bullets
+        armed = sum(table.armed)
+        if not armed or not self.obstacles:
+            return
+
+        # armed bullets are the oldest ones, at the start of the table
+        hits = self.obstacles.collide_points(
+            table.row[:armed], table.column[:armed]
+        )
+        for index, obstacle in hits:
+            table.hit[index] = 1
+            table.frame[index] = None
+            self.obstacles_in_last_collisions.add(obstacle)
+
+    def get_snapshot(self, view=None):
+        """
+        Return state to draw, as Simulation.get_snapshot() does: garbage
+        in order of creation, then the ship and bullets.
+        """
+
+        ship, bullets = self.ship, self.bullets
+        entities = [
+            (row, column, frame)
+            for row, column, frame in zip(bullets.row, bullets.column, bullets.frame)
+            if frame is not None
+        ]
+        if self.ship_shown and ship.frame is not None:
+            entities.insert(0, (ship.row, ship.column, ship.frame))
+
+        if view is None:
+            top = left = 0
+            obstacles = list(self.obstacles)
+            # in order of creation, as Simulation draws it
+            garbage = sorted(self.garbage.obstacle, key=attrgetter('uid'))
+        else:
+            top, left, rows, columns = view
+            bottom, right = top + rows, left + columns
+            garbage = obstacles = self.obstacles.query_box(
+                top, left, rows, columns
+            )
+            entities = [
+                (row, column, frame) for row, column, frame in entities
+                if top - frame.rows < row < bottom
+                and left - frame.columns < column < right
+            ]
+
+        obstacle_rows, obstacle_columns = self.obstacles.rows, self.obstacles.columns
+        frames = self.obstacle_frames
+        sprites = [
+            (obstacle_rows[obstacle.index] - top,
+             obstacle_columns[obstacle.index] - left,
+             frames[obstacle])
+            for obstacle in garbage
+        ]
+        sprites.extend(
+            (row - top, column - left, frame) for row, column, frame in entities
+        )
+        if self.debug:
+            sprites.extend(
+                (row - top, column - left, compile_frame(frame))
+                for row, column, frame in map(
+                    Obstacle.dump_bounding_box, obstacles
+                )
+            )
+        return Snapshot(
+            self.tick, self.year, sprites,
+            self.particles.get_snapshot(top, left),
+            self.beeps, self.game_over
+        )
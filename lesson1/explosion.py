@@ -1,46 +1,15 @@
-import asyncio
-import curses
-from curses_tools import draw_frame, get_frame_size
+# symbols of the old explosion frames, taken by particles in turn
+EXPLOSION_GLYPHS = b'(()_)('
+EXPLOSION_PARTICLES = 16
+# particles live 4-8 tics, as long as the old four blinking frames
+EXPLOSION_TICS = 8
 
-from config import TIC_TIMEOUT
 
-EXPLOSION_FRAMES = [
-    """\
-           (_)
-       (  (   (  (
-      () (  (  )
-        ( )  ()
-    """,
-    """\
-           (_)
-       (  (   (
-         (  (  )
-          )  (
-    """,
-    """\
-            (
-          (   (
-         (     (
-          )  (
-    """,
-    """\
-            (
-              (
-            (
-    """,
-]
+def explode(simulation, center_row, center_column):
+    """Burst explosion particles from the center, doesn`t block caller."""
 
-
-async def explode(canvas, center_row, center_column):
-    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
-    corner_row = center_row - rows / 2
-    corner_column = center_column - columns / 2
-
-    curses.beep()
-    for frame in EXPLOSION_FRAMES:
-
-        draw_frame(canvas, corner_row, corner_column, frame)
-
-        await asyncio.sleep(TIC_TIMEOUT)
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
-        await asyncio.sleep(TIC_TIMEOUT)
+    simulation.particles.burst(
+        center_row, center_column,
+        EXPLOSION_PARTICLES, EXPLOSION_GLYPHS, EXPLOSION_TICS
+    )
+    simulation.beep()
@@ -0,0 +1,106 @@
+from collections import Counter, deque
+import curses
+
+
+class _BaseCanvas:
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def _is_inside(self, row, column, length=1):
+        return (0 <= row < self.rows and 0 <= column
+                and column + length <= self.columns)
+
+    def _check_position(self, row, column, length=1):
+        # curses can`t move the cursor past the lower right corner after
+        # writing there, so it returns ERR too
+        if not self._is_inside(row, column, length) or (
+            row == self.rows - 1 and column + length == self.columns
+        ):
+            raise curses.error(f'addwstr() returned ERR at {row}, {column}')
+
+    def addch(self, row, column, symbol, attr=0):
+        self.calls['addch'] += 1
+        self._check_position(row, column)
+        self._put(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        self.calls['addstr'] += 1
+        self._check_position(row, column, len(text))
+        self._put(row, column, text, attr)
+
+    def derwin(self, nlines, ncols, begin_y, begin_x):
+        self.calls['derwin'] += 1
+        if not (self._is_inside(begin_y, begin_x, ncols)
+                and self._is_inside(begin_y + nlines - 1, begin_x, ncols)):
+            raise curses.error('derwin() returned ERR')
+        return DerivedCanvas(self, nlines, ncols, begin_y, begin_x)
+
+    def border(self):
+        self.calls['border'] += 1
+        rows, columns = self.getmaxyx()
+        line = '+' + '-' * (columns - 2) + '+'
+        self._put(0, 0, line)
+        for row in range(1, rows - 1):
+            self._put(row, 0, '|')
+            self._put(row, columns - 1, '|')
+        self._put(rows - 1, 0, line)
+
+    def refresh(self):
+        self.calls['refresh'] += 1
+
+    def noutrefresh(self):
+        self.calls['noutrefresh'] += 1
+
+    def nodelay(self, flag):
+        self.calls['nodelay'] += 1
+
+
+class HeadlessCanvas(_BaseCanvas):
+    """
+    In-memory replacement of curses window for running the game without
+    terminal. Keeps a grid of symbols with attributes, counts curses calls
+    and returns pressed keys from the `keys` queue.
+    """
+
+    def __init__(self, rows, columns, keys=()):
+        self.rows = rows
+        self.columns = columns
+        self.symbols = [[' '] * columns for _ in range(rows)]
+        self.attrs = [[0] * columns for _ in range(rows)]
+        self.keys = deque(keys)
+        self.calls = Counter()
+
+    def _put(self, row, column, text, attr=0):
+        end_column = column + len(text)
+        self.symbols[row][column:end_column] = text
+        self.attrs[row][column:end_column] = [attr] * len(text)
+
+    def getch(self):
+        self.calls['getch'] += 1
+        if self.keys:
+            return self.keys.popleft()
+        return -1
+
+    def get_text(self):
+        return '\n'.join(''.join(line) for line in self.symbols)
+
+
+class DerivedCanvas(_BaseCanvas):
+    """Subwindow created by derwin(), shares symbols with its parent."""
+
+    def __init__(self, parent, rows, columns, begin_row, begin_column):
+        self.parent = parent
+        self.rows = rows
+        self.columns = columns
+        self.begin_row = begin_row
+        self.begin_column = begin_column
+        self.calls = parent.calls
+
+    def _put(self, row, column, text, attr=0):
+        self.parent._put(
+            self.begin_row + row, self.begin_column + column, text, attr
+        )
+
+    def getch(self):
+        return self.parent.getch()
@@ -0,0 +1,98 @@
+"""
+Event-driven keyboard input. Stdin is registered in the event loop, keys
+are read from the window as soon as they arrive and kept with the time
+of arrival until the next tick consumes them, ticks don`t poll getch().
+"""
+from array import array
+import sys
+from time import perf_counter
+
+from curses_tools import get_controls
+
+
+class KeyRing:
+    """
+    Ring buffer of key codes with timestamps. When it is full, the oldest
+    key is dropped to make room for the new one.
+    """
+
+    def __init__(self, size=64):
+        self.size = size
+        self.codes = array('i', [0] * size)
+        self.times = array('d', [0] * size)
+        self.dropped = 0
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def push(self, code, time):
+        if len(self) == self.size:
+            self._head += 1
+            self.dropped += 1
+        index = self._tail % self.size
+        self.codes[index] = code
+        self.times[index] = time
+        self._tail += 1
+
+    def pop_all(self):
+        """Return lists of codes and times of all keys, oldest first."""
+
+        indices = [index % self.size for index in range(self._head, self._tail)]
+        self._head = self._tail
+        return (
+            [self.codes[index] for index in indices],
+            [self.times[index] for index in indices],
+        )
+
+
+class Keyboard:
+    """
+    Keys of the window read by event loop reader callback. read() turns
+    keys pressed since the previous call into controls state.
+    """
+
+    def __init__(self, window, size=64, clock=perf_counter):
+        self.window = window
+        self.keys = KeyRing(size)
+        self.clock = clock
+        self.controls = (0, 0, False)
+        self.pressed_times = []
+        self._loop = self._fd = None
+
+    def on_readable(self):
+        """Move keys available in the window to the ring buffer."""
+
+        now = self.clock()
+        getch, push = self.window.getch, self.keys.push
+        while True:
+            key_code = getch()
+            if key_code == -1:
+                break
+            push(key_code, now)
+
+    def attach(self, loop, fd=None):
+        """Read keys when fd, stdin by default, becomes readable."""
+
+        self._loop = loop
+        self._fd = sys.stdin.fileno() if fd is None else fd
+        loop.add_reader(self._fd, self.on_readable)
+
+    def detach(self):
+        if self._loop:
+            self._loop.remove_reader(self._fd)
+            self._loop = self._fd = None
+
+    def read(self, late=False):
+        """
+        Consume keys pressed since the last read, return controls state.
+        Arrival times of the consumed keys are kept in pressed_times.
+        """
+        # when the tick is late, the task resumes before reader callbacks
+        # of the same loop iteration, keys which wait for them are taken here
+        if late:
+            self.on_readable()
+        key_codes, self.pressed_times = self.keys.pop_all()
+        self.controls = get_controls(key_codes)
+        return self.controls
@@ -1,18 +1,43 @@
-import asyncio
-from curses_tools import draw_frame
-
-from config import TIC_TIMEOUT
+from array import array
+from collections import defaultdict
+from math import floor
+from operator import attrgetter
 
 
 class Obstacle:
+    """View of one obstacle in ObstacleStore."""
+
+    __slots__ = ('store', 'index', 'uid')
 
-    def __init__(self, row, column, rows_size=1, columns_size=1, uid=None):
-        self.row = row
-        self.column = column
-        self.rows_size = rows_size
-        self.columns_size = columns_size
+    def __init__(self, store, index, uid):
+        self.store = store
+        self.index = index
         self.uid = uid
 
+    @property
+    def row(self):
+        return self.store.rows[self.index]
+
+    @row.setter
+    def row(self, value):
+        self.store.rows[self.index] = value
+
+    @property
+    def column(self):
+        return self.store.columns[self.index]
+
+    @column.setter
+    def column(self, value):
+        self.store.columns[self.index] = value
+
+    @property
+    def rows_size(self):
+        return self.store.rows_sizes[self.index]
+
+    @property
+    def columns_size(self):
+        return self.store.columns_sizes[self.index]
+
     def get_bounding_box_frame(self):
         # increment box size to compensate obstacle movement
         rows, columns = self.rows_size + 1, self.columns_size + 1
@@ -27,12 +52,315 @@ class Obstacle:
 
     def has_collision(self, obj_corner_row, obj_corner_column, obj_size_rows=1, obj_size_columns=1):
         '''Determine if collision has occured. Return True or False.'''
-        return has_collision(
-            (self.row, self.column),
-            (self.rows_size, self.columns_size),
-            (obj_corner_row, obj_corner_column),
-            (obj_size_rows, obj_size_columns),
+        store, index = self.store, self.index
+        return _has_collision(
+            store.rows[index], store.columns[index],
+            store.rows_sizes[index], store.columns_sizes[index],
+            obj_corner_row, obj_corner_column,
+            obj_size_rows, obj_size_columns,
+        )
+
+
+class ObstacleStore:
+    """
+    Obstacles kept as parallel arrays of rows, columns, sizes and integer
+    ids. Removal moves the last obstacle to the freed place, Obstacle
+    views are indexed in ObstacleGrid for collision queries.
+
+    Obstacle can have occupancy mask of its sprite, see Sprite.mask.
+    Then boxes overlap is only a broad phase, collision is confirmed
+    if masks overlap on screen cells.
+    """
+
+    def __init__(self, cell_size=8):
+        self.rows = array('d')
+        self.columns = array('d')
+        self.rows_sizes = array('H')
+        self.columns_sizes = array('H')
+        self.uids = array('Q')
+        self.masks = []
+        self.views = []
+        self.grid = ObstacleGrid(cell_size)
+        # obstacle and rectangle or point pairs tested by collision queries
+        self.checks = 0
+        self._next_uid = 0
+
+    def __len__(self):
+        return len(self.views)
+
+    def __iter__(self):
+        return iter(list(self.views))
+
+    def add(self, row, column, rows_size=1, columns_size=1, obstacle=None,
+            mask=None):
+        """
+        Create obstacle, return its Obstacle view. View of a removed
+        obstacle can be passed to be reused instead of creating one.
+        """
+
+        if obstacle is None:
+            obstacle = Obstacle(self, len(self.views), self._next_uid)
+        else:
+            obstacle.index, obstacle.uid = len(self.views), self._next_uid
+        self._next_uid += 1
+        self.rows.append(row)
+        self.columns.append(column)
+        self.rows_sizes.append(rows_size)
+        self.columns_sizes.append(columns_size)
+        self.uids.append(obstacle.uid)
+        self.masks.append(mask)
+        self.views.append(obstacle)
+        self.grid.add(obstacle)
+        return obstacle
+
+    def remove(self, obstacle):
+        self.grid.remove(obstacle)
+
+        index, last = obstacle.index, len(self.views) - 1
+        if index != last:
+            moved = self.views[last]
+            self.rows[index] = self.rows[last]
+            self.columns[index] = self.columns[last]
+            self.rows_sizes[index] = self.rows_sizes[last]
+            self.columns_sizes[index] = self.columns_sizes[last]
+            self.uids[index] = self.uids[last]
+            self.masks[index] = self.masks[last]
+            self.views[index] = moved
+            moved.index = index
+
+        del self.rows[last]
+        del self.columns[last]
+        del self.rows_sizes[last]
+        del self.columns_sizes[last]
+        del self.uids[last]
+        self.masks.pop()
+        self.views.pop()
+        obstacle.index = -1
+
+    def move(self, obstacle, row, column=None):
+        index = obstacle.index
+        self.rows[index] = row
+        if column is not None:
+            self.columns[index] = column
+        self.grid.update(
+            obstacle, row, self.columns[index],
+            self.rows_sizes[index], self.columns_sizes[index]
+        )
+
+    def query_rect(self, row, column, rows_size=1, columns_size=1, mask=None):
+        """
+        Return obstacles colliding with the rectangle, with the mask
+        inside it if it is given.
+        """
+
+        rows, columns = self.rows, self.columns
+        rows_sizes, columns_sizes = self.rows_sizes, self.columns_sizes
+        masks = self.masks
+        collisions = []
+        candidates = self.grid.get_candidates(
+            row, column, rows_size, columns_size
+        )
+        self.checks += len(candidates)
+        for obstacle in candidates:
+            index = obstacle.index
+            if not _has_collision(
+                rows[index], columns[index],
+                rows_sizes[index], columns_sizes[index],
+                row, column, rows_size, columns_size
+            ):
+                continue
+            obstacle_mask = masks[index]
+            if obstacle_mask is not None:
+                if mask is None:
+                    # the rectangle is a full box, made once per query
+                    mask = _get_box_mask(rows_size, columns_size)
+                if not _has_mask_collision(
+                    rows[index], columns[index], obstacle_mask,
+                    row, column, mask
+                ):
+                    continue
+            collisions.append(obstacle)
+        return collisions
+
+    def query_box(self, row, column, rows_size, columns_size):
+        """
+        Return obstacles which boxes overlap the rectangle, in order of
+        creation, masks are not checked. Finds obstacles seen on screen.
+        """
+
+        end_row, end_column = row + rows_size, column + columns_size
+        rows, columns = self.rows, self.columns
+        rows_sizes, columns_sizes = self.rows_sizes, self.columns_sizes
+        found = []
+        for obstacle in self.grid.get_candidates(
+            row, column, rows_size, columns_size
+        ):
+            index = obstacle.index
+            if (rows[index] < end_row
+                    and rows[index] + rows_sizes[index] > row
+                    and columns[index] < end_column
+                    and columns[index] + columns_sizes[index] > column):
+                found.append(obstacle)
+        found.sort(key=attrgetter('uid'))
+        return found
+
+    def collide_points(self, rows, columns):
+        """
+        Collide many points with obstacles in one pass. Points are grouped
+        by grid cells they touch, candidates of a group are looked up once
+        and checked against all its points with has_collision() semantics
+        inlined, masks of obstacles are checked for the hits only.
+        Return pairs (point index, obstacle).
+        """
+
+        cell_size = self.grid.cell_size
+        groups = {}
+        for index, (row, column) in enumerate(zip(rows, columns)):
+            end_row, end_column = row + 1, column + 1
+            span = (
+                row // cell_size, end_row // cell_size,
+                column // cell_size, end_column // cell_size
+            )
+            point = (
+                index, row, column, end_row, end_column,
+                end_row - 1, end_column - 1
+            )
+            group = groups.get(span)
+            if group is None:
+                groups[span] = [point]
+            else:
+                group.append(point)
+
+        obstacle_rows, obstacle_columns = self.rows, self.columns
+        rows_sizes, columns_sizes = self.rows_sizes, self.columns_sizes
+        masks = self.masks
+        get_candidates = self.grid.get_candidates
+        hits = []
+        for points in groups.values():
+            _, row, column = points[0][:3]
+            candidates = get_candidates(row, column)
+            self.checks += len(candidates) * len(points)
+            for obstacle in candidates:
+                obstacle_index = obstacle.index
+                obstacle_row = obstacle_rows[obstacle_index]
+                obstacle_column = obstacle_columns[obstacle_index]
+                obstacle_end_row = obstacle_row + rows_sizes[obstacle_index]
+                obstacle_end_column = (
+                    obstacle_column + columns_sizes[obstacle_index]
+                )
+                obstacle_last_row = obstacle_end_row - 1
+                obstacle_last_column = obstacle_end_column - 1
+                mask = masks[obstacle_index]
+                mask_row = None
+                for (index, row, column, end_row, end_column,
+                     last_row, last_column) in points:
+                    if (
+                        (obstacle_row <= row < obstacle_end_row
+                         and obstacle_column <= column < obstacle_end_column)
+                        or (obstacle_row <= last_row < obstacle_end_row
+                            and obstacle_column <= last_column < obstacle_end_column)
+                        or (row <= obstacle_row < end_row
+                            and column <= obstacle_column < end_column)
+                        or (row <= obstacle_last_row < end_row
+                            and column <= obstacle_last_column < end_column)
+                    ):
+                        if mask is not None:
+                            # bit of the mask under the point, in screen cells,
+                            # obstacle is rounded only if some point hits its box
+                            if mask_row is None:
+                                mask_row = round(obstacle_row)
+                                mask_column = round(obstacle_column)
+                            bit_row = round(row) - mask_row
+                            bit_column = round(column) - mask_column
+                            if not (
+                                0 <= bit_row < len(mask) and bit_column >= 0
+                                and mask[bit_row] >> bit_column & 1
+                            ):
+                                continue
+                        hits.append((index, obstacle))
+        return hits
+
+
+class ObstacleGrid:
+    """
+    Uniform grid index of obstacles. Every obstacle is registered in all
+    cells its box overlaps, so collision queries test only obstacles
+    from the cells under the queried point or rectangle.
+    """
+
+    def __init__(self, cell_size=8):
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)
+        self._obstacle_spans = {}
+
+    def _get_span(self, row, column, rows_size=1, columns_size=1):
+        # box is widened by one cell on the far side, so that float
+        # coordinates of moving garbage never fall out of the index
+        cell_size = self.cell_size
+        return (
+            floor(row / cell_size),
+            floor((row + rows_size) / cell_size),
+            floor(column / cell_size),
+            floor((column + columns_size) / cell_size),
+        )
+
+    def _link(self, obstacle, span):
+        first_row, last_row, first_column, last_column = span
+        cells = self._cells
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                cells[cell_row, cell_column].add(obstacle)
+
+    def _unlink(self, obstacle, span):
+        first_row, last_row, first_column, last_column = span
+        cells = self._cells
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                bucket = cells[cell_row, cell_column]
+                bucket.discard(obstacle)
+                if not bucket:
+                    del cells[cell_row, cell_column]
+
+    def add(self, obstacle):
+        span = self._get_span(
+            obstacle.row, obstacle.column,
+            obstacle.rows_size, obstacle.columns_size
+        )
+        self._link(obstacle, span)
+        self._obstacle_spans[obstacle] = span
+
+    def remove(self, obstacle):
+        self._unlink(obstacle, self._obstacle_spans.pop(obstacle))
+
+    def update(self, obstacle, row, column, rows_size, columns_size):
+        """Reindex obstacle which box is already changed to the given one."""
+
+        old_span = self._obstacle_spans[obstacle]
+        span = self._get_span(row, column, rows_size, columns_size)
+        if span == old_span:
+            return
+
+        self._unlink(obstacle, old_span)
+        self._link(obstacle, span)
+        self._obstacle_spans[obstacle] = span
+
+    def get_candidates(self, row, column, rows_size=1, columns_size=1):
+        """Return obstacles from grid cells overlapped by the rectangle."""
+
+        first_row, last_row, first_column, last_column = self._get_span(
+            row, column, rows_size, columns_size
         )
+        if first_row == last_row and first_column == last_column:
+            return self._cells.get((first_row, first_column), ())
+
+        candidates = set()
+        cells = self._cells
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                bucket = cells.get((cell_row, cell_column))
+                if bucket:
+                    candidates.update(bucket)
+        return candidates
 
 
 def _get_bounding_box_lines(rows, columns):
@@ -43,48 +371,57 @@ def _get_bounding_box_lines(rows, columns):
     yield ' ' + '-' * columns + ' '
 
 
-async def show_obstacles(canvas, obstacles):
-    """Display bounding boxes of every obstacle in a list"""
+def _has_collision(obstacle_row, obstacle_column, obstacle_rows, obstacle_columns,
+                   obj_row, obj_column, obj_rows, obj_columns):
+    """has_collision() for plain numbers, without building tuples."""
 
-    while True:
-        boxes = []
+    obstacle_end_row = obstacle_row + obstacle_rows
+    obstacle_end_column = obstacle_column + obstacle_columns
+    obj_end_row = obj_row + obj_rows
+    obj_end_column = obj_column + obj_columns
 
-        for obstacle in obstacles:
-            boxes.append(obstacle.dump_bounding_box())
+    return (
+        (obstacle_row <= obj_row < obstacle_end_row
+         and obstacle_column <= obj_column < obstacle_end_column)
+        or (obstacle_row <= obj_end_row - 1 < obstacle_end_row
+            and obstacle_column <= obj_end_column - 1 < obstacle_end_column)
+        or (obj_row <= obstacle_row < obj_end_row
+            and obj_column <= obstacle_column < obj_end_column)
+        or (obj_row <= obstacle_end_row - 1 < obj_end_row
+            and obj_column <= obstacle_end_column - 1 < obj_end_column)
+    )
 
-        for row, column, frame in boxes:
-            draw_frame(canvas, row, column, frame)
 
-        await asyncio.sleep(TIC_TIMEOUT)
+def _get_box_mask(rows_size, columns_size):
+    return ((1 << columns_size) - 1,) * rows_size
 
-        for row, column, frame in boxes:
-            draw_frame(canvas, row, column, frame, negative=True)
 
+def _has_mask_collision(obstacle_row, obstacle_column, obstacle_mask,
+                        obj_row, obj_column, obj_mask):
+    """
+    Check masks for a common screen cell: rows where they overlap are
+    shifted to the same column and ANDed.
+    """
 
-def _is_point_inside(corner_row, corner_column, size_rows, size_columns, point_row, point_row_column):
-    rows_flag = corner_row <= point_row < corner_row + size_rows
-    columns_flag = corner_column <= point_row_column < corner_column + size_columns
+    obstacle_row, obstacle_column = round(obstacle_row), round(obstacle_column)
+    obj_row, obj_column = round(obj_row), round(obj_column)
+    shift = obj_column - obstacle_column
 
-    return rows_flag and columns_flag
+    first_row = max(obstacle_row, obj_row)
+    last_row = min(obstacle_row + len(obstacle_mask), obj_row + len(obj_mask))
+    for row in range(first_row, last_row):
+        obstacle_bits = obstacle_mask[row - obstacle_row]
+        obj_bits = obj_mask[row - obj_row]
+        if shift >= 0:
+            overlap = obstacle_bits >> shift & obj_bits
+        else:
+            overlap = obstacle_bits & obj_bits >> -shift
+        if overlap:
+            return True
+    return False
 
 
 def has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
     '''Determine if collision has occured. Return True or False.'''
 
-    opposite_obstacle_corner = (
-        obstacle_corner[0] + obstacle_size[0] - 1,
-        obstacle_corner[1] + obstacle_size[1] - 1,
-    )
-
-    opposite_obj_corner = (
-        obj_corner[0] + obj_size[0] - 1,
-        obj_corner[1] + obj_size[1] - 1,
-    )
-
-    return any([
-        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-        _is_point_inside(*obstacle_corner, *obstacle_size, *opposite_obj_corner),
-
-        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-    ])
+    return _has_collision(*obstacle_corner, *obstacle_size, *obj_corner, *obj_size)
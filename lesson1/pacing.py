@@ -0,0 +1,110 @@
+"""
+Frame pacing: simulation steps are run against absolute deadlines, one
+every tic_timeout seconds, render passes are skipped when the game falls
+behind, so that the game speed doesn`t depend on the drawing load.
+"""
+from array import array
+import csv
+
+
+class FramePacer:
+    """
+    Decide which ticks are rendered and keep lateness of every tick —
+    how many seconds after its deadline the tick has started.
+
+    Ticks are rendered at render_rate per second at most. When a tick
+    ends after the deadline of the next one, its render is skipped,
+    but never so many in a row that less than min_render_rate frames
+    per second are drawn.
+    """
+
+    def __init__(self, tic_timeout, render_rate=None, min_render_rate=None):
+        self.tic_timeout = tic_timeout
+        ticks_per_second = 1 / tic_timeout
+        self.render_interval = max(
+            1, round(ticks_per_second / render_rate) if render_rate else 1
+        )
+        self.max_render_interval = max(
+            self.render_interval,
+            round(ticks_per_second / min_render_rate) if min_render_rate else 1
+        )
+        self.lateness = array('d')
+        self.rendered = array('B')
+        # the current tick has started without waiting for its deadline,
+        # reader callbacks of the event loop haven`t run before it
+        self.late = False
+        self._ticks_since_render = 0
+
+    def __len__(self):
+        return len(self.lateness)
+
+    def should_render(self, behind):
+        """Tell if the tick is rendered, behind — next deadline is missed."""
+
+        self._ticks_since_render += 1
+        if self._ticks_since_render < self.render_interval:
+            return False
+        if behind and self._ticks_since_render < self.max_render_interval:
+            return False
+        self._ticks_since_render = 0
+        return True
+
+    def record(self, lateness, rendered):
+        self.lateness.append(lateness)
+        self.rendered.append(rendered)
+
+    def get_report(self):
+        ticks = len(self.lateness)
+        lateness = sorted(self.lateness) or [0]
+        rendered = sum(self.rendered)
+        return {
+            'ticks': ticks,
+            'rendered': rendered,
+            'skipped': ticks - rendered,
+            'late_ticks': sum(1 for late in lateness if late > 0),
+            'lateness_ms': {
+                'p50': lateness[len(lateness) // 2] * 1000,
+                'p99': lateness[len(lateness) * 99 // 100] * 1000,
+                'max': lateness[-1] * 1000,
+            },
+        }
+
+    def dump_csv(self, path):
+        """Write tick, lateness in ms and render flag, one row per tick."""
+
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('tick', 'lateness_ms', 'rendered'))
+            for tick, (lateness, rendered) in enumerate(
+                zip(self.lateness, self.rendered)
+            ):
+                writer.writerow((tick, f'{lateness * 1000:.3f}', rendered))
+
+
+async def run_paced(simulate, render, pacer, ticks=None):
+    """
+    Call simulate on every tick and render on the ticks chosen by pacer,
+    forever or for the given number of ticks.
+    """
+    # imported here, headless simulation doesn`t pay for asyncio import
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    tic_timeout = pacer.tic_timeout
+    start_time = loop.time()
+    tick = 0
+    while ticks is None or tick < ticks:
+        deadline = start_time + tick * tic_timeout
+        lateness = max(loop.time() - deadline, 0)
+
+        simulate()
+        next_deadline = deadline + tic_timeout
+        rendered = pacer.should_render(loop.time() > next_deadline)
+        if rendered:
+            render()
+        pacer.record(lateness, rendered)
+
+        tick += 1
+        delay = next_deadline - loop.time()
+        pacer.late = delay <= 0
+        await asyncio.sleep(max(delay, 0))
@@ -0,0 +1,163 @@
+from array import array
+from collections import Counter, deque, namedtuple
+from functools import lru_cache
+from itertools import compress, cycle, islice, repeat
+from math import cos, sin, tau
+from operator import add
+import random
+
+
+# random bursts are made once and then picked, not computed per burst
+PATTERNS_NUM = 64
+
+# particles of a tick for rendering: arrays of ParticleSystem, particles
+# with death tick not after tick are dead, positions are relative to top
+# row and left column
+ParticleSnapshot = namedtuple(
+    'ParticleSnapshot', 'rows columns glyphs deaths tick top left'
+)
+
+
+class ParticleSystem:
+    """
+    Particles kept in parallel arrays: position, speed, glyph and the
+    tick when particle dies. step() moves all particles at once, bursts
+    over capacity are cut and counted. Patterns of bursts are picked
+    with rng, the random module by default.
+
+    Arrays are in order of bursts. Dead particles stay in them until
+    all particles of the bursts before theirs die too, then the dead
+    head of the arrays is cut off at once, the order of the others is
+    kept and nothing is compacted.
+    """
+
+    def __init__(self, capacity=16384, rng=None):
+        self.capacity = capacity
+        self.rng = rng or random
+        self.tick = 0
+        self.rows = array('d')
+        self.columns = array('d')
+        self.rows_speeds = array('d')
+        self.columns_speeds = array('d')
+        self.glyphs = bytearray()
+        self.deaths = array('L')
+        self.dropped = 0
+        self._alive = 0
+        # alive particles by death tick
+        self._dying = Counter()
+        # (particles number, last death tick) of bursts still in arrays
+        self._bursts = deque()
+
+    def __len__(self):
+        return self._alive
+
+    def burst(self, row, column, number, glyphs, max_ttl, speed=1.0):
+        """
+        Scatter particles from the point in all directions, glyphs are
+        given as bytes and taken in turn, particles live up to max_ttl.
+        """
+
+        free = self.capacity - len(self)
+        if number > free:
+            self.dropped += number - free
+            number = free
+        if not number:
+            return
+
+        rows_speeds, columns_speeds, burst_glyphs, ttls = self.rng.choice(
+            get_patterns(number, glyphs, max_ttl, speed)
+        )
+        self.rows.extend(repeat(row, number))
+        self.columns.extend(repeat(column, number))
+        self.rows_speeds.extend(rows_speeds)
+        self.columns_speeds.extend(columns_speeds)
+        self.glyphs.extend(burst_glyphs)
+        deaths = array('L', map(self.tick.__add__, ttls))
+        self.deaths.extend(deaths)
+        self._alive += number
+        self._dying.update(deaths)
+        self._bursts.append((number, max(deaths)))
+
+    def step(self):
+        """Advance one tick: cut off the dead head, move all particles."""
+
+        self.tick += 1
+        tick = self.tick
+        dying = self._dying
+        if dying and min(dying) <= tick:
+            for death in [death for death in dying if death <= tick]:
+                self._alive -= dying.pop(death)
+
+        dead = 0
+        bursts = self._bursts
+        while bursts and bursts[0][1] <= tick:
+            dead += bursts.popleft()[0]
+        if dead:
+            del self.rows[:dead]
+            del self.columns[:dead]
+            del self.rows_speeds[:dead]
+            del self.columns_speeds[:dead]
+            del self.glyphs[:dead]
+            del self.deaths[:dead]
+
+        rows, columns = self.rows, self.columns
+        if rows:
+            rows[:] = array('d', map(add, rows, self.rows_speeds))
+            columns[:] = array('d', map(add, columns, self.columns_speeds))
+
+    def get_snapshot(self, top=0, left=0):
+        """
+        Return ParticleSnapshot with positions relative to the given top
+        row and left column. Arrays aren`t copied, they change on the
+        next step.
+        """
+
+        return ParticleSnapshot(
+            self.rows, self.columns, self.glyphs, self.deaths, self.tick,
+            top, left
+        )
+
+
+def copy_alive(particles):
+    """
+    Return copies of rows, columns and glyphs of alive particles of
+    ParticleSnapshot, positions relative to its top row and left column.
+    """
+
+    alive = list(map(particles.tick.__lt__, particles.deaths))
+    rows = array('d', compress(particles.rows, alive))
+    columns = array('d', compress(particles.columns, alive))
+    if particles.top or particles.left:
+        rows = array('d', map(float(-particles.top).__add__, rows))
+        columns = array('d', map(float(-particles.left).__add__, columns))
+    return rows, columns, bytes(compress(particles.glyphs, alive))
+
+
+@lru_cache
+def get_patterns(number, glyphs, max_ttl, speed):
+    """
+    Return random bursts of number particles: speeds, glyphs and time
+    to live of every particle. Patterns are made by own generator seeded
+    by the arguments, they don`t depend on when they are made first.
+    """
+
+    rng = random.Random(repr((number, glyphs, max_ttl, speed)))
+    patterns = []
+    for _ in range(PATTERNS_NUM):
+        rows_speeds = array('d')
+        columns_speeds = array('d')
+        for index in range(number):
+            angle = tau * index / number + rng.uniform(-0.2, 0.2)
+            particle_speed = speed * rng.uniform(0.4, 1)
+            # terminal cells are about twice as high as wide
+            rows_speeds.append(sin(angle) * particle_speed / 2)
+            columns_speeds.append(cos(angle) * particle_speed)
+        patterns.append((
+            rows_speeds,
+            columns_speeds,
+            bytes(islice(cycle(glyphs), number)),
+            array('L', (
+                rng.randint(max_ttl // 2, max_ttl) for _ in range(number)
+            )),
+        ))
+    return patterns
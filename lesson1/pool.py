@@ -0,0 +1,55 @@
+from collections import deque
+from types import coroutine
+
+from utils import PARKED
+
+
+class WorkerPool:
+    """
+    Fixed number of long-lived worker coroutines taking jobs from queue.
+    Workers park while there are no jobs, so idle workers cost nothing
+    per tick. When all workers are busy, up to queue_size jobs wait for
+    a free worker, further ones are dropped and counted.
+    """
+
+    def __init__(self, scheduler, capacity, queue_size=0):
+        self.scheduler = scheduler
+        self.capacity = capacity
+        self.queue_size = queue_size
+        self.jobs = deque()
+        self.workers = []
+        self.dropped = 0
+        self._idle = []
+
+    def __len__(self):
+        """Return number of busy workers."""
+
+        return len(self.workers) - len(self._idle)
+
+    def start(self, work):
+        """Spawn workers, work(pool, index) returns worker coroutine."""
+
+        for index in range(len(self.workers), self.capacity):
+            self.workers.append(self.scheduler.spawn(work(self, index)))
+
+    def submit(self, *job):
+        """Queue job for a worker, return False if it has been dropped."""
+
+        if self._idle:
+            self.jobs.append(job)
+            self.scheduler.wake(self.workers[self._idle.pop()])
+            return True
+        if len(self.jobs) < self.queue_size:
+            self.jobs.append(job)
+            return True
+        self.dropped += 1
+        return False
+
+    @coroutine
+    def get_job(self, index):
+        """Return the next job, worker is parked until there is one."""
+
+        while not self.jobs:
+            self._idle.append(index)
+            yield PARKED
+        return self.jobs.popleft()
@@ -0,0 +1,120 @@
+"""
+Profiling of game ticks: time and steps of every coroutine kind, number
+of busy coroutines by kind — neither finished nor parked, so idle pool
+workers aren`t counted — time of tick phases and rolling percentiles
+of tick durations. Nothing is measured unless ProfilingScheduler and
+Profiler are passed in, see PROFILE in config.
+"""
+from collections import defaultdict, deque
+import json
+from time import perf_counter
+
+from scheduler import Scheduler
+from utils import PARKED
+
+
+PERCENTILES = (50, 95, 99)
+
+
+class KindStats:
+    __slots__ = ('steps', 'time', 'busy')
+
+    def __init__(self):
+        self.steps = 0
+        self.time = 0
+        self.busy = 0
+
+
+class Profiler:
+    """Collect stats of coroutines, tick phases and tick durations."""
+
+    def __init__(self, window=300):
+        self.ticks = 0
+        self.kinds = defaultdict(KindStats)
+        self.phases = defaultdict(KindStats)
+        self.tick_times = deque(maxlen=window)
+
+    def add_phase(self, name, elapsed):
+        stats = self.phases[name]
+        stats.steps += 1
+        stats.time += elapsed
+
+    def add_tick(self, elapsed):
+        self.ticks += 1
+        self.tick_times.append(elapsed)
+
+    def extend_tick(self, elapsed):
+        """Add time of work done after add_tick() to the last tick."""
+
+        self.tick_times[-1] += elapsed
+
+    def get_percentiles(self):
+        """Return {percentile: seconds} for the last ticks in the window."""
+
+        if not self.tick_times:
+            return {percentile: 0 for percentile in PERCENTILES}
+        times = sorted(self.tick_times)
+        return {
+            percentile: times[min(len(times) - 1, len(times) * percentile // 100)]
+            for percentile in PERCENTILES
+        }
+
+    def get_top_kinds(self, number):
+        """Return coroutine kinds which took most of the time."""
+
+        return sorted(
+            self.kinds.items(), key=lambda item: item[1].time, reverse=True
+        )[:number]
+
+    def get_report(self):
+        return {
+            'ticks': self.ticks,
+            'tick_percentiles_ms': {
+                f'p{percentile}': elapsed * 1000
+                for percentile, elapsed in self.get_percentiles().items()
+            },
+            'coroutines': {
+                kind: {'steps': stats.steps, 'time': stats.time, 'busy': stats.busy}
+                for kind, stats in self.kinds.items()
+            },
+            'phases': {
+                name: {'steps': stats.steps, 'time': stats.time}
+                for name, stats in self.phases.items()
+            },
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.get_report(), file, indent=2)
+
+
+class ProfilingScheduler(Scheduler):
+    """Scheduler timing every coroutine step into Profiler by kind."""
+
+    def __init__(self, profiler, wheel_size=256):
+        super().__init__(wheel_size)
+        self.profiler = profiler
+
+    def spawn(self, coroutine):
+        self.profiler.kinds[coroutine.__name__].busy += 1
+        return super().spawn(coroutine)
+
+    def wake(self, coroutine):
+        self.profiler.kinds[coroutine.__name__].busy += 1
+        super().wake(coroutine)
+
+    def send(self, coroutine):
+        stats = self.profiler.kinds[coroutine.__name__]
+        start = perf_counter()
+        tics = super().send(coroutine)
+        stats.time += perf_counter() - start
+        stats.steps += 1
+        # finished, or parked pool worker waiting for a job
+        if not tics or tics == PARKED:
+            stats.busy -= 1
+        return tics
+
+    def close(self):
+        super().close()
+        for stats in self.profiler.kinds.values():
+            stats.busy = 0
@@ -0,0 +1,381 @@
+"""
+Recording of the game: controls of every tick and changes of the screen
+sent by Compositor, written by a background thread into one deflate
+stream. Every few seconds a keyframe with the whole screen is written
+after a full flush of the stream, so reading can start from it; offsets
+of keyframes are kept in the index at the end of the file.
+
+File: HEADER, raw deflate stream of records, index of keyframes,
+INDEX_FOOTER. Record is RECORD and payload: packed controls, or runs of
+changed cells — RUN and UTF-8 text, for a keyframe all cells.
+
+Play from repository root: python lesson1/recording.py play FILE
+"""
+from array import array
+from bisect import bisect_right
+from itertools import chain, groupby
+import queue
+import struct
+import threading
+import zlib
+
+from config import RECORD_KEYFRAME_TICKS, RECORD_QUEUE_SIZE, TIC_TIMEOUT
+
+
+HEADER = struct.Struct('<6sHH')
+MAGIC = b'SPREC1'
+# kind, tick, payload length
+RECORD = struct.Struct('<BII')
+CONTROLS, FRAME, KEYFRAME = 1, 2, 3
+# rows from the previous run, columns from its end on the same row or
+# from the row start, attr, length of text in bytes: runs are sorted, small
+# repeated numbers are compressed better than positions
+RUN = struct.Struct('<HHIH')
+# offset of the index, number of keyframes
+INDEX_FOOTER = struct.Struct('<QI4s')
+INDEX_MAGIC = b'SPIX'
+# raw deflate: no header, stream can be read from any full flush
+WBITS = -15
+CHUNK_SIZE = 65536
+
+
+def pack_controls(controls):
+    rows_direction, columns_direction, fire = controls
+    return bytes((rows_direction + 1 | columns_direction + 1 << 2 | fire << 4,))
+
+
+def unpack_controls(payload):
+    value = payload[0]
+    return (value & 3) - 1, (value >> 2 & 3) - 1, bool(value >> 4 & 1)
+
+
+def pack_runs(runs):
+    """Encode runs (row, column, attr, text) sorted by row and column."""
+
+    chunks = []
+    previous_row = end_column = 0
+    for row, column, attr, text in runs:
+        if row != previous_row:
+            end_column = 0
+        encoded = text.encode()
+        chunks.append(RUN.pack(
+            row - previous_row, column - end_column, attr, len(encoded)
+        ))
+        chunks.append(encoded)
+        previous_row, end_column = row, column + len(text)
+    return b''.join(chunks)
+
+
+def unpack_runs(payload):
+    """Yield (row, column, attr, text) of runs."""
+
+    offset = row = end_column = 0
+    while offset < len(payload):
+        rows_step, gap, attr, length = RUN.unpack_from(payload, offset)
+        offset += RUN.size
+        text = payload[offset:offset + length].decode()
+        offset += length
+        if rows_step:
+            row += rows_step
+            end_column = 0
+        column = end_column + gap
+        end_column = column + len(text)
+        yield row, column, attr, text
+
+
+def get_screen_runs(symbols, attrs):
+    """Return runs of cells with the same attr for all rows of the screen."""
+
+    runs = []
+    for row, (row_symbols, row_attrs) in enumerate(zip(symbols, attrs)):
+        column = 0
+        for attr, group in groupby(row_attrs):
+            length = len(list(group))
+            text = ''.join(row_symbols[column:column + length])
+            runs.append((row, column, attr, text))
+            column += length
+    return runs
+
+
+class Recorder:
+    """
+    Take controls and frames on the game ticks and pass them to the
+    writer thread, which encodes and writes them. Nothing waits for
+    disk: when the queue is full, the record is dropped and the next
+    frame is written as a keyframe, so the recording stays consistent.
+    """
+
+    def __init__(self, path, rows, columns,
+                 keyframe_ticks=RECORD_KEYFRAME_TICKS,
+                 queue_size=RECORD_QUEUE_SIZE):
+        self.path = path
+        self.rows = rows
+        self.columns = columns
+        self.keyframe_ticks = keyframe_ticks
+        self.tick = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self._controls = (0, 0, False)
+        self._last_keyframe = None
+        self._queue = queue.Queue(queue_size)
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, rows, columns))
+        self._thread = threading.Thread(
+            target=self._write_records, name='recorder', daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            # screen changes are lost, the next frame starts from scratch
+            self._last_keyframe = None
+            return False
+        return True
+
+    def record_controls(self, tick, controls):
+        """Start the tick, controls are written when they change."""
+
+        self.tick = tick
+        if controls != self._controls and self._put(
+            (CONTROLS, tick, controls)
+        ):
+            self._controls = controls
+
+    def record_frame(self, runs, symbols, attrs):
+        """
+        Record runs (row, column, attr, text) changed on the screen, or
+        the whole screen — symbols and attrs rows — if a keyframe is due.
+        """
+
+        tick = self.tick
+        if (self._last_keyframe is None
+                or tick - self._last_keyframe >= self.keyframe_ticks):
+            # Compositor replaces rows instead of changing them,
+            # copy of the lists of rows is enough
+            if self._put((KEYFRAME, tick, (list(symbols), list(attrs)))):
+                self._last_keyframe = tick
+        elif runs:
+            self._put((FRAME, tick, runs))
+
+    def _write_records(self):
+        compressor = zlib.compressobj(wbits=WBITS)
+        keyframes = []
+        file = self._file
+        offset = HEADER.size
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            kind, tick, data = record
+            if kind == CONTROLS:
+                payload = pack_controls(data)
+            elif kind == FRAME:
+                payload = pack_runs(data)
+            else:
+                payload = pack_runs(get_screen_runs(*data))
+                # reading can start here: nothing before is referenced
+                offset += file.write(compressor.flush(zlib.Z_FULL_FLUSH))
+                keyframes.append((tick, offset))
+            offset += file.write(compressor.compress(
+                RECORD.pack(kind, tick, len(payload)) + payload
+            ))
+        offset += file.write(compressor.flush())
+        index = array('Q', [value for keyframe in keyframes for value in keyframe])
+        file.write(index.tobytes())
+        file.write(INDEX_FOOTER.pack(offset, len(keyframes), INDEX_MAGIC))
+        self.bytes_written = file.tell()
+        file.close()
+
+    def close(self):
+        """Write what is queued and the index, wait for the writer."""
+
+        self._queue.put(None)
+        self._thread.join()
+
+
+class Recording:
+    """Records of a recording file and its keyframes index."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            magic, self.rows, self.columns = HEADER.unpack(
+                file.read(HEADER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a recording')
+            self.size = file.seek(-INDEX_FOOTER.size, 2) + INDEX_FOOTER.size
+            offset, number, magic = INDEX_FOOTER.unpack(file.read())
+            if magic != INDEX_MAGIC:
+                raise ValueError(f'{path} has no index, it isn`t closed')
+            file.seek(offset)
+            index = array('Q', file.read(number * 2 * 8))
+        self.stream_end = offset
+        self.keyframe_ticks = index[::2]
+        self.keyframe_offsets = index[1::2]
+
+    def get_records(self, offset=HEADER.size):
+        """Yield (kind, tick, payload) of records from the stream offset."""
+
+        decompressor = zlib.decompressobj(wbits=WBITS)
+        buffer = b''
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            while offset < self.stream_end:
+                chunk = file.read(min(CHUNK_SIZE, self.stream_end - offset))
+                offset += len(chunk)
+                buffer += decompressor.decompress(chunk)
+                position = 0
+                while len(buffer) - position >= RECORD.size:
+                    kind, tick, length = RECORD.unpack_from(buffer, position)
+                    end = position + RECORD.size + length
+                    if end > len(buffer):
+                        break
+                    yield kind, tick, buffer[position + RECORD.size:end]
+                    position = end
+                buffer = buffer[position:]
+
+    def get_keyframe_offset(self, tick):
+        """Return stream offset of the last keyframe at or before tick."""
+
+        index = bisect_right(self.keyframe_ticks, tick)
+        return self.keyframe_offsets[index - 1] if index else HEADER.size
+
+    def get_ticks(self):
+        """Return number of recorded ticks, read from the last keyframe."""
+
+        last_tick = self.keyframe_ticks[-1] if self.keyframe_ticks else 0
+        for _, tick, _ in self.get_records(self.get_keyframe_offset(last_tick)):
+            last_tick = tick
+        return last_tick + 1
+
+
+class Player:
+    """Draw recorded screens on canvas, from any tick."""
+
+    def __init__(self, recording, canvas):
+        self.recording = recording
+        self.canvas = canvas
+        self.controls = (0, 0, False)
+
+    def apply(self, kind, payload):
+        canvas = self.canvas
+        if kind == CONTROLS:
+            self.controls = unpack_controls(payload)
+            return
+        runs = unpack_runs(payload)
+        if kind == KEYFRAME:
+            blank = ' ' * self.recording.columns
+            runs = chain(
+                ((row, 0, 0, blank) for row in range(self.recording.rows)),
+                runs
+            )
+        max_row, max_column = canvas.getmaxyx()
+        for row, column, attr, text in runs:
+            if row == max_row - 1 and column + len(text) == max_column:
+                # curses can`t addstr to the lower right corner
+                text = text[:-1]
+            if text:
+                canvas.addstr(row, column, text, attr)
+
+    def play(self, start=0):
+        """
+        Yield ticks of the recording from start, the canvas shows the
+        screen of the yielded tick. Records before start are read from
+        the last keyframe only.
+        """
+
+        shown = None
+        for kind, tick, payload in self.recording.get_records(
+            self.recording.get_keyframe_offset(start)
+        ):
+            if tick >= start and shown is not None and tick != shown:
+                yield shown
+            self.apply(kind, payload)
+            if tick >= start:
+                shown = tick
+        if shown is not None:
+            yield shown
+
+    def seek(self, tick):
+        """Show the screen of the tick, return tick of the frame shown."""
+
+        shown = None
+        for kind, record_tick, payload in self.recording.get_records(
+            self.recording.get_keyframe_offset(tick)
+        ):
+            if record_tick > tick:
+                break
+            self.apply(kind, payload)
+            shown = record_tick
+        return shown
+
+
+def play(window, path, speed=1, start=0):
+    """Play recording on the window at the given speed."""
+    import curses
+    from time import perf_counter, sleep
+
+    from screen import Compositor, FrameBuffer
+
+    recording = Recording(path)
+    rows, columns = window.getmaxyx()
+    if rows < recording.rows or columns < recording.columns:
+        raise ValueError(
+            f'terminal is {rows}x{columns}, recording needs '
+            f'{recording.rows}x{recording.columns}'
+        )
+    canvas = FrameBuffer(window)
+    update = getattr(window, 'doupdate', curses.doupdate)
+    compositor = Compositor(window, canvas, update)
+    player = Player(recording, canvas)
+    started = perf_counter()
+    for tick in player.play(start):
+        delay = started + (tick - start) * TIC_TIMEOUT / speed - perf_counter()
+        if delay > 0:
+            sleep(delay)
+        compositor.flush()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=('play', 'info'))
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=1)
+    parser.add_argument('--start', type=int, default=0, help='tick to start from')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        recording = Recording(args.path)
+        ticks = recording.get_ticks()
+        minutes = ticks * TIC_TIMEOUT / 60
+        print(f'{recording.rows}x{recording.columns}, {ticks} ticks, '
+              f'{len(recording.keyframe_ticks)} keyframes, '
+              f'{recording.size} bytes, '
+              f'{recording.size / 1024 / minutes:.1f} KiB per minute')
+        return
+
+    from config import TERMINAL
+
+    if TERMINAL == 'ansi':
+        from ansi import open_terminal
+
+        with open_terminal() as terminal:
+            play(terminal, args.path, args.speed, args.start)
+    else:
+        import curses
+
+        def play_curses(window):
+            curses.curs_set(False)
+            play(window, args.path, args.speed, args.start)
+
+        curses.wrapper(play_curses)
+
+
+if __name__ == '__main__':
+    main()
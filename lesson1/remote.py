@@ -0,0 +1,268 @@
+"""
+Simulation in a worker process. The worker runs the game and draws it on
+an in-memory canvas, rendered frames are published to shared memory.
+The main process only reads keys, sends them to the worker over a pipe
+and blits rows changed since the previous frame to the terminal.
+"""
+from array import array
+import curses
+from itertools import chain, groupby
+from multiprocessing import get_context, shared_memory
+import struct
+
+from curses_tools import get_controls
+
+
+# frames published so far, the latest one is in buffer number % 2
+HEADER = struct.Struct('<Q')
+# sequence number, odd while the buffer is written, tick, beeps so far
+BUFFER_HEADER = struct.Struct('<QQQ')
+ATTR_SIZE = array('I').itemsize
+
+
+class SharedScreen:
+    """
+    Double buffer of symbols and attributes in shared memory. Writer fills
+    the buffer without the latest frame, reader copies the latest one and
+    compares sequence numbers of the buffer before and after copying: if
+    writer has got to the buffer meanwhile, the frame is read again.
+    Symbols are kept as latin-1 bytes, one per cell, attributes as
+    array('I'), both row after row.
+    """
+
+    def __init__(self, rows, columns, name=None):
+        self.rows = rows
+        self.columns = columns
+        self.cells = rows * columns
+        self.buffer_size = BUFFER_HEADER.size + self.cells * (1 + ATTR_SIZE)
+        self.memory = shared_memory.SharedMemory(
+            name, create=name is None, size=HEADER.size + 2 * self.buffer_size
+        )
+        self.name = self.memory.name
+        self.retries = 0
+        self._published = 0
+        self._read = 0
+        self._beeps_read = 0
+
+    def _get_offset(self, frame):
+        return HEADER.size + frame % 2 * self.buffer_size
+
+    def publish(self, symbols, attrs, tick, beeps=0):
+        """
+        Write frame given as lists of symbols and attributes by rows,
+        like HeadlessCanvas keeps them. Beeps are counted from the start.
+        """
+
+        buffer = self.memory.buf
+        frame = self._published + 1
+        offset = self._get_offset(frame)
+        sequence, _, _ = BUFFER_HEADER.unpack_from(buffer, offset)
+        BUFFER_HEADER.pack_into(buffer, offset, sequence + 1, tick, beeps)
+
+        start = offset + BUFFER_HEADER.size
+        buffer[start:start + self.cells] = ''.join(
+            chain.from_iterable(symbols)
+        ).encode('latin-1', 'replace')
+        start += self.cells
+        buffer[start:start + self.cells * ATTR_SIZE] = array(
+            'I', chain.from_iterable(attrs)
+        ).tobytes()
+
+        BUFFER_HEADER.pack_into(buffer, offset, sequence + 2, tick, beeps)
+        HEADER.pack_into(buffer, 0, frame)
+        self._published = frame
+
+    def read(self):
+        """
+        Return tick, beeps since the previous read, symbols and attrs of
+        the latest frame, or None if nothing is published since then.
+        """
+
+        buffer = self.memory.buf
+        while True:
+            frame, = HEADER.unpack_from(buffer, 0)
+            if frame == self._read:
+                return None
+            offset = self._get_offset(frame)
+            sequence, tick, beeps = BUFFER_HEADER.unpack_from(buffer, offset)
+            if sequence % 2 == 0:
+                start = offset + BUFFER_HEADER.size
+                symbols = bytes(buffer[start:start + self.cells])
+                start += self.cells
+                attrs = array('I')
+                attrs.frombytes(buffer[start:start + self.cells * ATTR_SIZE])
+                if BUFFER_HEADER.unpack_from(buffer, offset)[0] == sequence:
+                    self._read = frame
+                    new_beeps = beeps - self._beeps_read
+                    self._beeps_read = beeps
+                    return tick, new_beeps, symbols, attrs
+            self.retries += 1
+
+    def close(self):
+        self.memory.close()
+
+
+class ScreenBlitter:
+    """
+    Draw frames read from SharedScreen on the window. Rows equal to the
+    ones already on the screen are skipped, changed rows are sent as runs
+    of symbols with the same attribute.
+    """
+
+    def __init__(self, window, update=curses.doupdate):
+        self.window = window
+        self.update = update
+        self.rows, self.columns = window.getmaxyx()
+        self.front_symbols = b' ' * (self.rows * self.columns)
+        self.front_attrs = array('I', bytes(self.rows * self.columns * ATTR_SIZE))
+        self.rows_written = 0
+
+    def blit(self, symbols, attrs):
+        window, columns = self.window, self.columns
+        front_symbols, front_attrs = self.front_symbols, self.front_attrs
+        for row in range(self.rows):
+            start = row * columns
+            end = start + columns
+            if (symbols[start:end] == front_symbols[start:end]
+                    and attrs[start:end] == front_attrs[start:end]):
+                continue
+            if row == self.rows - 1:
+                # curses can`t addstr to the lower right corner
+                end -= 1
+
+            column = start
+            for attr, run in groupby(attrs[start:end]):
+                length = sum(1 for _ in run)
+                window.addstr(
+                    row, column - start,
+                    symbols[column:column + length].decode('latin-1'), attr
+                )
+                column += length
+            self.rows_written += 1
+
+        self.front_symbols, self.front_attrs = symbols, attrs
+        window.noutrefresh()
+        self.update()
+
+
+class SimulationProcess:
+    """
+    Game run by run_simulation() in a worker process: frames are read
+    from screen, pressed keys are passed by send_keys().
+    """
+
+    def __init__(self, rows, columns, ticks=None, pacer=None, load=None,
+                 **simulation_options):
+        # spawn, not fork: the worker must not inherit curses state
+        context = get_context('spawn')
+        self.screen = SharedScreen(rows, columns)
+        receiver, self.connection = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_simulation,
+            args=(self.screen.name, rows, columns, receiver, ticks, pacer, load),
+            kwargs=simulation_options,
+            daemon=True,
+        )
+        self.process.start()
+        receiver.close()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def send_keys(self, key_codes):
+        if key_codes:
+            self.connection.send_bytes(array('i', key_codes).tobytes())
+
+    def close(self):
+        """Stop the worker and free shared memory."""
+
+        try:
+            # empty message asks the worker to stop
+            self.connection.send_bytes(b'')
+        except OSError:
+            pass
+        self.connection.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.screen.close()
+        self.screen.memory.unlink()
+
+
+def run_simulation(name, rows, columns, connection, ticks=None, pacer=None,
+                   load=None, **simulation_options):
+    """
+    Worker process: run the game, forever or for the given number of ticks,
+    and publish rendered frames to SharedScreen with the given name.
+    load(simulation) is called before every tick, benchmarks add
+    entities there.
+    """
+    import asyncio
+
+    from camera import create_world
+    from headless import HeadlessCanvas
+    from pacing import FramePacer, run_paced
+    from render import Renderer, get_info_window
+    from stars import StarField
+
+    from config import (
+        BORDERS,
+        TIC_TIMEOUT,
+        STARS,
+        STARS_NUM,
+        RENDER_RATE,
+        MIN_RENDER_RATE,
+        WORLD_SCREENS,
+    )
+
+    screen = SharedScreen(rows, columns, name)
+    canvas = HeadlessCanvas(rows, columns)
+    if BORDERS:
+        canvas.border()
+    simulation, camera = create_world(
+        rows, columns, WORLD_SCREENS, **simulation_options
+    )
+    renderer = Renderer(
+        canvas,
+        StarField.random(
+            STARS_NUM,
+            BORDERS, rows-1-BORDERS,
+            BORDERS, columns-1-BORDERS,
+            STARS
+        ),
+        get_info_window(canvas)
+    )
+    if pacer is None:
+        pacer = FramePacer(TIC_TIMEOUT, RENDER_RATE, MIN_RENDER_RATE)
+    beeps = 0
+
+    def simulate():
+        nonlocal beeps
+        key_codes = array('i')
+        while connection.poll():
+            message = connection.recv_bytes()
+            if not message:
+                raise EOFError
+            key_codes.frombytes(message)
+        if load:
+            load(simulation)
+        simulation.step(get_controls(key_codes))
+        beeps += simulation.beeps
+
+    def render():
+        # beeps are made by the main process, they are counted in frames
+        if simulation.ship:
+            camera.follow(simulation.ship)
+        snapshot = simulation.get_snapshot(camera.get_view())
+        renderer.draw(snapshot._replace(beeps=0))
+        screen.publish(canvas.symbols, canvas.attrs, simulation.tick, beeps)
+
+    try:
+        asyncio.run(run_paced(simulate, render, pacer, ticks))
+    except (EOFError, KeyboardInterrupt):
+        # main process has stopped the game or has gone
+        pass
+    finally:
+        connection.close()
+        screen.close()
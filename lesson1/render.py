@@ -0,0 +1,194 @@
+from itertools import compress
+import re
+
+from assets import load_pack
+from curses_tools import beep, draw_frame
+
+from config import DEBUG, PHRASES
+
+
+GAME_OVER_FRAME = 'legends/gameover'
+# cells of a row line which are drawn, NUL is a cell left as it is
+RUN_PATTERN = re.compile('[^\0]+')
+
+
+def get_info_window(canvas):
+    """Create subwindow in the lower right corner for print_info()."""
+
+    max_row, max_column = canvas.getmaxyx()
+    max_len_phrase = max([len(x) for x in PHRASES.values()])
+    return canvas.derwin(
+        5,
+        max_len_phrase+2,
+        max_row-5,
+        max_column-(max_len_phrase+2)
+    )
+
+
+def get_profile_window(canvas, info_canvas, rows=9, columns=36):
+    """Create subwindow for print_profile() to the left of info window."""
+
+    max_row, max_column = canvas.getmaxyx()
+    _, info_columns = info_canvas.getmaxyx()
+    return canvas.derwin(
+        rows,
+        columns,
+        max_row-rows,
+        max_column-info_columns-columns
+    )
+
+
+class Renderer:
+    """
+    Draw simulation snapshots on canvas: sprites and particles drawn on
+    the previous render are erased, the new ones are drawn over stars.
+    """
+
+    def __init__(self, canvas, star_field=None, info_canvas=None,
+                 profile_canvas=None, profile_period=10, beep=beep):
+        self.canvas = canvas
+        self.star_field = star_field
+        self.info_canvas = info_canvas
+        self.profile_canvas = profile_canvas
+        self.profile_period = profile_period
+        self.beep = beep
+        self._profile_lines = ()
+        self._drawn_sprites = ()
+        self._drawn_particles = {}
+        self._last_phrase_year = None
+
+    def draw(self, snapshot):
+        canvas = self.canvas
+
+        if self.star_field:
+            self.star_field.draw(canvas, snapshot.tick)
+
+        for row, column, frame in self._drawn_sprites:
+            draw_frame(canvas, row, column, frame, negative=True)
+        particles = self.get_particle_cells(snapshot.particles)
+        self.draw_cells(dict.fromkeys(
+            self._drawn_particles.keys() - particles.keys(), ' '
+        ))
+        for row, column, frame in snapshot.sprites:
+            draw_frame(canvas, row, column, frame)
+        self._drawn_sprites = snapshot.sprites
+        self.draw_cells(particles)
+        self._drawn_particles = particles
+
+        if snapshot.game_over:
+            self.draw_game_over()
+
+        if self.info_canvas:
+            self.print_info(snapshot.year)
+
+        for _ in range(snapshot.beeps):
+            self.beep()
+
+    def get_particle_cells(self, particles):
+        """
+        Return glyphs of alive particles of ParticleSnapshot by screen
+        cells, a cell is drawn once even when many particles are there.
+        Positions are taken straight from the arrays of the snapshot.
+        """
+
+        max_row, max_column = self.canvas.getmaxyx()
+        rows, columns = particles.rows, particles.columns
+        # dead particles are dropped before positions are rounded
+        alive = list(map(particles.tick.__lt__, particles.deaths))
+        rows = compress(rows, alive)
+        columns = compress(columns, alive)
+        glyphs = compress(particles.glyphs.decode(), alive)
+        if particles.top or particles.left:
+            rows = map(float(-particles.top).__add__, rows)
+            columns = map(float(-particles.left).__add__, columns)
+        cells = {
+            (row, column): glyph
+            for row, column, glyph in zip(
+                map(round, rows), map(round, columns), glyphs
+            )
+            if 0 <= row < max_row and 0 <= column < max_column
+        }
+        # curses can`t draw in the lower right corner, see draw_frame()
+        cells.pop((max_row - 1, max_column - 1), None)
+        return cells
+
+    def draw_cells(self, cells):
+        """
+        Draw symbols of {(row, column): symbol} cells, neighbour cells of
+        a row are joined into one addstr() call.
+        """
+
+        canvas = self.canvas
+        _, max_column = canvas.getmaxyx()
+        lines = {}
+        for (row, column), symbol in cells.items():
+            line = lines.get(row)
+            if line is None:
+                line = lines[row] = ['\0'] * max_column
+            line[column] = symbol
+        for row, line in lines.items():
+            for match in RUN_PATTERN.finditer(''.join(line)):
+                canvas.addstr(row, match.start(), match.group())
+
+    def draw_game_over(self):
+        pack = load_pack()
+        frame_rows, frame_columns = pack.get_size(GAME_OVER_FRAME)
+        max_row, max_column = self.canvas.getmaxyx()
+        draw_frame(
+            self.canvas,
+            (max_row - frame_rows) // 2,
+            (max_column - frame_columns) // 2,
+            pack.get_sprite(GAME_OVER_FRAME)
+        )
+
+    def print_info(self, year):
+        canvas = self.info_canvas
+        draw_frame(canvas, 1, 1, f'YEAR: {year}')
+        if year in PHRASES.keys():
+            draw_frame(canvas, 3, 1, PHRASES[year])
+            self._last_phrase_year = year
+        elif self._last_phrase_year:
+            draw_frame(
+                canvas, 3, 1, PHRASES[self._last_phrase_year], negative=True
+            )
+
+        if DEBUG:
+            canvas.border()
+        canvas.refresh()
+
+    def print_profile(self, profiler):
+        """Draw tick percentiles and the slowest coroutines and phases."""
+
+        canvas = self.profile_canvas
+        if profiler.ticks % self.profile_period == 0:
+            self._profile_lines = get_profile_lines(
+                profiler, *canvas.getmaxyx()
+            )
+        # addstr, not draw_frame: spaces have to overwrite sprites too
+        for row, line in enumerate(self._profile_lines, 1):
+            canvas.addstr(row, 1, line)
+        canvas.border()
+        canvas.refresh()
+
+
+def get_profile_lines(profiler, rows, columns):
+    """Text lines for profile window, padded to overwrite previous ones."""
+
+    ticks = profiler.ticks or 1
+    width = columns - 2
+    p50, p95, p99 = (
+        elapsed * 1000 for elapsed in profiler.get_percentiles().values()
+    )
+    lines = [
+        f'tick ms p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f}',
+        ' '.join(
+            f'{name} {stats.time * 1000 / ticks:.2f}'
+            for name, stats in profiler.phases.items()
+        ),
+    ]
+    for kind, stats in profiler.get_top_kinds(rows - 2 - len(lines)):
+        lines.append(
+            f'{kind[:16]:<16} {stats.busy:>4} {stats.time * 1000 / ticks:>7.3f}'
+        )
+    lines += [''] * (rows - 2 - len(lines))
+    return [line[:width].ljust(width) for line in lines]
@@ -0,0 +1,243 @@
+"""
+Deterministic replay of the game for regression checks. Random choices
+are made by random.Random seeded from the trace, time is the number of
+the tick, keys of the trace are pressed on their ticks and read by
+Keyboard as in the game. For every tick a rolling checksum of the game
+state — snapshot of the simulation — and of the screen is kept.
+
+Trace is JSON: seed, screen size, simulation options, keys by tick and
+golden checksums. check runs the game again and compares the checksums
+tick by tick, timing the run, so a faster engine is checked to play the
+same game.
+
+Run from repository root: python lesson1/replay.py check
+Record a trace: python lesson1/replay.py record lesson1/traces/NAME.json
+"""
+import argparse
+from array import array
+from functools import lru_cache
+from glob import glob
+import json
+import random
+import struct
+import sys
+from time import perf_counter
+import zlib
+
+from camera import create_world
+from curses_tools import (
+    SPACE_KEY_CODE,
+    LEFT_KEY_CODE,
+    RIGHT_KEY_CODE,
+    UP_KEY_CODE,
+    DOWN_KEY_CODE,
+)
+from headless import HeadlessCanvas
+from keyboard import Keyboard
+from pacing import FramePacer
+from particles import copy_alive
+from render import Renderer, get_info_window
+from screen import Compositor, FrameBuffer
+from stars import StarField
+
+from config import (
+    BORDERS,
+    TIC_TIMEOUT,
+    RENDER_RATE,
+    MIN_RENDER_RATE,
+    STARS,
+    STARS_NUM,
+    ENGINE,
+)
+
+
+TRACES = 'lesson1/traces/*.json'
+KEY_CODES = (
+    SPACE_KEY_CODE, LEFT_KEY_CODE, RIGHT_KEY_CODE, UP_KEY_CODE, DOWN_KEY_CODE
+)
+# tick, year, beeps, game over
+STATE = struct.Struct('<QqQ?')
+
+
+class VirtualClock:
+    """Clock for Keyboard: time of the current tick, not of the wall."""
+
+    def __init__(self, tic_timeout=TIC_TIMEOUT):
+        self.tic_timeout = tic_timeout
+        self.tick = 0
+
+    def __call__(self):
+        return self.tick * self.tic_timeout
+
+
+@lru_cache(maxsize=None)
+def get_frame_checksum(frame):
+    return zlib.crc32(frame.text.encode())
+
+
+def get_state_checksum(snapshot, checksum=0):
+    """
+    Add snapshot to the checksum: sprites in order of position, so that
+    engines may keep entities in any order, and particles.
+    """
+
+    sprites = sorted(
+        (row, column, get_frame_checksum(frame))
+        for row, column, frame in snapshot.sprites
+    )
+    checksum = zlib.crc32(STATE.pack(
+        snapshot.tick, snapshot.year, snapshot.beeps, snapshot.game_over
+    ), checksum)
+    checksum = zlib.crc32(
+        array('d', [value for sprite in sprites for value in sprite]),
+        checksum
+    )
+    rows, columns, glyphs = copy_alive(snapshot.particles)
+    checksum = zlib.crc32(rows, checksum)
+    checksum = zlib.crc32(columns, checksum)
+    return zlib.crc32(glyphs, checksum)
+
+
+def get_screen_checksum(canvas, checksum=0):
+    for symbols, attrs in zip(canvas.symbols, canvas.attrs):
+        checksum = zlib.crc32(''.join(symbols).encode(), checksum)
+        checksum = zlib.crc32(array('Q', attrs), checksum)
+    return checksum
+
+
+def get_keys(seed, ticks, rate=0.3):
+    """Return keys of a player pressing a random key on some ticks."""
+
+    rng = random.Random(seed)
+    return [
+        [tick, [rng.choice(KEY_CODES)]]
+        for tick in range(ticks)
+        if rng.random() < rate
+    ]
+
+
+def run(trace, engine=ENGINE):
+    """
+    Play the trace. Return checksums (state, screen) of every tick and
+    seconds spent by simulation and render, checksums aren`t counted.
+    """
+
+    rows, columns = trace['rows'], trace['columns']
+    rng = random.Random(trace['seed'])
+    clock = VirtualClock()
+    window = HeadlessCanvas(rows, columns)
+    canvas = FrameBuffer(window)
+    compositor = Compositor(window, canvas, update=lambda: None)
+    simulation, camera = create_world(
+        rows, columns, rng=rng, engine=engine, **trace['options']
+    )
+    renderer = Renderer(
+        canvas,
+        StarField.random(
+            STARS_NUM,
+            BORDERS, rows-1-BORDERS,
+            BORDERS, columns-1-BORDERS,
+            STARS, rng
+        ),
+        get_info_window(canvas),
+        beep=lambda: None
+    )
+    pacer = FramePacer(TIC_TIMEOUT, RENDER_RATE, MIN_RENDER_RATE)
+    keyboard = Keyboard(window, clock=clock)
+    keys = dict(trace['keys'])
+
+    checksums = []
+    state_checksum = screen_checksum = 0
+    simulated = rendered = 0
+    try:
+        for tick in range(trace['ticks']):
+            clock.tick = tick
+            window.keys.extend(keys.get(tick, ()))
+            keyboard.on_readable()
+            start = perf_counter()
+            simulation.step(keyboard.read())
+            simulated += perf_counter() - start
+
+            if simulation.ship:
+                camera.follow(simulation.ship)
+            snapshot = simulation.get_snapshot(camera.get_view())
+            state_checksum = get_state_checksum(snapshot, state_checksum)
+            # the game is never behind the virtual clock
+            if pacer.should_render(False):
+                start = perf_counter()
+                renderer.draw(snapshot)
+                compositor.flush()
+                rendered += perf_counter() - start
+            screen_checksum = get_screen_checksum(window, screen_checksum)
+            checksums.append([state_checksum, screen_checksum])
+    finally:
+        simulation.close()
+    return checksums, simulated, rendered
+
+
+def record(path, seed, ticks, rows, columns, **options):
+    trace = dict(
+        seed=seed,
+        rows=rows,
+        columns=columns,
+        ticks=ticks,
+        options=options,
+        keys=get_keys(seed, ticks),
+    )
+    trace['checksums'], _, _ = run(trace)
+    with open(path, 'w') as file:
+        json.dump(trace, file, separators=(',', ':'))
+
+
+def check(path, engine=ENGINE):
+    """Play the trace, print timing and the first tick which differs."""
+
+    with open(path) as file:
+        trace = json.load(file)
+    checksums, simulated, rendered = run(trace, engine)
+    ticks = trace['ticks']
+    print(f'{path}: {ticks} ticks, simulation '
+          f'{simulated * 1000 / ticks:.3f} ms, render '
+          f'{rendered * 1000 / ticks:.3f} ms per tick')
+    for tick, (golden, played) in enumerate(zip(trace['checksums'], checksums)):
+        if golden != played:
+            part = 'state' if golden[0] != played[0] else 'screen'
+            print(f'  {part} differs from tick {tick}')
+            return False
+    print('  same as golden')
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record')
+    record_parser.add_argument('path')
+    record_parser.add_argument('--seed', type=int, default=0)
+    record_parser.add_argument('--ticks', type=int, default=1000)
+    record_parser.add_argument('--rows', type=int, default=50)
+    record_parser.add_argument('--columns', type=int, default=200)
+    record_parser.add_argument('--year', type=int, default=2020)
+    record_parser.add_argument('--god-mode', action='store_true')
+    check_parser = subparsers.add_parser('check')
+    check_parser.add_argument('paths', nargs='*')
+    check_parser.add_argument(
+        '--engine', choices=('coroutines', 'ecs'), default=ENGINE,
+        help='engine to play the traces, they are recorded by coroutines'
+    )
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(
+            args.path, args.seed, args.ticks, args.rows, args.columns,
+            year=args.year, god_mode=args.god_mode
+        )
+        return
+
+    paths = args.paths or sorted(glob(TRACES))
+    results = [check(path, args.engine) for path in paths]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+_current_scheduler = None
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: slot per tick, delays longer than the wheel
+    wait for their slot for several full turns.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+        self._slots = [[] for _ in range(size)]
+        self._cursor = 0
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots)
+
+    def __iter__(self):
+        for slot in self._slots:
+            for _, item in slot:
+                yield item
+
+    def schedule(self, tics, item):
+        """Put item to be returned by advance() called `tics` times later."""
+
+        rounds, offset = divmod(tics - 1, self.size)
+        self._slots[(self._cursor + offset + 1) % self.size].append(
+            (rounds, item)
+        )
+
+    def advance(self):
+        """Turn the wheel by one tick, return items which are due."""
+
+        self._cursor = (self._cursor + 1) % self.size
+        slot = self._slots[self._cursor]
+        if not slot:
+            return []
+
+        due = [item for rounds, item in slot if not rounds]
+        if len(due) == len(slot):
+            slot.clear()
+        else:
+            slot[:] = [(rounds - 1, item) for rounds, item in slot if rounds]
+        return due
+
+
+class Scheduler:
+    """
+    Run coroutines tick by tick. Coroutines are suspended with
+    `await utils.asleep(tics)`, all coroutines due on the tick are stepped
+    in one pass, new coroutines spawned during the pass join it.
+    Coroutines suspended with `await utils.park()` wait for wake().
+    """
+
+    def __init__(self, wheel_size=256):
+        self.tick = 0
+        self.live = 0
+        self._wheel = TimingWheel(wheel_size)
+        self._ready = []
+        self._parked = set()
+
+    def spawn(self, coroutine):
+        self._ready.append(coroutine)
+        self.live += 1
+        return coroutine
+
+    def wake(self, coroutine):
+        """Step parked coroutine in the current or the next pass."""
+
+        self._parked.remove(coroutine)
+        self._ready.append(coroutine)
+
+    def send(self, coroutine):
+        """
+        Step coroutine, return tics to sleep, 0 if it has finished
+        or utils.PARKED.
+        """
+
+        try:
+            return coroutine.send(None)
+        except StopIteration:
+            return 0
+
+    def step(self):
+        """Step coroutines due on the current tick and advance the tick."""
+
+        global _current_scheduler
+        previous_scheduler, _current_scheduler = _current_scheduler, self
+
+        ready, schedule, send = self._ready, self._wheel.schedule, self.send
+        try:
+            index = 0
+            while index < len(ready):
+                coroutine = ready[index]
+                index += 1
+                tics = send(coroutine)
+                if tics > 0:
+                    schedule(tics, coroutine)
+                elif tics:
+                    self._parked.add(coroutine)
+                else:
+                    self.live -= 1
+        finally:
+            _current_scheduler = previous_scheduler
+
+        self.tick += 1
+        self._ready = self._wheel.advance()
+
+    def close(self):
+        """Close all coroutines which have not finished yet."""
+
+        coroutines = [*self._ready, *self._wheel, *self._parked]
+        self._ready = []
+        self._wheel = TimingWheel(self._wheel.size)
+        self._parked = set()
+        for coroutine in coroutines:
+            coroutine.close()
+        self.live = 0
+
+
+def spawn(coroutine):
+    """Spawn coroutine on the scheduler which is stepping right now."""
+
+    if _current_scheduler is None:
+        raise RuntimeError('no running scheduler')
+    return _current_scheduler.spawn(coroutine)
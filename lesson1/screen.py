@@ -0,0 +1,90 @@
+import curses
+
+from headless import HeadlessCanvas
+
+
+class FrameBuffer(HeadlessCanvas):
+    """
+    Back buffer with the same interface as curses window. Game coroutines
+    draw into it, keys are read from the real window.
+    """
+
+    def __init__(self, window):
+        rows, columns = window.getmaxyx()
+        super().__init__(rows, columns)
+        self.window = window
+
+    def getch(self):
+        return self.window.getch()
+
+    def nodelay(self, flag):
+        self.window.nodelay(flag)
+
+
+class Compositor:
+    """
+    Copy changes of back buffer to the window once per tick. Changed cells
+    are compared with front buffer — what is already on the screen —
+    and sent to curses as runs of symbols with the same attribute.
+    The runs are passed to recorder too, if it is given.
+    """
+
+    def __init__(self, window, back, update=curses.doupdate, recorder=None):
+        self.window = window
+        self.back = back
+        self.update = update
+        self.recorder = recorder
+        rows, columns = back.getmaxyx()
+        self.front_symbols = [[' '] * columns for _ in range(rows)]
+        self.front_attrs = [[0] * columns for _ in range(rows)]
+        self.cells_written = 0
+
+    def _get_changed_runs(self, row):
+        """Yield (start column, end column, attr) of changed cells."""
+
+        symbols, attrs = self.back.symbols[row], self.back.attrs[row]
+        front_symbols, front_attrs = self.front_symbols[row], self.front_attrs[row]
+
+        columns = len(symbols)
+        if row == len(self.back.symbols) - 1:
+            # curses can`t addstr to the lower right corner
+            columns -= 1
+
+        start = None
+        for column in range(columns):
+            changed = (
+                symbols[column] != front_symbols[column]
+                or attrs[column] != front_attrs[column]
+            )
+            if start is not None and (not changed or attrs[column] != attr):
+                yield start, column, attr
+                start = None
+            if changed and start is None:
+                start, attr = column, attrs[column]
+        if start is not None:
+            yield start, columns, attr
+
+    def flush(self):
+        back_symbols, back_attrs = self.back.symbols, self.back.attrs
+        runs = [] if self.recorder else None
+        for row, symbols in enumerate(back_symbols):
+            attrs = back_attrs[row]
+            if symbols == self.front_symbols[row] and attrs == self.front_attrs[row]:
+                continue
+
+            for start, end, attr in self._get_changed_runs(row):
+                text = ''.join(symbols[start:end])
+                self.window.addstr(row, start, text, attr)
+                self.cells_written += end - start
+                if runs is not None:
+                    runs.append((row, start, attr, text))
+
+            self.front_symbols[row] = symbols.copy()
+            self.front_attrs[row] = attrs.copy()
+
+        self.window.noutrefresh()
+        self.update()
+        if runs is not None:
+            self.recorder.record_frame(
+                runs, self.front_symbols, self.front_attrs
+            )
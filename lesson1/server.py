@@ -0,0 +1,224 @@
+"""
+Game server: every TCP connection is a player with own game and own
+screen, all of them are run by one asyncio loop. Sessions are stepped
+together on every tick, their frames are sent as ANSI diffs of the
+screen. Frames of a client which doesn`t read them are dropped until its
+queue is sent.
+
+Run from repository root: python lesson1/server.py
+Play from another terminal: stty raw -echo; nc 127.0.0.1 8765; stty sane
+"""
+import argparse
+import asyncio
+
+from ansi import AnsiTerminal, SETUP
+from pacing import FramePacer, run_paced
+from render import Renderer, get_info_window
+from screen import Compositor, FrameBuffer
+from keyboard import Keyboard
+from simulation import create_simulation
+from stars import StarField
+
+from config import (
+    BORDERS,
+    TIC_TIMEOUT,
+    RENDER_RATE,
+    MIN_RENDER_RATE,
+    STARS,
+    STARS_NUM,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_SCREEN,
+    SERVER_MAX_PENDING,
+)
+
+
+# every frame ends with cursor home, the only CUP without parameters
+# the terminal sends, so clients can count frames
+FRAME_END = b'\x1b[H'
+
+
+class SessionTerminal(AnsiTerminal):
+    """
+    AnsiTerminal of a network session: output is written to transport,
+    keys are taken from data received.
+    """
+
+    def __init__(self, rows, columns, transport):
+        super().__init__(rows, columns, output_fd=None, input_fd=None)
+        self.transport = transport
+        self._received = b''
+        self._append(SETUP)
+
+    def _write(self, data):
+        # transport keeps what the socket doesn`t take, buffer is reused
+        self.transport.write(bytes(data))
+        return len(data)
+
+    def _read_keys(self):
+        keys, self._received = self._received, b''
+        return keys
+
+    def feed(self, data):
+        self._received += data
+
+    def end_frame(self):
+        """Mark the end of the frame and send it."""
+
+        self._append(FRAME_END)
+        self._cursor = 0, 0
+        self.doupdate()
+
+
+class Session(asyncio.Protocol):
+    """Connection of a player with own game, screen and keys."""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.paused = False
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def connection_made(self, transport):
+        server = self.server
+        rows, columns = server.rows, server.columns
+        self.transport = transport
+        transport.set_write_buffer_limits(high=server.max_pending)
+
+        self.terminal = SessionTerminal(rows, columns, transport)
+        canvas = FrameBuffer(self.terminal)
+        if BORDERS:
+            canvas.border()
+        self.simulation = create_simulation(
+            rows, columns, **server.simulation_options
+        )
+        self.renderer = Renderer(
+            canvas,
+            StarField.random(
+                STARS_NUM,
+                BORDERS, rows-1-BORDERS,
+                BORDERS, columns-1-BORDERS,
+                STARS
+            ),
+            get_info_window(canvas),
+            beep=self.terminal.beep
+        )
+        self.compositor = Compositor(
+            self.terminal, canvas, self.terminal.end_frame
+        )
+        self.keyboard = Keyboard(self.terminal)
+        server.sessions[self] = None
+
+    def data_received(self, data):
+        self.terminal.feed(data)
+        self.keyboard.on_readable()
+
+    def connection_lost(self, exc):
+        del self.server.sessions[self]
+        self.simulation.close()
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+
+    def simulate(self):
+        self.simulation.step(self.keyboard.read())
+
+    def render(self):
+        if self.paused:
+            # client is behind, the frame isn`t queued after older ones,
+            # the next frame sent has the changes of dropped ones
+            self.dropped_frames += 1
+            return
+        self.renderer.draw(self.simulation.get_snapshot())
+        self.compositor.flush()
+        self.frames += 1
+
+
+class GameServer:
+    """
+    Sessions of all connections, stepped and rendered tick by tick by
+    one frame pacer: when the server is behind, renders are skipped for
+    all sessions at once.
+    """
+
+    def __init__(self, rows, columns, tic_timeout=TIC_TIMEOUT,
+                 max_pending=SERVER_MAX_PENDING, **simulation_options):
+        self.rows = rows
+        self.columns = columns
+        self.max_pending = max_pending
+        self.simulation_options = simulation_options
+        self.pacer = FramePacer(tic_timeout, RENDER_RATE, MIN_RENDER_RATE)
+        # dict instead of set keeps the order of sessions stable
+        self.sessions = {}
+        self.port = None
+
+    def create_session(self):
+        return Session(self)
+
+    def simulate(self):
+        for session in list(self.sessions):
+            session.simulate()
+
+    def render(self):
+        for session in list(self.sessions):
+            session.render()
+
+    def close(self):
+        for session in list(self.sessions):
+            session.transport.close()
+
+    async def serve(self, host=SERVER_HOST, port=SERVER_PORT, ticks=None,
+                    on_start=None):
+        """
+        Accept connections and run the game, forever or for the given
+        number of ticks. Port 0 picks a free one, it is set to self.port
+        before on_start is called.
+        """
+
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(self.create_session, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        if on_start:
+            on_start(self)
+        try:
+            async with server:
+                await run_paced(self.simulate, self.render, self.pacer, ticks)
+        finally:
+            self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                        help='0 to pick a free port')
+    parser.add_argument('--rows', type=int, default=SERVER_SCREEN[0])
+    parser.add_argument('--columns', type=int, default=SERVER_SCREEN[1])
+    parser.add_argument('--ticks', type=int, help='stop after the ticks')
+    parser.add_argument('--year', type=int)
+    parser.add_argument('--god-mode', action='store_true')
+    args = parser.parse_args()
+
+    server = GameServer(
+        args.rows, args.columns, year=args.year, god_mode=args.god_mode
+    )
+
+    def on_start(server):
+        print(f'listening on {args.host}:{server.port}', flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.ticks, on_start))
+    except KeyboardInterrupt:
+        pass
+    report = server.pacer.get_report()
+    print(f'ticks: {report["ticks"]}, rendered: {report["rendered"]}, '
+          f'late: {report["late_ticks"]}, lateness ms p50/p99/max: '
+          + '/'.join(f'{late:.1f}' for late in report['lateness_ms'].values()))
+
+
+if __name__ == '__main__':
+    main()
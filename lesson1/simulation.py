@@ -0,0 +1,483 @@
+"""
+Game simulation without canvas. State is advanced in fixed steps,
+one tick per step(), rendering reads snapshots returned by get_snapshot().
+
+Run headless from repository root: python lesson1/simulation.py --help
+"""
+from array import array
+from collections import namedtuple
+from itertools import chain
+import random
+from time import perf_counter
+
+from assets import load_pack
+from curses_tools import compile_frame, get_frame_size
+from explosion import EXPLOSION_TICS, explode
+from obstacles import Obstacle, ObstacleStore
+from particles import ParticleSystem
+from phisics import update_speed
+from pool import WorkerPool
+from scheduler import Scheduler
+from utils import (
+                  asleep,
+                  cycle_with_repeat,
+                  validate_value,
+                  get_garbage_delay_tics
+                  )
+
+from config import (
+    GOD_MODE,
+    DEBUG,
+    DEBUG_YEAR,
+    SPEED,
+    BORDERS,
+    MIN_GARBAGE_SPEED,
+    MAX_GARBAGE_SPEED,
+    GARBAGE_WORKERS,
+    BULLET_WORKERS,
+    SPAWN_QUEUE_SIZE,
+    PARTICLES_CAPACITY,
+    MAX_BEEPS_PER_TICK,
+    ENGINE,
+)
+
+
+TICS_PER_YEAR = 15
+
+Snapshot = namedtuple(
+    'Snapshot', 'tick year sprites particles beeps game_over'
+)
+
+
+class Entity:
+    """Visible thing on the playfield, frame None hides it."""
+
+    __slots__ = ('row', 'column', 'frame')
+
+    def __init__(self, row, column, frame=None):
+        self.row = row
+        self.column = column
+        self.frame = frame
+
+
+class Bullet(Entity):
+    """Gun shot, collides with garbage only when armed — in flight."""
+
+    __slots__ = ('armed', 'hit')
+
+    def __init__(self, row, column, frame=None):
+        super().__init__(row, column, frame)
+        self.armed = False
+        self.hit = False
+
+    def reset(self, row, column, frame=None):
+        self.row, self.column, self.frame = row, column, frame
+        self.armed = self.hit = False
+
+
+class Simulation:
+    """
+    Game state: year, garbage, bullets, explosions and the spaceship.
+    Entities are animated by coroutines on own Scheduler, one step()
+    is one tick of the game. Garbage and bullets are run by pools of
+    long-lived workers, which reuse their entities. Explosions are
+    particles, moved all at once on every step.
+    """
+
+    def __init__(self, rows, columns, garbage_frames, spaceship_frames,
+                 year=None, god_mode=GOD_MODE, debug=DEBUG, scheduler=None,
+                 garbage_workers=GARBAGE_WORKERS,
+                 bullet_workers=BULLET_WORKERS, screen_columns=None,
+                 garbage_rate=None, fire_rate=None, rng=None):
+        self.rows = rows
+        self.columns = columns
+        self.garbage_frames = garbage_frames
+        self.god_mode = god_mode
+        self.debug = debug
+        self.year = year or (DEBUG_YEAR if debug else 1957)
+        self.scheduler = scheduler or Scheduler()
+        # random choices of the game, seeded random.Random makes it repeatable
+        self.rng = rng or random
+        # garbage density of a screen is kept across the whole world width
+        self.garbage_per_spawn = max(1, round(columns / (screen_columns or columns)))
+        # garbage and ship shots per tick instead of the year schedule and
+        # the fire key, None to play as usual; used by stress runs
+        self.garbage_rate = garbage_rate
+        self.fire_rate = fire_rate
+
+        # dicts instead of sets keep drawing and collision order stable
+        self.entities = {}
+        # garbage is drawn from here, not from entities: snapshot of a view
+        # finds garbage in it through obstacles
+        self.garbage = {}
+        self.obstacle_garbage = {}
+        self.ship = None
+        self.bullets = {}
+        self.obstacles = ObstacleStore()
+        self.obstacles_in_last_collisions = set()
+        self.particles = ParticleSystem(PARTICLES_CAPACITY, self.rng)
+        self.controls = (0, 0, False)
+        self.beeps = 0
+        self.game_over = False
+
+        self.garbage_pool = WorkerPool(
+            self.scheduler, garbage_workers, SPAWN_QUEUE_SIZE
+        )
+        self.bullet_pool = WorkerPool(
+            self.scheduler, bullet_workers, SPAWN_QUEUE_SIZE
+        )
+        self.garbage_pool.start(self.fly_garbage)
+        self.bullet_pool.start(self.fire)
+
+        self.scheduler.spawn(self.year_count())
+        self.scheduler.spawn(self.fill_orbit_with_garbage())
+        self.scheduler.spawn(self.run_spaceship(
+            rows // 2, columns // 2, spaceship_frames
+        ))
+
+    @property
+    def tick(self):
+        return self.scheduler.tick
+
+    @property
+    def busy(self):
+        """Number of garbage and bullet workers which have a job."""
+
+        return len(self.garbage_pool) + len(self.bullet_pool)
+
+    @property
+    def dropped(self):
+        """Number of garbage and gun shots dropped by full pools."""
+
+        return self.garbage_pool.dropped + self.bullet_pool.dropped
+
+    def step(self, controls=(0, 0, False)):
+        """
+        Advance the game by one tick. Controls are rows direction, columns
+        direction and fire flag, as returned by read_controls().
+        """
+
+        self.controls = controls
+        self.beeps = 0
+        self.particles.step()
+        self.scheduler.step()
+        self.collide_bullets()
+
+    def close(self):
+        """Close coroutines of the game."""
+
+        self.scheduler.close()
+
+    def collide_bullets(self):
+        """
+        Collide all armed bullets with garbage at once, hit bullets
+        disappear, hit garbage is marked in obstacles_in_last_collisions.
+        """
+
+        bullets = [
+            bullet for bullet in self.bullets
+            if bullet.armed and not bullet.hit
+        ]
+        if not bullets or not self.obstacles:
+            return
+
+        hits = self.obstacles.collide_points(
+            array('d', [bullet.row for bullet in bullets]),
+            array('d', [bullet.column for bullet in bullets]),
+        )
+        for index, obstacle in hits:
+            bullet = bullets[index]
+            bullet.hit = True
+            bullet.frame = None
+            self.obstacles_in_last_collisions.add(obstacle)
+
+    def get_snapshot(self, view=None):
+        """
+        Return state to draw. View is top row, left column, rows and
+        columns of the world part seen on the screen: entities outside it
+        are culled, garbage in it is found through obstacles index, and
+        positions are given relative to the view.
+        """
+
+        if view is None:
+            top = left = 0
+            obstacles = list(self.obstacles)
+            garbage = self.garbage
+            entities = self.entities
+        else:
+            top, left, rows, columns = view
+            bottom, right = top + rows, left + columns
+            obstacles = self.obstacles.query_box(top, left, rows, columns)
+            garbage = map(self.obstacle_garbage.get, obstacles)
+            entities = [
+                entity for entity in self.entities
+                if entity.frame is not None
+                and top - entity.frame.rows < entity.row < bottom
+                and left - entity.frame.columns < entity.column < right
+            ]
+
+        sprites = [
+            (entity.row - top, entity.column - left, entity.frame)
+            for entity in chain(garbage, entities)
+            if entity.frame is not None
+        ]
+        if self.debug:
+            sprites.extend(
+                (row - top, column - left, compile_frame(frame))
+                for row, column, frame in map(
+                    Obstacle.dump_bounding_box, obstacles
+                )
+            )
+        return Snapshot(
+            self.tick, self.year, sprites,
+            self.particles.get_snapshot(top, left),
+            self.beeps, self.game_over
+        )
+
+    def show(self, row, column, frame=None):
+        entity = Entity(row, column, frame)
+        self.entities[entity] = None
+        return entity
+
+    def hide(self, entity):
+        self.entities.pop(entity, None)
+
+    def beep(self):
+        """Ask for a beep, at most MAX_BEEPS_PER_TICK are made per tick."""
+
+        if self.beeps < MAX_BEEPS_PER_TICK:
+            self.beeps += 1
+
+    def spawn_garbage(self, column, garbage_frame, speed=0.5, row=BORDERS):
+        """Pass garbage to a free worker, return False if it is dropped."""
+
+        return self.garbage_pool.submit(row, column, garbage_frame, speed)
+
+    def spawn_bullet(self, row, column, rows_speed=-2, columns_speed=0):
+        """Pass gun shot to a free worker, return False if it is dropped."""
+
+        return self.bullet_pool.submit(row, column, rows_speed, columns_speed)
+
+    async def year_count(self):
+        while True:
+            await asleep(TICS_PER_YEAR)
+            self.year += 1
+
+    async def fire(self, pool, index):
+        """
+        Pool worker flying gun shots, direction and speed are given
+        with every shot.
+        """
+
+        bullet = Bullet(0, 0)
+        max_row = self.rows - 1 - BORDERS
+        max_column = self.columns - 1 - BORDERS
+
+        while True:
+            row, column, rows_speed, columns_speed = await pool.get_job(index)
+            bullet.reset(row, column, compile_frame('*'))
+            self.entities[bullet] = None
+            self.bullets[bullet] = None
+
+            await asleep()
+            bullet.frame = compile_frame('O')
+            await asleep()
+
+            row += rows_speed
+            column += columns_speed
+            bullet.frame = compile_frame('-' if columns_speed else '|')
+
+            self.beep()
+
+            while BORDERS < row < max_row and BORDERS < column < max_column:
+                bullet.row, bullet.column = row, column
+                await asleep()
+                if bullet.hit:
+                    break
+                # collisions are checked by collide_bullets() after the step
+                bullet.armed = True
+                row += rows_speed
+                column += columns_speed
+
+            del self.bullets[bullet]
+            self.hide(bullet)
+
+    async def run_spaceship(self, start_row, start_column, frames):
+        frame_rows, frame_columns = get_frame_size(frames[0])
+
+        row = start_row - (frame_rows // 2)
+        column = start_column - (frame_columns // 2)
+        ship = self.ship = self.show(row, column)
+
+        rows_speed = columns_speed = 0
+        shots_due = 0
+
+        for frame in cycle_with_repeat(frames, repeat=2):
+            rows_direction, columns_direction, action_fire = self.controls
+            rows_speed, columns_speed = update_speed(
+                rows_speed, columns_speed,
+                rows_direction, columns_direction,
+                row_speed_limit=SPEED,
+                column_speed_limit=SPEED
+            )
+
+            row = validate_value(
+                row+rows_speed,
+                BORDERS,
+                self.rows-frame_rows-BORDERS
+            )
+            column = validate_value(
+                column+columns_speed,
+                BORDERS,
+                self.columns-frame_columns-BORDERS
+            )
+            ship.row, ship.column, ship.frame = row, column, frame
+
+            if self.fire_rate is not None:
+                shots_due += self.fire_rate
+                shots, shots_due = int(shots_due), shots_due % 1
+            else:
+                shots = int(action_fire and (self.year > 2019 or self.god_mode))
+            for shot in range(shots):
+                # several shots of a tick are spread across the ship
+                self.spawn_bullet(
+                    row, column + frame_columns * (2 * shot + 1) // (2 * shots)
+                )
+            await asleep()
+
+            if self.god_mode:
+                continue
+
+            collisions = self.obstacles.query_rect(
+                row, column, frame_rows, frame_columns, frame.mask
+            )
+            if collisions:
+                self.obstacles_in_last_collisions.update(collisions)
+                self.hide(ship)
+                explode(
+                    self,
+                    row + frame_rows // 2,
+                    column + frame_columns // 2
+                )
+                await asleep(EXPLOSION_TICS)
+                self.game_over = True
+                return
+
+    async def fly_garbage(self, pool, index):
+        """Pool worker flying garbage from top to bottom.
+        Сolumn position will stay same, as specified on start."""
+
+        garbage = Entity(0, 0)
+        obstacle = None
+
+        while True:
+            row, column, garbage_frame, speed = await pool.get_job(index)
+            column = max(column, BORDERS)
+            column = min(column, self.columns - 1 - BORDERS)
+
+            rows_size, columns_size = get_frame_size(garbage_frame)
+
+            obstacle = self.obstacles.add(
+                row, column, rows_size, columns_size, obstacle,
+                garbage_frame.mask
+            )
+            garbage.row, garbage.column, garbage.frame = row, column, garbage_frame
+            self.garbage[garbage] = None
+            self.obstacle_garbage[obstacle] = garbage
+
+            while row < self.rows-1:
+                garbage.row = row
+                await asleep()
+                row += speed
+                if obstacle in self.obstacles_in_last_collisions:
+                    self.obstacles_in_last_collisions.remove(obstacle)
+                    explode(
+                        self,
+                        row + rows_size // 2,
+                        column + columns_size // 2
+                    )
+                    break
+                self.obstacles.move(obstacle, row)
+
+            del self.garbage[garbage]
+            del self.obstacle_garbage[obstacle]
+            self.obstacles.remove(obstacle)
+
+    async def fill_orbit_with_garbage(self):
+        spawns_due = 0
+        while True:
+            if self.garbage_rate is not None:
+                await asleep()
+                spawns_due += self.garbage_rate
+                spawns, spawns_due = int(spawns_due), spawns_due % 1
+            else:
+                garbage_delay = get_garbage_delay_tics(self.year)
+                if not garbage_delay:
+                    await asleep()
+                    continue
+                await asleep(garbage_delay)
+                spawns = self.garbage_per_spawn
+            for _ in range(spawns):
+                self.spawn_garbage(
+                    column=self.rng.randint(BORDERS, self.columns-1-BORDERS),
+                    garbage_frame=self.rng.choice(self.garbage_frames),
+                    speed=self.rng.uniform(
+                        MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+                    )
+                )
+
+
+def create_simulation(rows, columns, engine=ENGINE, **kwargs):
+    """
+    Create Simulation, or EcsSimulation for the 'ecs' engine, with the
+    garbage and spaceship frames from pack.
+    """
+
+    pack = load_pack()
+    engine_class = Simulation
+    if engine == 'ecs':
+        # imported here, ecs imports this module
+        from ecs import EcsSimulation as engine_class
+    return engine_class(
+        rows, columns,
+        pack.get_frames('garbage'),
+        pack.get_frames('spaceship'),
+        **kwargs
+    )
+
+
+def autopilot(rng=random):
+    """Random controls for headless runs."""
+
+    return rng.randint(-1, 1), rng.randint(-1, 1), rng.randint(0, 3) == 0
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--columns', type=int, default=200)
+    parser.add_argument(
+        '--ticks', type=int, default=36000,
+        help='ticks to simulate, default is an hour of play'
+    )
+    parser.add_argument('--god-mode', action='store_true')
+    args = parser.parse_args()
+
+    simulation = create_simulation(
+        args.rows, args.columns, god_mode=args.god_mode
+    )
+    start = perf_counter()
+    for _ in range(args.ticks):
+        simulation.step(autopilot())
+    elapsed = perf_counter() - start
+
+    print(f'ticks: {args.ticks}, year: {simulation.year}, '
+          f'garbage on screen: {len(simulation.garbage)}, '
+          f'game over: {simulation.game_over}')
+    print(f'{elapsed:.2f} s, {args.ticks / elapsed:.0f} ticks per second')
+
+
+if __name__ == '__main__':
+    main()
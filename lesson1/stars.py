@@ -0,0 +1,101 @@
+from array import array
+import curses
+import random
+
+
+# (brightness, tics) — dim for 20 tics, normal for 3, bold for 5, normal for 3
+BLINK_CYCLE = (
+    (curses.A_DIM, 20),
+    (curses.A_NORMAL, 3),
+    (curses.A_BOLD, 5),
+    (curses.A_NORMAL, 3),
+)
+CYCLE_LENGTH = sum(tics for _, tics in BLINK_CYCLE)
+MAX_START_DELAY = 25
+
+
+def _get_phase_changes():
+    """Return pairs (phase, brightness) for phases where brightness changes."""
+
+    changes = []
+    phase = 0
+    for brightness, tics in BLINK_CYCLE:
+        changes.append((phase, brightness))
+        phase += tics
+    return tuple(changes)
+
+
+PHASE_CHANGES = _get_phase_changes()
+
+
+class StarField:
+    """
+    All blinking stars in one object. Positions, symbols and start delays
+    are kept in arrays, stars are grouped by start delay, so on every tick
+    only stars whose brightness changes are looked at and redrawn.
+    """
+
+    def __init__(self, rows, columns, symbols, delays):
+        self.rows = array('H', rows)
+        self.columns = array('H', columns)
+        self.symbols = ''.join(symbols)
+        self.delays = array('B', delays)
+        self.tick = 0
+
+        self._stars_by_delay = [array('I') for _ in range(CYCLE_LENGTH)]
+        for index, delay in enumerate(self.delays):
+            self._stars_by_delay[delay % CYCLE_LENGTH].append(index)
+
+    def __len__(self):
+        return len(self.delays)
+
+    @classmethod
+    def random(cls, number, min_row, max_row, min_column, max_column,
+               symbols, rng=None):
+        """
+        Scatter stars randomly, boundaries are inclusive like in randint.
+        Stars are placed by rng, the random module by default. A star in
+        the lower right cell is dropped: when it is the corner of the
+        screen, curses can`t addstr there.
+        """
+
+        rng = rng or random
+        stars = zip(
+            [rng.randint(min_row, max_row) for _ in range(number)],
+            [rng.randint(min_column, max_column) for _ in range(number)],
+            [rng.choice(symbols) for _ in range(number)],
+            [rng.randint(0, MAX_START_DELAY) for _ in range(number)],
+        )
+        stars = [
+            star for star in stars if star[:2] != (max_row, max_column)
+        ]
+        return cls(*zip(*stars)) if stars else cls((), (), (), ())
+
+    def get_changes(self, tick):
+        """Yield (star index, brightness) for stars blinking on the tick."""
+
+        for phase, brightness in PHASE_CHANGES:
+            if tick < phase:
+                break
+            started = tick - phase
+            delay = started % CYCLE_LENGTH
+            if delay > started:
+                continue
+            for index in self._stars_by_delay[delay]:
+                yield index, brightness
+
+    def draw(self, canvas, tick=None):
+        """
+        Draw stars changed since the last draw up to the tick, not
+        including it, by default only ones changed on the current tick.
+        """
+
+        if tick is None:
+            tick = self.tick + 1
+        rows, columns, symbols = self.rows, self.columns, self.symbols
+        for skipped_tick in range(self.tick, tick):
+            for index, brightness in self.get_changes(skipped_tick):
+                canvas.addstr(
+                    rows[index], columns[index], symbols[index], brightness
+                )
+        self.tick = tick
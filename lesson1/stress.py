@@ -0,0 +1,256 @@
+"""
+Stress mode: run the game headless through steps of growing load —
+garbage spawned per tick, stars, ship shots per tick and screen size —
+until ticks don`t fit the budget. Every tick of a step records its time,
+busy workers, memory and collision checks; the steps are summed up
+into a scaling report printed and saved as CSV or JSON. Random choices
+of the game are seeded, so runs with the same seed make the same load.
+
+Run from repository root: python lesson1/stress.py --help
+"""
+import argparse
+import csv
+import json
+import os
+from math import ceil
+from random import seed
+from statistics import mean, quantiles
+from time import perf_counter
+
+from headless import HeadlessCanvas
+from render import Renderer
+from simulation import autopilot, create_simulation
+from stars import StarField
+
+from config import TIC_TIMEOUT, STARS, MIN_GARBAGE_SPEED, MAX_GARBAGE_SPEED
+
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+# values of the first step, load of every next step is multiplied by growth
+START = dict(garbage_rate=0.5, stars=100, fire_rate=0.25, rows=30, columns=100)
+# ticks of the bullet flight: the shot takes two tics to arm
+BULLET_ARMING_TICS = 2
+
+
+def get_ramp(steps, growth, start=START):
+    """
+    Return steps of the schedule. Rates and stars grow by growth on every
+    step, screen area grows by it too.
+    """
+
+    ramp = []
+    for number in range(steps):
+        factor = growth ** number
+        side_factor = factor ** 0.5
+        ramp.append(dict(
+            garbage_rate=start['garbage_rate'] * factor,
+            stars=round(start['stars'] * factor),
+            fire_rate=start['fire_rate'] * factor,
+            rows=round(start['rows'] * side_factor),
+            columns=round(start['columns'] * side_factor),
+        ))
+    return ramp
+
+
+def load_schedule(path):
+    """Return steps from JSON list of dicts with the keys of START."""
+
+    with open(path) as file:
+        return [{**START, **step} for step in json.load(file)]
+
+
+def get_rss():
+    """Return resident memory of the process in bytes."""
+
+    with open('/proc/self/statm') as file:
+        return int(file.read().split()[1]) * PAGE_SIZE
+
+
+def run_step(step, ticks, warmup, budget):
+    """
+    Run one step of the schedule on a fresh game, return records of the
+    ticks after warmup: tick time in ms, busy workers, resident memory
+    in MB and collision checks made during the tick. Warmup is by default
+    the time garbage of the mean speed needs to cross the screen.
+    """
+
+    rows, columns = step['rows'], step['columns']
+    if warmup is None:
+        warmup = ceil(rows * 2 / (MIN_GARBAGE_SPEED + MAX_GARBAGE_SPEED))
+    # pools are large enough to keep every garbage and shot of the step
+    garbage_workers = ceil(step['garbage_rate'] * rows / MIN_GARBAGE_SPEED) + 1
+    bullet_workers = ceil(step['fire_rate'] * (rows + BULLET_ARMING_TICS)) + 1
+    game = create_simulation(
+        rows, columns,
+        year=2020,
+        god_mode=True,
+        garbage_workers=garbage_workers,
+        bullet_workers=bullet_workers,
+        garbage_rate=step['garbage_rate'],
+        fire_rate=step['fire_rate'],
+    )
+    renderer = Renderer(
+        HeadlessCanvas(rows, columns),
+        StarField.random(step['stars'], 1, rows - 2, 1, columns - 2, STARS)
+    )
+    records = []
+    try:
+        for tick in range(warmup + ticks):
+            controls = autopilot()
+            checks = game.obstacles.checks
+            start = perf_counter()
+            game.step(controls)
+            renderer.draw(game.get_snapshot())
+            elapsed = perf_counter() - start
+            if tick < warmup:
+                continue
+            records.append(dict(
+                tick_ms=elapsed * 1000,
+                busy=game.busy,
+                rss_mb=get_rss() / 2 ** 20,
+                checks=game.obstacles.checks - checks,
+            ))
+        dropped = game.dropped
+        entities = len(game.garbage) + len(game.bullets)
+    finally:
+        game.close()
+
+    tick_ms = [record['tick_ms'] for record in records]
+    if len(tick_ms) < 2:
+        # quantiles() needs two values at least
+        p50 = p95 = tick_ms[0]
+    else:
+        p50, p95 = (quantiles(tick_ms, n=100)[index] for index in (49, 94))
+    summary = dict(
+        step,
+        entities=entities,
+        dropped=dropped,
+        tick_ms_p50=p50,
+        tick_ms_p95=p95,
+        tick_ms_max=max(tick_ms),
+        busy_max=max(record['busy'] for record in records),
+        rss_mb_max=max(record['rss_mb'] for record in records),
+        checks_mean=mean(record['checks'] for record in records),
+        breach=p95 > budget,
+    )
+    return summary, records
+
+
+def run(schedule, ticks, warmup, budget, random_seed, on_step=None):
+    """
+    Run steps of the schedule in order, stop after the first one which
+    p95 tick time is over the budget in ms. Return summaries of the
+    steps and records of their ticks.
+    """
+
+    summaries, records = [], []
+    for number, step in enumerate(schedule):
+        # same load on every run: every step starts from the same state
+        seed(random_seed + number)
+        summary, step_records = run_step(step, ticks, warmup, budget)
+        summary = dict(step=number, **summary)
+        summaries.append(summary)
+        records.extend(
+            dict(step=number, tick=tick, **record)
+            for tick, record in enumerate(step_records)
+        )
+        if on_step:
+            on_step(summary)
+        if summary['breach']:
+            break
+    return summaries, records
+
+
+def save_csv(path, rows):
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_summary(summary):
+    print(
+        f'{summary["step"]:>4} {summary["rows"]:>4}x{summary["columns"]:<4} '
+        f'{summary["garbage_rate"]:>7.2f} {summary["fire_rate"]:>6.2f} '
+        f'{summary["stars"]:>6} {summary["entities"]:>8} '
+        f'{summary["busy_max"]:>6} {summary["checks_mean"]:>8.0f} '
+        f'{summary["rss_mb_max"]:>6.1f} {summary["tick_ms_p50"]:>7.2f} '
+        f'{summary["tick_ms_p95"]:>7.2f} {summary["tick_ms_max"]:>7.2f}'
+        + (' breach' if summary['breach'] else '')
+    )
+
+
+def get_ticks(value):
+    """Parse --ticks: percentiles of a step need two ticks at least."""
+
+    ticks = int(value)
+    if ticks < 2:
+        raise argparse.ArgumentTypeError('at least 2 ticks are needed')
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--budget', type=float, default=TIC_TIMEOUT * 1000,
+        help='tick budget in ms, p95 of a step over it stops the run'
+    )
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument(
+        '--growth', type=float, default=2,
+        help='load of the step relative to the previous one'
+    )
+    parser.add_argument(
+        '--schedule',
+        help='JSON list of steps, overrides --steps and --growth, keys: '
+             + ', '.join(START)
+    )
+    parser.add_argument('--ticks', type=get_ticks, default=100,
+                        help='recorded ticks of a step')
+    parser.add_argument(
+        '--warmup', type=int,
+        help='ticks of a step to fill the screen first, by default garbage '
+             'crosses the screen'
+    )
+    parser.add_argument('--csv', help='CSV file for the steps')
+    parser.add_argument('--ticks-csv', help='CSV file for every tick')
+    parser.add_argument('--json', help='JSON file for steps and ticks')
+    args = parser.parse_args()
+
+    if args.schedule:
+        schedule = load_schedule(args.schedule)
+    else:
+        schedule = get_ramp(args.steps, args.growth)
+
+    warmup = 'screen crossing' if args.warmup is None else args.warmup
+    print(f'seed {args.seed}, budget {args.budget:g} ms per tick, '
+          f'{warmup} + {args.ticks} ticks per step')
+    print(f'{"step":>4} {"screen":>9} {"garbage":>7} {"shots":>6} '
+          f'{"stars":>6} {"entities":>8} {"busy":>6} {"checks":>8} '
+          f'{"rss MB":>6} {"p50 ms":>7} {"p95 ms":>7} {"max ms":>7}')
+    summaries, records = run(
+        schedule, args.ticks, args.warmup, args.budget, args.seed,
+        on_step=print_summary
+    )
+    if not summaries[-1]['breach']:
+        print('budget is not breached, add steps or raise --growth')
+
+    if args.csv:
+        save_csv(args.csv, summaries)
+    if args.ticks_csv:
+        save_csv(args.ticks_csv, records)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(dict(
+                seed=args.seed,
+                budget_ms=args.budget,
+                ticks=args.ticks,
+                warmup=args.warmup,
+                steps=summaries,
+                records=records,
+            ), file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
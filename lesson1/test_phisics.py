@@ -0,0 +1,134 @@
+"""
+Equivalence of batched update_speeds() with update_speed() of one ship:
+with math.cos speeds are the same, with the curve table they differ by
+less than the error of the table, except for rare snaps to zero.
+
+Run from repository root: python -m pytest, or
+python -m unittest discover -s lesson1
+"""
+from array import array
+import math
+import random
+import unittest
+
+from bots import BotSwarm
+from phisics import ACCELERATION, CURVE_STEPS, update_speed, update_speeds
+
+
+SHIPS = 10000
+LIMITS = (1, 2, 5)
+FADINGS = (0, 0.5, 0.8, 1)
+FLIGHT_SHIPS, FLIGHT_TICKS = 200, 300
+# nearest point of the table is at most half a step away
+TABLE_ERROR = ACCELERATION * math.sin(1) / CURVE_STEPS / 2 * 1.001
+
+
+def update_speeds_one_by_one(rows_speeds, columns_speeds, rows_directions,
+                             columns_directions, row_speed_limit=2,
+                             column_speed_limit=2, fading=0.8):
+    directions = zip(rows_directions, columns_directions)
+    for index, (row_direction, column_direction) in enumerate(directions):
+        rows_speeds[index], columns_speeds[index] = update_speed(
+            rows_speeds[index], columns_speeds[index],
+            row_direction, column_direction,
+            row_speed_limit, column_speed_limit, fading
+        )
+
+
+def get_ships(rng, number, limit):
+    """Return random speeds and directions, every tenth ship stands still."""
+
+    def get_speeds():
+        return array('d', (rng.uniform(-limit, limit) for _ in range(number)))
+
+    def get_directions():
+        return array('b', (rng.randint(-1, 1) for _ in range(number)))
+
+    rows_speeds = get_speeds()
+    columns_speeds = get_speeds()
+    rows_speeds[::10] = array('d', [0]) * len(rows_speeds[::10])
+    rows_directions = get_directions()
+    columns_directions = get_directions()
+    return rows_speeds, columns_speeds, rows_directions, columns_directions
+
+
+class UpdateSpeedsTest(unittest.TestCase):
+
+    def check_ticks(self, curve_steps, tolerance, max_snapped):
+        rng = random.Random(0)
+        for limit in LIMITS:
+            for fading in FADINGS:
+                with self.subTest(limit=limit, fading=fading):
+                    rows_speeds, columns_speeds, *directions = get_ships(
+                        rng, SHIPS, limit
+                    )
+                    expected = [rows_speeds[:], columns_speeds[:]]
+                    update_speeds_one_by_one(
+                        *expected, *directions, limit, limit, fading
+                    )
+                    update_speeds(
+                        rows_speeds, columns_speeds, *directions,
+                        limit, limit, fading, curve_steps
+                    )
+                    self.check_speeds(
+                        expected, (rows_speeds, columns_speeds),
+                        tolerance, max_snapped
+                    )
+
+    def check_speeds(self, expected, got, tolerance, max_snapped):
+        snapped = 0
+        for expected_speeds, speeds in zip(expected, got):
+            for one, other in zip(expected_speeds, speeds):
+                if abs(one - other) <= tolerance:
+                    continue
+                # one is snapped to zero, the other is just over MIN_SPEED
+                self.assertTrue(one == 0 or other == 0, (one, other))
+                snapped += 1
+        self.assertLessEqual(snapped, max_snapped)
+
+    def check_flights(self, curve_steps, tolerance, max_snapped):
+        swarm = BotSwarm(
+            FLIGHT_SHIPS, 50, 200,
+            rng=random.Random(1), curve_steps=curve_steps
+        )
+        for _ in range(FLIGHT_TICKS):
+            expected = [swarm.rows_speeds[:], swarm.columns_speeds[:]]
+            update_speeds_one_by_one(
+                *expected, *swarm.get_directions(),
+                swarm.speed_limit, swarm.speed_limit
+            )
+            swarm.step()
+            self.check_speeds(
+                expected, (swarm.rows_speeds, swarm.columns_speeds),
+                tolerance, max_snapped
+            )
+
+    def test_cos_ticks(self):
+        self.check_ticks(None, 0, 0)
+
+    def test_cos_flights(self):
+        self.check_flights(None, 0, 0)
+
+    def test_table_ticks(self):
+        self.check_ticks(CURVE_STEPS, TABLE_ERROR, 2)
+
+    def test_table_flights(self):
+        self.check_flights(CURVE_STEPS, TABLE_ERROR, 2)
+
+    def test_wrong_arguments(self):
+        speeds = array('d', [0, 0])
+        with self.assertRaises(ValueError):
+            update_speeds(speeds, speeds[:], [2, 0], [0, 0])
+        with self.assertRaises(ValueError):
+            update_speeds(speeds, speeds[:], [0, 0], [0, -2])
+        with self.assertRaises(ValueError):
+            update_speeds(speeds, speeds[:], [0, 0], [0, 0], fading=1.5)
+        with self.assertRaises(ValueError):
+            update_speeds(
+                array('d', [3, 0]), speeds[:], [1, 0], [0, 0], 2, 2,
+                curve_steps=CURVE_STEPS
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
-from asyncio import sleep
 from itertools import cycle
+from types import coroutine
+
+# yielded instead of tics, coroutine waits for Scheduler.wake()
+PARKED = -1
 
 
 def cycle_with_repeat(iterable, repeat=1):
@@ -20,9 +23,17 @@ def validate_value(value, value_min, value_max):
     return value
 
 
-async def asleep(tics=1):
-    for _ in range(tics):
-        await sleep(0)
+@coroutine
+def asleep(tics=1):
+    """Suspend coroutine for tics, works under scheduler.Scheduler."""
+    if tics > 0:
+        yield tics
+
+
+@coroutine
+def park():
+    """Suspend coroutine until Scheduler.wake() is called for it."""
+    yield PARKED
 
 
 def get_garbage_delay_tics(year):